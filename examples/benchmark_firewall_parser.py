@@ -0,0 +1,197 @@
+"""防火墙规则解析吞吐量基准测试脚本
+
+生成与netsh advfirewall firewall show rule name=all格式一致的合成输出，
+分别测量逐行解析器（wsc.firewall.iter_firewall_rules）和按空行拆分后逐字段正则匹配的旧解析方式，
+输出每秒解析的规则数量；再比较FirewallRuleIndex与逐条扫描回答同一个端口查询的耗时。
+测量前先用一小段固定输出检查索引查询的结果，包括没有端口字段的规则。
+
+用法:
+    python examples/benchmark_firewall_parser.py [--rules N] [--repeat N] [--lang en|zh]
+"""
+
+import argparse
+import os
+import re
+import statistics
+import sys
+import time
+
+# 保证测量的是当前源码树中的wsc
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from wsc.firewall import iter_firewall_rules, parse_port_spec, FirewallRuleIndex
+
+# 合成规则使用的标签，与netsh在中英文系统上的输出一致
+LABELS = {
+    "en": ["Rule Name", "Enabled", "Direction", "Profiles", "Grouping", "LocalIP", "RemoteIP",
+           "Protocol", "LocalPort", "RemotePort", "Edge traversal", "Action"],
+    "zh": ["规则名称", "已启用", "方向", "配置文件", "分组", "本地 IP", "远程 IP",
+           "协议", "本地端口", "远程端口", "边缘遍历", "操作"],
+}
+
+VALUES = {
+    "en": {"yes": "Yes", "no": "No", "in": "In", "out": "Out", "allow": "Allow", "block": "Block",
+           "any": "Any", "profiles": "Domain,Private,Public"},
+    "zh": {"yes": "是", "no": "否", "in": "入", "out": "出", "allow": "允许", "block": "阻止",
+           "any": "任何", "profiles": "域,专用,公用"},
+}
+
+
+# 索引查询的检查用例：没有端口字段的Any协议规则匹配全部端口，ICMP规则不参与端口查询
+CHECK_DUMP = """
+Rule Name:                            RDP
+----------------------------------------------------------------------
+Enabled:                              Yes
+Direction:                            In
+Profiles:                             Domain,Private,Public
+LocalIP:                              Any
+RemoteIP:                             Any
+Protocol:                             TCP
+LocalPort:                            3389
+RemotePort:                           Any
+Edge traversal:                       No
+Action:                               Allow
+
+Rule Name:                            Allow all from mgmt
+----------------------------------------------------------------------
+Enabled:                              Yes
+Direction:                            In
+Profiles:                             Domain,Private,Public
+LocalIP:                              Any
+RemoteIP:                             10.0.0.0/255.0.0.0
+Protocol:                             Any
+Edge traversal:                       No
+Action:                               Allow
+
+Rule Name:                            Ping
+----------------------------------------------------------------------
+Enabled:                              Yes
+Direction:                            In
+Profiles:                             Domain,Private,Public
+LocalIP:                              Any
+RemoteIP:                             Any
+Protocol:                             ICMPv4
+                                      Type    Code
+                                      8       Any
+Edge traversal:                       No
+Action:                               Allow
+Ok.
+"""
+
+CHECK_QUERIES = [
+    ({"port": 3389, "direction": "In", "action": "Allow", "address": "10.1.2.3"}, ["RDP", "Allow all from mgmt"]),
+    ({"port": 3389, "direction": "In", "action": "Allow", "address": "192.168.1.5"}, ["RDP"]),
+    ({"port": 445, "direction": "In", "action": "Allow"}, ["Allow all from mgmt"]),
+    ({"direction": "In", "protocol": "ICMPv4"}, ["Allow all from mgmt", "Ping"]),
+]
+
+
+def check_index():
+    """检查索引查询的结果，与预期不符时抛出AssertionError"""
+    index = FirewallRuleIndex(iter_firewall_rules(CHECK_DUMP.split('\n')))
+    for query, expected in CHECK_QUERIES:
+        names = [rule["name"] for rule in index.find(**query)]
+        assert names == expected, f"查询 {query}: 期望 {expected}, 实际 {names}"
+    print(f"索引查询检查: {len(CHECK_QUERIES)} 项通过")
+
+
+def generate_dump(count, lang):
+    """生成包含count条规则的合成输出"""
+    labels = LABELS[lang]
+    values = VALUES[lang]
+    width = 38
+    blocks = []
+    for i in range(count):
+        ports = [str(1000 + i % 5000), "%d-%d" % (20000 + i % 100, 20010 + i % 100), values["any"]][i % 3]
+        row = [
+            "Rule %d (TCP-In)" % i,
+            values["yes"] if i % 4 else values["no"],
+            values["in"] if i % 2 else values["out"],
+            values["profiles"],
+            "Group %d" % (i % 50),
+            values["any"],
+            "10.%d.0.0/255.255.0.0" % (i % 256) if i % 5 == 0 else values["any"],
+            "TCP" if i % 3 else "UDP",
+            ports,
+            values["any"],
+            values["no"],
+            values["allow"] if i % 7 else values["block"],
+        ]
+        lines = [(label + ':').ljust(width) + value for label, value in zip(labels, row)]
+        lines.insert(1, '-' * 70)
+        blocks.append('\n'.join(lines))
+    return '\n' + '\n\n'.join(blocks) + '\nOk.\n'
+
+
+def legacy_parse(output):
+    """旧的解析方式：按空行拆分规则块，每个字段单独执行一次正则搜索"""
+    rules = []
+    for section in output.split('\n\n'):
+        if 'Rule Name:' not in section:
+            continue
+        rule = {}
+        for field, pattern in (("name", r'Rule Name:\s+(.+)'), ("description", r'Description:\s+(.+)'),
+                               ("direction", r'Direction:\s+(.+)'), ("action", r'Action:\s+(.+)'),
+                               ("enabled", r'Enabled:\s+(.+)'), ("protocol", r'Protocol:\s+(.+)')):
+            match = re.search(pattern, section)
+            rule[field] = match.group(1) if match else ""
+        rules.append(rule)
+    return rules
+
+
+def measure(parse, output, repeat):
+    """重复解析，返回(解析出的规则数量, 每次耗时的中位数秒数)"""
+    timings = []
+    count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = len(parse(output))
+        timings.append(time.perf_counter() - start)
+    return count, statistics.median(timings)
+
+
+def scan_port(rules, port, direction, action):
+    """逐条扫描规则回答端口查询，作为索引查询的对照"""
+    found = []
+    for rule in rules:
+        if rule["direction"] != direction or rule["action"] != action or rule["protocol"].lower().startswith("icmp"):
+            continue
+        matches_any, ranges, _ = parse_port_spec(rule["local_ports"] or "Any")
+        if matches_any or any(low <= port <= high for low, high in ranges):
+            found.append(rule)
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="防火墙规则解析吞吐量基准测试")
+    parser.add_argument("--rules", type=int, default=10000, help="合成输出中的规则数量")
+    parser.add_argument("--repeat", type=int, default=5, help="每个解析器的测量次数")
+    parser.add_argument("--lang", choices=sorted(LABELS), default="en", help="合成输出的系统语言")
+    args = parser.parse_args()
+
+    check_index()
+    output = generate_dump(args.rules, args.lang)
+    print(f"合成输出: {args.rules} 条规则, {len(output.encode('utf-8')) / 1024 / 1024:.1f} MB ({args.lang})")
+    print(f"{'解析器':<12}{'规则数':>10}{'中位耗时(ms)':>14}{'规则/秒':>14}")
+
+    parsers = {
+        "streaming": lambda text: list(iter_firewall_rules(text.split('\n'))),
+        "legacy": legacy_parse,
+    }
+    for name, parse in parsers.items():
+        count, elapsed = measure(parse, output, args.repeat)
+        print(f"{name:<12}{count:>10}{elapsed * 1000:>14.1f}{count / elapsed:>14,.0f}")
+
+    rules = list(iter_firewall_rules(output.split('\n')))
+    start = time.perf_counter()
+    index = FirewallRuleIndex(rules)
+    print(f"建立索引: {(time.perf_counter() - start) * 1000:.1f} ms")
+    query = {"port": 1389, "direction": "In", "action": "Allow"}
+    _, indexed = measure(lambda _: index.find(**query), None, args.repeat)
+    _, scanned = measure(lambda _: scan_port(rules, query["port"], query["direction"], query["action"]),
+                         None, args.repeat)
+    print(f"查询 {query}: 索引 {indexed * 1000:.2f} ms, 逐条扫描 {scanned * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
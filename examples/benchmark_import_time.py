@@ -0,0 +1,82 @@
+"""WSC库冷启动耗时基准测试脚本
+
+每次测量都启动新的Python解释器，分别统计`import wsc`和`wsc version`的耗时，
+减去空解释器的启动耗时后取中位数。指定--max-ms时，超出阈值以退出码1结束，可用于发现启动耗时的回退。
+
+用法:
+    python examples/benchmark_import_time.py [--repeat N] [--max-ms 毫秒]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# 项目根目录，保证测量的是当前源码树中的wsc
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# 测量场景：名称到在新解释器中执行的代码
+SCENARIOS = {
+    "baseline": "pass",
+    "import wsc": "import wsc",
+    "wsc version": "import sys, wsc; sys.argv = ['wsc', 'version']; wsc.main()",
+}
+
+
+def _python(code):
+    """生成在新解释器中执行代码的命令行和环境变量"""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = PROJECT_ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    # 使用-S跳过site初始化，减少与wsc无关的启动耗时
+    return [sys.executable, "-S", "-c", code], env
+
+
+def measure(code, repeat):
+    """在新解释器中重复执行代码，返回每次的耗时（毫秒）"""
+    command, env = _python(code)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, env=env, stdout=subprocess.DEVNULL, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WSC库冷启动耗时基准测试")
+    parser.add_argument("--repeat", type=int, default=20, help="每个场景的测量次数")
+    parser.add_argument("--max-ms", type=float, default=None,
+                        help="import wsc的耗时上限（毫秒，已减去解释器启动耗时），超出时退出码为1")
+    args = parser.parse_args()
+
+    # 预热一次，保证字节码缓存已生成
+    measure(SCENARIOS["import wsc"], 1)
+
+    baseline = statistics.median(measure(SCENARIOS["baseline"], args.repeat))
+    print(f"{'场景':<14}{'中位数(ms)':>12}{'去除启动(ms)':>14}")
+    print(f"{'baseline':<14}{baseline:>12.1f}{0:>14.1f}")
+
+    results = {}
+    for name, code in SCENARIOS.items():
+        if name == "baseline":
+            continue
+        median = statistics.median(measure(code, args.repeat))
+        results[name] = median - baseline
+        print(f"{name:<14}{median:>12.1f}{results[name]:>14.1f}")
+
+    # 导入后不应加载任何采集模块
+    check = ("import sys, wsc; "
+             "print(','.join(sorted(m for m in sys.modules if m.startswith('wsc.'))))")
+    command, env = _python(check)
+    loaded = subprocess.run(command, env=env, stdout=subprocess.PIPE, check=True).stdout.decode().strip()
+    print(f"import wsc 加载的子模块: {loaded or '无'}")
+
+    if args.max_ms is not None and results["import wsc"] > args.max_ms:
+        print(f"import wsc 耗时 {results['import wsc']:.1f}ms 超过上限 {args.max_ms:.1f}ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
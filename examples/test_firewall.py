@@ -0,0 +1,385 @@
+"""防火墙规则解析测试脚本
+
+用中文和英文系统的netsh advfirewall firewall show rule输出检查iter_firewall_rules()：
+标签和取值统一为英文、启用状态转为布尔值、verbose输出的程序、服务和描述字段，
+以及在输出到达时逐条返回规则；并检查SecurityInfo只在需要时使用verbose输出。
+FirewallRuleIndex的查询结果与逐条扫描比较，覆盖端口范围和关键字、子网和地址范围、
+没有端口字段的规则、ICMP规则、配置文件、程序路径和启用状态。
+不需要Windows，也不启动任何命令。
+
+用法:
+    python examples/test_firewall.py
+"""
+
+import ipaddress
+import os
+import random
+import sys
+
+# 将项目根目录添加到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from wsc.executor import CommandExecutor
+from wsc.firewall import iter_firewall_rules, parse_port_spec, parse_address_spec, IntervalTree, FirewallRuleIndex
+from wsc.security import SecurityInfo, FIREWALL_RULES_CMD, FIREWALL_RULES_VERBOSE_CMD
+
+RULES_EN = """
+Rule Name:                            Remote Desktop - User Mode (TCP-In)
+----------------------------------------------------------------------
+Description:                          Inbound rule for the Remote Desktop service to allow RDP traffic. [TCP 3389]
+Enabled:                              Yes
+Direction:                            In
+Profiles:                             Domain,Private
+Grouping:                             Remote Desktop
+LocalIP:                              Any
+RemoteIP:                             Any
+Protocol:                             TCP
+LocalPort:                            3389
+RemotePort:                           Any
+Edge traversal:                       No
+Program:                              %SystemRoot%\\system32\\svchost.exe
+Service:                              termservice
+InterfaceTypes:                       Any
+Security:                             NotRequired
+Rule source:                          Local Setting
+Action:                               Allow
+
+Rule Name:                            Block telemetry
+----------------------------------------------------------------------
+Enabled:                              No
+Direction:                            Out
+Profiles:                             Public
+Grouping:
+LocalIP:                              Any
+RemoteIP:                             13.64.0.0/255.192.0.0,20.0.0.1-20.0.0.9
+Protocol:                             Any
+Edge traversal:                       No
+Action:                               Block
+
+Rule Name:                            Core Networking - Echo Request (ICMPv4-In)
+----------------------------------------------------------------------
+Enabled:                              Yes
+Direction:                            In
+Profiles:                             Domain,Private,Public
+LocalIP:                              Any
+RemoteIP:                             LocalSubnet
+Protocol:                             ICMPv4
+                                      Type    Code
+                                      8       Any
+Edge traversal:                       No
+Action:                               Allow
+Ok.
+"""
+
+RULES_ZH = """
+规则名称:                             远程桌面 - 用户模式(TCP-In)
+----------------------------------------------------------------------
+描述:                                 用于远程桌面服务的入站规则，以允许 RDP 通信。[TCP 3389]
+已启用:                               是
+方向:                                 入
+配置文件:                             域,专用,公用
+分组:                                 远程桌面
+本地 IP:                              任何
+远程 IP:                              任何
+协议:                                 TCP
+本地端口:                             3389
+远程端口:                             任何
+边缘遍历:                             否
+程序:                                 %SystemRoot%\\system32\\svchost.exe
+服务:                                 termservice
+操作:                                 允许
+
+规则名称:                             阻止更新
+----------------------------------------------------------------------
+已启用:                               否
+方向:                                 出
+配置文件:                             公用
+本地 IP:                              任何
+远程 IP:                              任何
+协议:                                 UDP
+本地端口:                             任何
+远程端口:                             53
+边缘遍历:                             否
+操作:                                 阻止
+确定。
+"""
+
+
+class RecordingExecutor(CommandExecutor):
+    """返回固定防火墙规则输出并记录命令的执行器"""
+
+    def __init__(self):
+        super().__init__(max_workers=1)
+        self.commands = []
+
+    def _execute(self, cmd):
+        self.commands.append(cmd)
+        return RULES_EN
+
+    def stream(self, cmd):
+        self.commands.append(cmd)
+        yield from RULES_EN.split('\n')
+
+
+def parse(output):
+    """解析输出为规则列表"""
+    return list(iter_firewall_rules(output.split('\n')))
+
+
+def test_english_rules():
+    """英文输出：每条规则的字段，verbose输出中的程序、服务和描述"""
+    print("=== 测试英文规则 ===")
+    rules = parse(RULES_EN)
+    print(f"规则数量: {len(rules)}")
+    assert [rule["name"] for rule in rules] == [
+        "Remote Desktop - User Mode (TCP-In)", "Block telemetry", "Core Networking - Echo Request (ICMPv4-In)"]
+
+    rdp = rules[0]
+    assert rdp["display_name"] == rdp["name"]
+    assert rdp["description"].startswith("Inbound rule for the Remote Desktop service")
+    assert rdp["enabled"] is True
+    assert (rdp["direction"], rdp["action"], rdp["protocol"]) == ("In", "Allow", "TCP")
+    assert rdp["profiles"] == "Domain,Private"
+    assert rdp["grouping"] == "Remote Desktop"
+    assert (rdp["local_ports"], rdp["remote_ports"]) == ("3389", "Any")
+    assert rdp["program"] == "%SystemRoot%\\system32\\svchost.exe"
+    assert rdp["service"] == "termservice"
+
+    block = rules[1]
+    assert block["enabled"] is False
+    assert (block["direction"], block["action"]) == ("Out", "Block")
+    assert block["remote_addresses"] == "13.64.0.0/255.192.0.0,20.0.0.1-20.0.0.9"
+    # 没有端口字段的规则保留空字符串，没有verbose字段的规则程序和服务为空
+    assert (block["local_ports"], block["remote_ports"], block["program"], block["service"]) == ("", "", "", "")
+    assert block["grouping"] == ""
+
+    icmp = rules[2]
+    assert icmp["protocol"] == "ICMPv4"
+    assert icmp["remote_addresses"] == "LocalSubnet"
+    print()
+
+
+def test_chinese_rules():
+    """中文输出：标签映射到相同的字段，方向、操作、配置文件和Any统一为英文"""
+    print("=== 测试中文规则 ===")
+    rules = parse(RULES_ZH)
+    assert [rule["name"] for rule in rules] == ["远程桌面 - 用户模式(TCP-In)", "阻止更新"]
+
+    rdp = rules[0]
+    assert rdp["description"].startswith("用于远程桌面服务的入站规则")
+    assert rdp["enabled"] is True
+    assert (rdp["direction"], rdp["action"]) == ("In", "Allow")
+    assert rdp["profiles"] == "Domain,Private,Public"
+    assert (rdp["local_addresses"], rdp["remote_addresses"], rdp["remote_ports"]) == ("Any", "Any", "Any")
+    assert rdp["program"] == "%SystemRoot%\\system32\\svchost.exe"
+    assert rdp["service"] == "termservice"
+
+    block = rules[1]
+    assert block["enabled"] is False
+    assert (block["direction"], block["action"], block["profiles"]) == ("Out", "Block", "Public")
+    assert (block["protocol"], block["local_ports"], block["remote_ports"]) == ("UDP", "Any", "53")
+    print()
+
+
+def test_crlf_and_empty_output():
+    """\\r\\n换行的输出与\\n换行的结果一致，空输出和只有提示信息的输出没有规则"""
+    print("=== 测试CRLF和空输出 ===")
+    assert parse(RULES_EN.replace('\n', '\r\n')) == parse(RULES_EN)
+    assert parse("") == []
+    assert parse("No rules match the specified criteria.\n") == []
+    print()
+
+
+def test_streaming():
+    """读到下一条规则的名称时就返回上一条规则，不需要先读完全部输出"""
+    print("=== 测试逐条返回 ===")
+    lines = RULES_EN.split('\n')
+    consumed = []
+
+    def feed():
+        for line in lines:
+            consumed.append(line)
+            yield line
+
+    rules = iter_firewall_rules(feed())
+    first = next(rules)
+    print(f"返回第一条规则时读取的行数: {len(consumed)} / {len(lines)}")
+    assert first["name"] == "Remote Desktop - User Mode (TCP-In)"
+    assert len(consumed) < len(lines) // 2
+    assert [rule["name"] for rule in rules][-1] == "Core Networking - Echo Request (ICMPv4-In)"
+    print()
+
+
+def test_security_info_commands():
+    """get_firewall_rules()默认使用普通输出，verbose=True和规则索引使用verbose输出"""
+    print("=== 测试SecurityInfo使用的命令 ===")
+    executor = RecordingExecutor()
+    security = SecurityInfo(executor)
+    assert len(security.get_firewall_rules()) == 3
+    assert executor.commands == [FIREWALL_RULES_CMD]
+
+    security.get_firewall_rules(verbose=True)
+    assert executor.commands[-1] == FIREWALL_RULES_VERBOSE_CMD
+
+    assert [rule["name"] for rule in security.iter_firewall_rules()][0] == "Remote Desktop - User Mode (TCP-In)"
+    assert executor.commands[-1] == FIREWALL_RULES_CMD
+    print()
+
+
+def make_rule(name, **fields):
+    """创建索引测试用的规则，未指定的字段为Any或空"""
+    rule = {"name": name, "display_name": name, "description": "", "direction": "In", "action": "Allow",
+            "enabled": True, "protocol": "TCP", "profiles": "Domain,Private,Public", "grouping": "",
+            "local_ports": "Any", "remote_ports": "Any", "local_addresses": "Any", "remote_addresses": "Any",
+            "program": "Any", "service": ""}
+    rule.update(fields)
+    return rule
+
+
+INDEX_RULES = [
+    make_rule("web", local_ports="80,443"),
+    make_rule("range", local_ports="5000-5010", protocol="UDP"),
+    make_rule("rpc", local_ports="RPC", program="%SystemRoot%\\system32\\svchost.exe"),
+    make_rule("mgmt subnet", local_ports="", remote_ports="", protocol="Any",
+              remote_addresses="10.0.0.0/255.0.0.0,192.168.1.10-192.168.1.20"),
+    make_rule("local subnet", local_ports="3389", remote_addresses="LocalSubnet", profiles="Domain"),
+    make_rule("ping", local_ports="", remote_ports="", protocol="ICMPv4:8,any"),
+    make_rule("ipv6", local_ports="22", remote_addresses="2001:db8::/32", direction="Out", action="Block"),
+    make_rule("disabled", local_ports="3389", enabled=False, profiles="Public"),
+]
+
+
+def test_port_and_address_specs():
+    """端口和地址取值解析为区间和关键字"""
+    print("=== 测试端口和地址取值 ===")
+    assert parse_port_spec("Any") == (True, [], [])
+    assert parse_port_spec("80, 443,5000-5010,RPC") == (False, [(80, 80), (443, 443), (5000, 5010)], ["rpc"])
+    any_address, ranges, keywords = parse_address_spec("10.0.0.0/255.0.0.0,192.168.1.1-192.168.1.9,LocalSubnet")
+    assert not any_address and keywords == ["localsubnet"]
+    assert ranges == [(4, int(ipaddress.ip_address("10.0.0.0")), int(ipaddress.ip_address("10.255.255.255"))),
+                      (4, int(ipaddress.ip_address("192.168.1.1")), int(ipaddress.ip_address("192.168.1.9")))]
+    # 不同IP版本组成的范围无法比较，作为关键字保留
+    assert parse_address_spec("10.0.0.1-::1")[2] == ["10.0.0.1-::1"]
+    print()
+
+
+def test_interval_tree():
+    """区间树的查询结果与逐个区间比较的结果一致"""
+    print("=== 测试区间树 ===")
+    generator = random.Random(20)
+    intervals = []
+    for value in range(300):
+        low = generator.randint(0, 1000)
+        intervals.append((low, low + generator.randint(0, 50), value))
+    tree = IntervalTree(intervals)
+    for point in list(range(-5, 1060, 7)) + [low for low, _, _ in intervals[:20]]:
+        expected = sorted(value for low, high, value in intervals if low <= point <= high)
+        assert sorted(tree.query(point)) == expected, point
+    assert IntervalTree([]).query(1) == []
+    print()
+
+
+def find_names(index, **query):
+    """查询索引并返回规则名称列表"""
+    return [rule["name"] for rule in index.find(**query)]
+
+
+def test_index_ports():
+    """端口查询：范围、关键字、Any和没有端口字段的规则，ICMP规则不参与端口查询"""
+    print("=== 测试端口查询 ===")
+    index = FirewallRuleIndex(INDEX_RULES)
+    assert len(index) == len(INDEX_RULES)
+    assert find_names(index, port=443) == ["web", "mgmt subnet"]
+    assert find_names(index, port="5005", protocol="UDP") == ["range", "mgmt subnet"]
+    assert find_names(index, port=5011) == ["mgmt subnet"]
+    assert find_names(index, port="RPC") == ["rpc", "mgmt subnet"]
+    assert find_names(index, port=3389, enabled=True) == ["mgmt subnet", "local subnet"]
+    # 远程端口都是Any或没有端口字段，ICMP规则除外
+    assert "ping" not in find_names(index, remote_port=53)
+    assert len(find_names(index, remote_port=53)) == len(INDEX_RULES) - 1
+    print()
+
+
+def test_index_addresses():
+    """地址查询：子网、地址范围、IPv6、关键字和Any"""
+    print("=== 测试地址查询 ===")
+    index = FirewallRuleIndex(INDEX_RULES)
+    any_remote = ["web", "range", "rpc", "ping", "disabled"]
+    assert find_names(index, address="10.20.30.40") == ["web", "range", "rpc", "mgmt subnet", "ping", "disabled"]
+    assert find_names(index, address="192.168.1.15", port=80) == ["web", "mgmt subnet"]
+    assert find_names(index, address="192.168.1.21") == any_remote
+    assert find_names(index, address="2001:db8::5") == ["web", "range", "rpc", "ping", "ipv6", "disabled"]
+    assert find_names(index, address="localsubnet") == ["web", "range", "rpc", "local subnet", "ping", "disabled"]
+    assert find_names(index, local_address="127.0.0.1") == [rule["name"] for rule in INDEX_RULES]
+    print()
+
+
+def test_index_hash_fields():
+    """方向、操作、配置文件、协议、程序和启用状态"""
+    print("=== 测试哈希字段查询 ===")
+    index = FirewallRuleIndex(INDEX_RULES)
+    assert find_names(index, direction="out") == ["ipv6"]
+    assert find_names(index, action="Block", direction="Out") == ["ipv6"]
+    assert find_names(index, profile="Public", port=3389) == ["mgmt subnet", "disabled"]
+    assert find_names(index, protocol="ICMPv4:8,any") == ["mgmt subnet", "ping"]
+    assert find_names(index, enabled=False) == ["disabled"]
+    # 条件为Any或None时不限制
+    assert find_names(index, direction="Any") == [rule["name"] for rule in INDEX_RULES]
+    assert find_names(index) == [rule["name"] for rule in INDEX_RULES]
+    print()
+
+
+def test_index_program():
+    """程序路径展开环境变量并忽略大小写，程序为Any的规则匹配任何程序"""
+    print("=== 测试程序查询 ===")
+    saved = os.environ.get("SystemRoot")
+    os.environ["SystemRoot"] = "C:\\Windows"
+    try:
+        index = FirewallRuleIndex(INDEX_RULES)
+        names = find_names(index, program="c:\\windows\\System32\\SVCHOST.EXE", port="RPC")
+        assert names == ["rpc", "mgmt subnet"]
+        assert "rpc" not in find_names(index, program="C:\\Tools\\app.exe")
+    finally:
+        if saved is None:
+            os.environ.pop("SystemRoot", None)
+        else:
+            os.environ["SystemRoot"] = saved
+    print()
+
+
+def test_index_matches_scan():
+    """在解析出的规则上，索引查询与逐条扫描得到相同的规则"""
+    print("=== 测试索引与逐条扫描一致 ===")
+    rules = parse(RULES_EN) + parse(RULES_ZH)
+    index = FirewallRuleIndex(rules)
+    assert find_names(index, port=3389, direction="In", action="Allow") == [
+        "Remote Desktop - User Mode (TCP-In)", "远程桌面 - 用户模式(TCP-In)"]
+    assert find_names(index, remote_port=53, direction="Out") == ["Block telemetry", "阻止更新"]
+    assert find_names(index, address="13.100.0.1", direction="Out") == ["Block telemetry", "阻止更新"]
+    assert find_names(index, address="13.200.0.1", direction="Out") == ["阻止更新"]
+    assert find_names(index, protocol="ICMPv4") == ["Block telemetry", "Core Networking - Echo Request (ICMPv4-In)"]
+    print()
+
+
+def main():
+    """主测试函数"""
+    print("开始测试防火墙规则解析...\n")
+
+    test_english_rules()
+    test_chinese_rules()
+    test_crlf_and_empty_output()
+    test_streaming()
+    test_security_info_commands()
+    test_port_and_address_specs()
+    test_interval_tree()
+    test_index_ports()
+    test_index_addresses()
+    test_index_hash_fields()
+    test_index_program()
+    test_index_matches_scan()
+
+    print("所有防火墙规则测试通过！")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""ipconfig /all解析测试脚本
+
+用中文和英文系统的ipconfig /all输出检查IpconfigModel，覆盖多值字段的续行、
+地址后"(Preferred)"/"(首选)"状态标记的去除、媒体已断开的适配器以及按MAC地址查找适配器。
+不需要Windows，也不启动任何命令。
+
+用法:
+    python examples/test_ipconfig.py
+"""
+
+import os
+import sys
+
+# 将项目根目录添加到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from wsc.ipconfig import IpconfigModel, get_ipv4_gateway, normalize_mac
+
+IPCONFIG_EN = """
+Windows IP Configuration
+
+   Host Name . . . . . . . . . . . . : DESKTOP-01
+   Primary Dns Suffix  . . . . . . . : corp.example.com
+   Node Type . . . . . . . . . . . . : Hybrid
+   IP Routing Enabled. . . . . . . . : No
+   WINS Proxy Enabled. . . . . . . . : No
+   DNS Suffix Search List. . . . . . : corp.example.com
+                                       example.com
+
+Ethernet adapter Ethernet:
+
+   Connection-specific DNS Suffix  . : corp.example.com
+   Description . . . . . . . . . . . : Intel(R) Ethernet Connection I219-V
+   Physical Address. . . . . . . . . : 00-11-22-33-44-55
+   DHCP Enabled. . . . . . . . . . . : Yes
+   Autoconfiguration Enabled . . . . : Yes
+   Link-local IPv6 Address . . . . . : fe80::1c2d:3e4f:5a6b:7c8d%12(Preferred)
+   IPv4 Address. . . . . . . . . . . : 192.168.1.20(Preferred)
+   Subnet Mask . . . . . . . . . . . : 255.255.255.0
+   Lease Obtained. . . . . . . . . . : Monday, October 12, 2026 9:00:00 AM
+   Lease Expires . . . . . . . . . . : Tuesday, October 13, 2026 9:00:00 AM
+   Default Gateway . . . . . . . . . : fe80::1%12
+                                       192.168.1.1
+   DHCP Server . . . . . . . . . . . : 192.168.1.1
+   DNS Servers . . . . . . . . . . . : 192.168.1.2
+                                       8.8.8.8
+   NetBIOS over Tcpip. . . . . . . . : Enabled
+
+Wireless LAN adapter Wi-Fi:
+
+   Media State . . . . . . . . . . . : Media disconnected
+   Connection-specific DNS Suffix  . :
+   Description . . . . . . . . . . . : Intel(R) Wi-Fi 6 AX201 160MHz
+   Physical Address. . . . . . . . . : AA-BB-CC-DD-EE-FF
+   DHCP Enabled. . . . . . . . . . . : Yes
+   Autoconfiguration Enabled . . . . : Yes
+"""
+
+IPCONFIG_ZH = """
+Windows IP 配置
+
+   主机名  . . . . . . . . . . . . . : PC-02
+   主 DNS 后缀 . . . . . . . . . . . :
+   节点类型  . . . . . . . . . . . . : 混合
+   IP 路由已启用 . . . . . . . . . . : 否
+   WINS 代理已启用 . . . . . . . . . : 否
+
+以太网适配器 以太网:
+
+   连接特定的 DNS 后缀 . . . . . . . : lan
+   描述. . . . . . . . . . . . . . . : Realtek PCIe GbE Family Controller
+   物理地址. . . . . . . . . . . . . : 10-20-30-40-50-60
+   DHCP 已启用 . . . . . . . . . . . : 是
+   自动配置已启用. . . . . . . . . . : 是
+   本地链接 IPv6 地址. . . . . . . . : fe80::aaaa:bbbb:cccc:dddd%7(首选)
+   IPv4 地址 . . . . . . . . . . . . : 10.0.0.5(首选)
+   子网掩码  . . . . . . . . . . . . : 255.255.255.0
+   获得租约的时间  . . . . . . . . . : 2026年10月12日 9:00:00
+   默认网关. . . . . . . . . . . . . : 10.0.0.1
+   DHCP 服务器 . . . . . . . . . . . : 10.0.0.1
+   DNS 服务器  . . . . . . . . . . . : 10.0.0.1
+                                       114.114.114.114
+   TCPIP 上的 NetBIOS  . . . . . . . : 已启用
+
+无线局域网适配器 WLAN:
+
+   媒体状态  . . . . . . . . . . . . : 媒体已断开连接
+   连接特定的 DNS 后缀 . . . . . . . :
+   描述. . . . . . . . . . . . . . . : Intel(R) Wi-Fi 6 AX201
+   物理地址. . . . . . . . . . . . . : 70-80-90-A0-B0-C0
+   DHCP 已启用 . . . . . . . . . . . : 否
+"""
+
+
+def test_settings():
+    """全局设置，包括多行的DNS后缀搜索列表"""
+    print("=== 测试全局设置 ===")
+    model = IpconfigModel(IPCONFIG_EN)
+    print(f"英文: {model.settings}")
+    assert model.settings == {
+        "host_name": "DESKTOP-01",
+        "primary_dns_suffix": "corp.example.com",
+        "dns_suffix_search_list": ["corp.example.com", "example.com"]
+    }
+
+    model = IpconfigModel(IPCONFIG_ZH)
+    print(f"中文: {model.settings}")
+    assert model.settings == {"host_name": "PC-02", "primary_dns_suffix": "", "dns_suffix_search_list": []}
+    print()
+
+
+def test_connected_adapter_en():
+    """英文输出：续行追加到多值字段，地址后的(Preferred)被去除，未知字段的续行被忽略"""
+    print("=== 测试英文已连接适配器 ===")
+    model = IpconfigModel(IPCONFIG_EN)
+    assert [adapter["name"] for adapter in model.adapters] == ["Ethernet", "Wi-Fi"]
+    adapter = model.adapters[0]
+    assert adapter["type"] == "Ethernet"
+    assert adapter["description"] == "Intel(R) Ethernet Connection I219-V"
+    assert adapter["mac_address"] == "00-11-22-33-44-55"
+    assert adapter["dhcp_enabled"] is True
+    assert adapter["dhcp_server"] == "192.168.1.1"
+    assert adapter["dns_suffix"] == "corp.example.com"
+    assert adapter["ipv4_addresses"] == ["192.168.1.20"]
+    assert adapter["ipv6_addresses"] == ["fe80::1c2d:3e4f:5a6b:7c8d%12"]
+    assert adapter["subnet_masks"] == ["255.255.255.0"]
+    assert adapter["gateways"] == ["fe80::1%12", "192.168.1.1"]
+    assert adapter["dns_servers"] == ["192.168.1.2", "8.8.8.8"]
+    assert adapter["media_disconnected"] is False
+    assert get_ipv4_gateway(adapter) == "192.168.1.1"
+    print()
+
+
+def test_connected_adapter_zh():
+    """中文输出：标签和"(首选)"标记与英文输出得到相同的模型字段"""
+    print("=== 测试中文已连接适配器 ===")
+    model = IpconfigModel(IPCONFIG_ZH)
+    assert [(adapter["type"], adapter["name"]) for adapter in model.adapters] == \
+        [("以太网", "以太网"), ("无线局域网", "WLAN")]
+    adapter = model.adapters[0]
+    assert adapter["description"] == "Realtek PCIe GbE Family Controller"
+    assert adapter["dhcp_enabled"] is True
+    assert adapter["dns_suffix"] == "lan"
+    assert adapter["ipv4_addresses"] == ["10.0.0.5"]
+    assert adapter["ipv6_addresses"] == ["fe80::aaaa:bbbb:cccc:dddd%7"]
+    assert adapter["gateways"] == ["10.0.0.1"]
+    assert adapter["dns_servers"] == ["10.0.0.1", "114.114.114.114"]
+    assert adapter["media_disconnected"] is False
+    print()
+
+
+def test_media_disconnected():
+    """媒体已断开的适配器没有地址，其余字段照常解析"""
+    print("=== 测试媒体已断开的适配器 ===")
+    for output, name in ((IPCONFIG_EN, "Wi-Fi"), (IPCONFIG_ZH, "WLAN")):
+        adapter = IpconfigModel(output).by_name[name]
+        print(f"{name}: {adapter['description']}")
+        assert adapter["media_disconnected"] is True
+        assert adapter["ipv4_addresses"] == [] and adapter["gateways"] == [] and adapter["dns_servers"] == []
+        assert adapter["dns_suffix"] == ""
+        assert adapter["description"].startswith("Intel(R) Wi-Fi 6 AX201")
+    assert IpconfigModel(IPCONFIG_EN).by_name["Wi-Fi"]["dhcp_enabled"] is True
+    assert IpconfigModel(IPCONFIG_ZH).by_name["WLAN"]["dhcp_enabled"] is False
+    print()
+
+
+def test_lookup_by_mac():
+    """按MAC地址查找适配器，'-'和':'分隔的写法等价"""
+    print("=== 测试按MAC地址查找 ===")
+    model = IpconfigModel(IPCONFIG_EN)
+    assert normalize_mac("aa-bb-cc-dd-ee-ff") == "AA:BB:CC:DD:EE:FF"
+    assert model.get_adapter_by_mac("aa:bb:cc:dd:ee:ff")["name"] == "Wi-Fi"
+    assert model.get_adapter_by_mac("00-11-22-33-44-55")["name"] == "Ethernet"
+    assert model.get_adapter_by_mac("00-00-00-00-00-00") is None
+    print()
+
+
+def test_crlf_output():
+    """保留\\r\\n换行的输出与\\n换行的输出得到相同的模型"""
+    print("=== 测试CRLF换行 ===")
+    for output in (IPCONFIG_EN, IPCONFIG_ZH):
+        expected = IpconfigModel(output)
+        model = IpconfigModel(output.replace('\n', '\r\n'))
+        assert model.settings == expected.settings
+        assert model.adapters == expected.adapters
+    print()
+
+
+def main():
+    """主测试函数"""
+    print("开始测试ipconfig /all解析...\n")
+
+    test_settings()
+    test_connected_adapter_en()
+    test_connected_adapter_zh()
+    test_media_disconnected()
+    test_lookup_by_mac()
+    test_crlf_output()
+
+    print("所有ipconfig解析测试通过！")
+
+
+if __name__ == "__main__":
+    main()
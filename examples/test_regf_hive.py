@@ -0,0 +1,296 @@
+"""离线配置单元读取测试脚本
+
+在内存中生成最小的regf配置单元，通过HiveBackend和iter_registry_subtree读取键、值和大数据值，
+覆盖nk/vk单元、lf/lh/li/ri子键列表、db大数据单元以及HiveBackend.from_directory()的挂载规则。
+不需要Windows，也不读取本机注册表。
+
+用法:
+    python examples/test_regf_hive.py
+"""
+
+import os
+import struct
+import sys
+import tempfile
+
+# 将项目根目录添加到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from wsc import iter_registry_subtree
+from wsc.regf import RegfHive
+from wsc.registry import HiveBackend, HKEY_CURRENT_USER, HKEY_LOCAL_MACHINE
+
+REG_SZ = 1
+REG_EXPAND_SZ = 2
+REG_BINARY = 3
+REG_DWORD = 4
+REG_MULTI_SZ = 7
+REG_QWORD = 11
+
+# 超过这个大小的值数据写入db单元指向的多个数据段
+BIG_DATA_SEGMENT = 16344
+
+UNINSTALL_PATH = r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"
+
+# 跨越3个db数据段的二进制值
+BIG_BLOB = bytes(range(256)) * 150
+
+
+def sz(text, value_type=REG_SZ):
+    """REG_SZ/REG_EXPAND_SZ值"""
+    return value_type, (text + '\0').encode('utf-16-le')
+
+
+def multi_sz(strings):
+    """REG_MULTI_SZ值"""
+    return REG_MULTI_SZ, ''.join(s + '\0' for s in strings).encode('utf-16-le') + b'\0\0'
+
+
+def dword(number):
+    """REG_DWORD值"""
+    return REG_DWORD, struct.pack('<I', number)
+
+
+def qword(number):
+    """REG_QWORD值"""
+    return REG_QWORD, struct.pack('<Q', number)
+
+
+def _name_hash(name):
+    """lh列表中的键名哈希"""
+    value = 0
+    for char in name.upper():
+        value = (value * 37 + ord(char)) & 0xffffffff
+    return value
+
+
+def _encode_name(name, compressed_flag):
+    """ASCII名称按压缩格式保存，其他名称保存为UTF-16LE，返回(名称字节, 标志)"""
+    try:
+        return name.encode('ascii'), compressed_flag
+    except UnicodeEncodeError:
+        return name.encode('utf-16-le'), 0
+
+
+class HiveWriter:
+    """按regf格式写入单元，所有单元放在同一个hbin中"""
+
+    def __init__(self, list_kind='lh'):
+        """初始化
+
+        Args:
+            list_kind: 子键列表的格式，lf、lh、li或ri（ri下为两个lh列表）
+        """
+        self.list_kind = list_kind
+        self.cells = bytearray()
+
+    def cell(self, payload):
+        """写入一个已分配的单元，返回相对于第一个hbin的偏移"""
+        size = (len(payload) + 4 + 7) & ~7
+        offset = 32 + len(self.cells)
+        self.cells += struct.pack('<i', -size) + payload + b'\0' * (size - 4 - len(payload))
+        return offset
+
+    def value(self, name, value_type, data):
+        """写入vk单元，4字节以内的数据内联保存，超过BIG_DATA_SEGMENT的数据写入db单元"""
+        raw_name, flags = _encode_name(name, 0x0001)
+        if len(data) <= 4:
+            size = len(data) | 0x80000000
+            data_offset = struct.unpack('<I', data.ljust(4, b'\0'))[0]
+        elif len(data) > BIG_DATA_SEGMENT:
+            segments = [self.cell(data[i:i + BIG_DATA_SEGMENT]) for i in range(0, len(data), BIG_DATA_SEGMENT)]
+            segment_list = self.cell(struct.pack('<%dI' % len(segments), *segments))
+            data_offset = self.cell(b'db' + struct.pack('<HI', len(segments), segment_list))
+            size = len(data)
+        else:
+            data_offset = self.cell(data)
+            size = len(data)
+        return self.cell(b'vk' + struct.pack('<HIIIHH', len(raw_name), size, data_offset, value_type, flags, 0)
+                         + raw_name)
+
+    def subkey_list(self, subkeys):
+        """写入子键列表，subkeys为按大写键名排序的(键名, nk偏移)列表"""
+        if self.list_kind == 'ri' and len(subkeys) > 1:
+            half = len(subkeys) // 2
+            parts = [self._hash_list(b'lh', subkeys[:half]), self._hash_list(b'lh', subkeys[half:])]
+            return self.cell(b'ri' + struct.pack('<H%dI' % len(parts), len(parts), *parts))
+        if self.list_kind == 'li':
+            return self.cell(b'li' + struct.pack('<H%dI' % len(subkeys), len(subkeys), *[o for _, o in subkeys]))
+        if self.list_kind == 'lf':
+            return self._hash_list(b'lf', subkeys)
+        return self._hash_list(b'lh', subkeys)
+
+    def _hash_list(self, signature, subkeys):
+        """写入lf（键名前4个字符）或lh（键名哈希）列表"""
+        entries = []
+        for name, offset in subkeys:
+            if signature == b'lf':
+                hint = name.encode('utf-16-le')[:4].ljust(4, b'\0')
+            else:
+                hint = struct.pack('<I', _name_hash(name))
+            entries.append(struct.pack('<I', offset) + hint)
+        return self.cell(signature + struct.pack('<H', len(subkeys)) + b''.join(entries))
+
+    def key(self, name, node):
+        """递归写入nk单元及其子键和值
+
+        Args:
+            name: 键名
+            node: {'keys': {键名: node}, 'values': {值名称: (类型, 数据)}, 'mtime': FILETIME}
+        """
+        children = sorted(node.get('keys', {}).items(), key=lambda item: item[0].upper())
+        subkeys = [(child_name, self.key(child_name, child)) for child_name, child in children]
+        values = [self.value(value_name, *value) for value_name, value in node.get('values', {}).items()]
+        subkey_list = self.subkey_list(subkeys) if subkeys else 0xffffffff
+        value_list = self.cell(struct.pack('<%dI' % len(values), *values)) if values else 0xffffffff
+        raw_name, flags = _encode_name(name, 0x0020)
+        return self.cell(b'nk' + struct.pack('<HQII', flags, node.get('mtime', 0), 0, 0)
+                         + struct.pack('<IIII', len(subkeys), 0, subkey_list, 0xffffffff)
+                         + struct.pack('<II', len(values), value_list)
+                         + b'\0' * 28 + struct.pack('<HH', len(raw_name), 0) + raw_name)
+
+
+def build_hive(tree, list_kind='lh'):
+    """生成配置单元文件的内容
+
+    Args:
+        tree: 根键的node，格式见HiveWriter.key()
+        list_kind: 子键列表的格式
+
+    Returns:
+        配置单元文件的字节
+    """
+    writer = HiveWriter(list_kind)
+    root = writer.key('ROOT', tree)
+    hbin_size = (len(writer.cells) + 32 + 4095) // 4096 * 4096
+    free = hbin_size - 32 - len(writer.cells)
+    # 剩余空间作为一个未分配单元
+    body = bytes(writer.cells) + (struct.pack('<i', free) + b'\0' * (free - 4) if free >= 8 else b'\0' * free)
+    hbin = b'hbin' + struct.pack('<III', 0, hbin_size, 0) + b'\0' * 16 + body
+    base_block = bytearray(4096)
+    struct.pack_into('<4sIIQIIIII', base_block, 0, b'regf', 1, 1, 0, 1, 5, 0, 1, root)
+    struct.pack_into('<I', base_block, 40, hbin_size)
+    return bytes(base_block) + hbin
+
+
+def software_tree():
+    """SOFTWARE配置单元：Uninstall下的已安装程序，包括Unicode键名和db大数据值"""
+    programs = {
+        "7-Zip": {"values": {"DisplayName": sz("7-Zip 23.01 (x64)"), "DisplayVersion": sz("23.01"),
+                             "EstimatedSize": dword(5699)}, "mtime": 133000000000000000},
+        "Git_is1": {"values": {"DisplayName": sz("Git"), "DisplayVersion": sz("2.44.0"),
+                               "InstallLocation": sz(r"%ProgramFiles%\Git", REG_EXPAND_SZ)}},
+        "中文程序": {"values": {"DisplayName": sz("中文程序"), "DisplayVersion": sz("1.0")}},
+        "{11111111-2222-3333-4444-555555555555}": {
+            "values": {"DisplayName": sz("Big Data"), "Blob": (REG_BINARY, BIG_BLOB),
+                       "Tags": multi_sz(["a", "b"]), "Size": qword(1 << 40)},
+            "keys": {"Nested": {"values": {"Depth": dword(2)}}}},
+    }
+    return {"keys": {"Microsoft": {"keys": {"Windows": {"keys": {"CurrentVersion": {"keys": {
+        "Uninstall": {"keys": programs}}}}}}}}}
+
+
+def read_uninstall(backend, value_names=None, depth=1):
+    """通过iter_registry_subtree读取Uninstall子树，返回子键路径到值字典的字典"""
+    return {path: values for path, values, _ in
+            iter_registry_subtree(UNINSTALL_PATH, value_names, depth=depth, backend=backend)}
+
+
+def test_subkey_lists():
+    """lf、lh、li和ri子键列表遍历到相同的子键"""
+    print("=== 测试子键列表 ===")
+    expected = None
+    for list_kind in ('lf', 'lh', 'li', 'ri'):
+        hive = build_hive(software_tree(), list_kind)
+        with HiveBackend({HKEY_LOCAL_MACHINE: {"SOFTWARE": hive}}) as backend:
+            programs = read_uninstall(backend, ('DisplayName', 'DisplayVersion'))
+        names = sorted(values["DisplayName"] for values in programs.values())
+        print(f"{list_kind}: {names}")
+        assert len(programs) == 4, programs
+        assert programs["中文程序"] == {"DisplayName": "中文程序", "DisplayVersion": "1.0"}
+        expected = expected or programs
+        assert programs == expected, list_kind
+    print()
+
+
+def test_values():
+    """内联、普通和db大数据值的类型转换与winreg一致"""
+    print("=== 测试值 ===")
+    with HiveBackend({HKEY_LOCAL_MACHINE: {"SOFTWARE": build_hive(software_tree())}}) as backend:
+        entries = list(iter_registry_subtree(UNINSTALL_PATH, depth=2, backend=backend))
+    programs = {path: values for path, values, _ in entries}
+    big = programs["{11111111-2222-3333-4444-555555555555}"]
+    assert big["Blob"] == BIG_BLOB, len(big["Blob"])
+    assert big["Tags"] == ["a", "b"]
+    assert big["Size"] == 1 << 40
+    assert programs["{11111111-2222-3333-4444-555555555555}\\Nested"] == {"Depth": 2}
+    assert programs["7-Zip"]["EstimatedSize"] == 5699
+    assert programs["Git_is1"]["InstallLocation"] == r"%ProgramFiles%\Git"
+    last_written = {path: mtime for path, _, mtime in entries}
+    assert last_written["7-Zip"] == 133000000000000000
+    print(f"大数据值: {len(big['Blob'])} 字节")
+    print(f"子键数量（两层）: {len(entries)}")
+    print()
+
+
+def test_from_directory():
+    """from_directory()按文件名挂载SOFTWARE、SYSTEM和NTUSER.DAT，CurrentControlSet按Select\\Current映射"""
+    print("=== 测试按目录挂载 ===")
+    system_tree = {"keys": {
+        "Select": {"values": {"Current": dword(2)}},
+        "ControlSet001": {"keys": {"Services": {"keys": {"Old": {"values": {"Start": dword(4)}}}}}},
+        "ControlSet002": {"keys": {"Services": {"keys": {
+            "Tcpip": {"values": {"Start": dword(1), "ImagePath": sz(r"System32\drivers\tcpip.sys")}},
+            "W32Time": {"values": {"Start": dword(3)}}}}}},
+    }}
+    user_tree = {"keys": {"Software": {"keys": {"Microsoft": {"keys": {"Windows": {"keys": {
+        "CurrentVersion": {"keys": {"Run": {"values": {"OneDrive": sz("OneDrive.exe /background")}}}}}}}}}}}}
+    with tempfile.TemporaryDirectory() as directory:
+        for file_name, tree in (("SOFTWARE", software_tree()), ("system", system_tree),
+                                ("NTUSER.DAT", user_tree), ("notes.txt", None)):
+            with open(os.path.join(directory, file_name), 'wb') as f:
+                f.write(build_hive(tree) if tree is not None else b'not a hive')
+
+        # 在删除临时目录之前关闭内存映射
+        with HiveBackend.from_directory(directory) as backend:
+            services = {path: values for path, values, _ in iter_registry_subtree(
+                r"SYSTEM\CurrentControlSet\Services", ('Start',), backend=backend)}
+            run_key = list(iter_registry_subtree(
+                r"Software\Microsoft\Windows", depth=3, hkey=HKEY_CURRENT_USER, backend=backend))
+            programs = read_uninstall(backend, ('DisplayName',))
+
+    print(f"服务: {services}")
+    assert services == {"Tcpip": {"Start": 1}, "W32Time": {"Start": 3}}
+    assert ("CurrentVersion\\Run", {"OneDrive": "OneDrive.exe /background"}) in \
+        [(path, values) for path, values, _ in run_key]
+    assert len(programs) == 4
+    print()
+
+
+def test_hive_from_bytes():
+    """RegfHive可以直接读取内存中的配置单元"""
+    print("=== 测试内存中的配置单元 ===")
+    with RegfHive(build_hive(software_tree(), 'ri')) as hive:
+        key = hive.open(UNINSTALL_PATH.split('\\', 1)[1])
+        print(f"子键数量: {key.subkey_count}")
+        assert key.subkey_count == 4
+        assert key.get_subkey("git_IS1") is not None
+        assert key.get_subkey("不存在") is None
+        assert not hive.dirty
+    print()
+
+
+def main():
+    """主测试函数"""
+    print("开始测试离线配置单元读取...\n")
+
+    test_subkey_lists()
+    test_values()
+    test_from_directory()
+    test_hive_from_bytes()
+
+    print("所有配置单元测试通过！")
+
+
+if __name__ == "__main__":
+    main()
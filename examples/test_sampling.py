@@ -0,0 +1,125 @@
+"""计数器速率采样测试脚本
+
+检查counter_delta()对32位和64位计数器回绕、计数器重置的处理，
+以及CounterRateSampler在第一次采样、时间不前进和计数器回绕时计算的速率。
+使用固定的计数器序列和模拟时钟，不需要Windows，也不启动任何命令。
+
+用法:
+    python examples/test_sampling.py
+"""
+
+import os
+import sys
+
+# 将项目根目录添加到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from wsc.sampling import counter_delta, CounterRateSampler
+
+
+class FakeClock:
+    """按调用顺序返回预设时间的模拟时钟"""
+
+    def __init__(self, times):
+        self._times = iter(times)
+
+    def __call__(self):
+        return next(self._times)
+
+
+def make_sampler(readings, times):
+    """用预设的计数器读数和时间创建采样器"""
+    readings = iter(readings)
+    return CounterRateSampler(lambda: {"total": {"bytes_recv": next(readings)}}, clock=FakeClock(times))
+
+
+def test_counter_delta():
+    """计数器增加时增量为差值"""
+    print("=== 测试计数器增量 ===")
+    assert counter_delta(100, 250) == 150
+    assert counter_delta(100, 100) == 0
+    assert counter_delta(2 ** 40, 2 ** 40 + 5) == 5
+    print()
+
+
+def test_counter_wrap_32():
+    """上一次读数在32位范围内时按32位计数器回绕"""
+    print("=== 测试32位回绕 ===")
+    assert counter_delta(2 ** 32 - 10, 5) == 15
+    assert counter_delta(2 ** 32 - 1, 0) == 1
+    print()
+
+
+def test_counter_wrap_64():
+    """上一次读数超过32位范围时按64位计数器回绕"""
+    print("=== 测试64位回绕 ===")
+    assert counter_delta(2 ** 64 - 100, 50) == 150
+    # 读数超过32位后不会再按32位计数器回绕
+    assert counter_delta(2 ** 63 + 2 ** 32, 7) == 2 ** 63 - 2 ** 32 + 7
+    print()
+
+
+def test_counter_reset():
+    """回绕后的增量超过计数器范围的一半时视为计数器重置，增量为本次读数"""
+    print("=== 测试计数器重置 ===")
+    assert counter_delta(1000, 10) == 10
+    assert counter_delta(2 ** 31 - 1, 0) == 0
+    assert counter_delta(5 * 10 ** 9, 1234) == 1234
+    print()
+
+
+def test_first_sample():
+    """第一次采样没有可比较的读数，不产生速率，也不写入缓冲区"""
+    print("=== 测试第一次采样 ===")
+    sampler = make_sampler([1000, 1500], [10.0, 12.0])
+    assert sampler.sample() is None
+    assert sampler.get_current() is None
+    assert sampler.get_average() is None
+    assert sampler.get_history() == []
+
+    rates = sampler.sample()
+    print(f"速率: {rates}")
+    assert rates == {"total": {"bytes_recv": 250.0}}
+    assert sampler.get_current() == rates
+    print()
+
+
+def test_sampler_wrap_and_reset():
+    """采样器对回绕和重置使用counter_delta()的增量，平均速率按总增量除以总时间"""
+    print("=== 测试采样器回绕和重置 ===")
+    sampler = make_sampler([2 ** 32 - 100, 100, 50], [0.0, 1.0, 2.0])
+    sampler.sample()
+    assert sampler.sample() == {"total": {"bytes_recv": 200.0}}
+    assert sampler.sample() == {"total": {"bytes_recv": 50.0}}
+    assert sampler.get_average() == {"total": {"bytes_recv": 125.0}}
+    assert len(sampler.get_history()) == 2
+    print()
+
+
+def test_clock_not_advancing():
+    """两次采样的时间相同时不计算速率"""
+    print("=== 测试时间不前进 ===")
+    sampler = make_sampler([1, 2], [5.0, 5.0])
+    sampler.sample()
+    assert sampler.sample() is None
+    assert sampler.get_current() is None
+    print()
+
+
+def main():
+    """主测试函数"""
+    print("开始测试计数器速率采样...\n")
+
+    test_counter_delta()
+    test_counter_wrap_32()
+    test_counter_wrap_64()
+    test_counter_reset()
+    test_first_sample()
+    test_sampler_wrap_and_reset()
+    test_clock_not_advancing()
+
+    print("所有计数器速率采样测试通过！")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""tasklist CSV解析测试脚本
+
+检查iter_tasklist_rows()对普通输出和/V详细输出的解析，包括带引号和逗号的取值、中文输出和提示信息行；
+ProcessTable从流式输出建立PID索引；ProcessTableCache在缓存有效期内复用快照；
+SoftwareInfo按PID查询时只查询单个进程，批量查询共用一次快照。
+不需要Windows，也不启动任何命令。
+
+用法:
+    python examples/test_tasklist.py
+"""
+
+import os
+import sys
+
+# 将项目根目录添加到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from wsc.cache import CommandCache, create_boot_only_cache
+from wsc.executor import CommandExecutor
+from wsc.software import SoftwareInfo
+from wsc.tasklist import (iter_tasklist_rows, build_pid_query, ProcessTable, ProcessTableCache,
+                          TASKLIST_CMD, TASKLIST_VERBOSE_CMD)
+
+TASKLIST_BASIC = '''\
+"System Idle Process","0","Services","0","8 K"
+"System","4","Services","0","2,188 K"
+"chrome.exe","1234","Console","1","210,400 K"
+'''
+
+TASKLIST_VERBOSE = '''\
+"System Idle Process","0","Services","0","8 K","Unknown","NT AUTHORITY\\SYSTEM","10:00:00","N/A"
+"System","4","Services","0","2,188 K","Unknown","N/A","0:05:00","N/A"
+"chrome.exe","1234","Console","1","210,400 K","Running","PC\\alice","0:01:02","Inbox, 3 unread - ""Mail"""
+'''
+
+TASKLIST_ZH = '''\
+"System Idle Process","0","Services","0","8 K","未知","NT AUTHORITY\\SYSTEM","10:00:00","暂缺"
+"微信.exe","5678","Console","1","150,000 K","正在运行","PC\\张三","0:00:30","微信"
+'''
+
+NO_TASKS = 'INFO: No tasks are running which match the specified criteria.\n'
+
+
+class FakeTasklistExecutor(CommandExecutor):
+    """返回固定tasklist输出并记录命令的执行器"""
+
+    def __init__(self, cache=None):
+        super().__init__(max_workers=1, cache=CommandCache() if cache is None else cache)
+        self.commands = []
+
+    @staticmethod
+    def output(cmd):
+        if '/FI "PID eq 1234"' in cmd:
+            return (TASKLIST_VERBOSE if '/V' in cmd else TASKLIST_BASIC).split('\n')[2] + '\n'
+        if '/FI' in cmd:
+            return NO_TASKS
+        return TASKLIST_VERBOSE if '/V' in cmd else TASKLIST_BASIC
+
+    def _execute(self, cmd):
+        self.commands.append(cmd)
+        return self.output(cmd)
+
+    def stream(self, cmd):
+        self.commands.append('stream ' + cmd)
+        yield from self.output(cmd).split('\n')
+
+
+def test_basic_rows():
+    """普通输出只有前5列，其余字段为空字符串，pid为整数"""
+    print("=== 测试普通输出 ===")
+    rows = list(iter_tasklist_rows(TASKLIST_BASIC.split('\n')))
+    assert [row["pid"] for row in rows] == [0, 4, 1234]
+    chrome = rows[2]
+    assert chrome["name"] == "chrome.exe"
+    assert (chrome["session_name"], chrome["session_number"], chrome["mem_usage"]) == ("Console", "1", "210,400 K")
+    assert (chrome["status"], chrome["username"], chrome["cpu_time"], chrome["window_title"]) == ("", "", "", "")
+    print()
+
+
+def test_verbose_rows():
+    """详细输出：带逗号和转义引号的窗口标题作为一个字段"""
+    print("=== 测试详细输出 ===")
+    rows = list(iter_tasklist_rows(TASKLIST_VERBOSE.split('\n')))
+    chrome = rows[2]
+    print(f"窗口标题: {chrome['window_title']}")
+    assert chrome["window_title"] == 'Inbox, 3 unread - "Mail"'
+    assert (chrome["status"], chrome["username"], chrome["cpu_time"]) == ("Running", "PC\\alice", "0:01:02")
+    assert rows[0]["username"] == "NT AUTHORITY\\SYSTEM"
+    print()
+
+
+def test_chinese_and_info_rows():
+    """中文输出按列位置解析；提示信息、空行和PID不是数字的行被跳过"""
+    print("=== 测试中文输出和提示信息 ===")
+    rows = list(iter_tasklist_rows(TASKLIST_ZH.split('\n')))
+    assert [(row["name"], row["pid"], row["username"]) for row in rows] == [
+        ("System Idle Process", 0, "NT AUTHORITY\\SYSTEM"), ("微信.exe", 5678, "PC\\张三")]
+    assert list(iter_tasklist_rows(NO_TASKS.split('\n'))) == []
+    assert list(iter_tasklist_rows(['', '"a","b","c","d","e"', '"x","1"'])) == []
+    # \r\n换行的输出得到相同的结果
+    assert list(iter_tasklist_rows(TASKLIST_VERBOSE.replace('\n', '\r\n').split('\n'))) == \
+        list(iter_tasklist_rows(TASKLIST_VERBOSE.split('\n')))
+    print()
+
+
+def test_process_table():
+    """ProcessTable从任意行迭代器建立PID索引，PID可以是数字字符串"""
+    print("=== 测试进程表 ===")
+    table = ProcessTable(line for line in TASKLIST_BASIC.split('\n'))
+    assert len(table.processes) == 3
+    assert table.get(1234)["name"] == "chrome.exe"
+    assert table.get("4")["name"] == "System"
+    assert table.get(99) is None
+    assert table.get("abc") is None
+    assert table.get(None) is None
+    print()
+
+
+def test_pid_query():
+    """单个进程的查询命令只接受整数PID"""
+    print("=== 测试单个进程查询命令 ===")
+    assert build_pid_query(1234) == 'tasklist /FO CSV /NH /FI "PID eq 1234"'
+    assert build_pid_query("1234", verbose=True) == 'tasklist /V /FO CSV /NH /FI "PID eq 1234"'
+    assert build_pid_query('1" & calc') is None
+    assert build_pid_query(None) is None
+    print()
+
+
+def test_process_table_cache():
+    """快照在缓存策略的有效期内复用，有效期为0时每次重新读取"""
+    print("=== 测试进程快照复用 ===")
+    executor = FakeTasklistExecutor()
+    tables = ProcessTableCache(executor)
+    assert tables.peek(TASKLIST_CMD) is None
+    first = tables.get(TASKLIST_CMD)
+    assert tables.get(TASKLIST_CMD) is first
+    assert tables.peek(TASKLIST_CMD) is first
+    assert executor.commands == ['stream ' + TASKLIST_CMD]
+
+    executor = FakeTasklistExecutor(cache=create_boot_only_cache())
+    tables = ProcessTableCache(executor)
+    tables.get(TASKLIST_CMD)
+    tables.get(TASKLIST_CMD)
+    assert tables.peek(TASKLIST_CMD) is None
+    assert executor.commands == ['stream ' + TASKLIST_CMD] * 2
+    print()
+
+
+def test_software_info_lookups():
+    """单个PID只查询这个进程，批量查询共用一次快照，已有快照时单个查询不再启动tasklist"""
+    print("=== 测试SoftwareInfo进程查询 ===")
+    executor = FakeTasklistExecutor()
+    software = SoftwareInfo(executor)
+    chrome = software.get_process_info(1234)
+    assert chrome["window_title"] == 'Inbox, 3 unread - "Mail"'
+    assert software.get_process_info(99) is None
+    assert software.get_process_info("1; calc") is None
+    assert executor.commands == [build_pid_query(1234, True), build_pid_query(99, True)]
+
+    result = software.get_processes_info([4, 1234, 99], verbose=False)
+    assert result[1234]["name"] == "chrome.exe" and result[1234]["username"] == ""
+    assert result[99] is None
+    assert executor.commands[-1] == 'stream ' + TASKLIST_CMD
+
+    # 普通快照有效期内，不需要详细字段的单个查询直接使用快照
+    count = len(executor.commands)
+    assert software.get_process_info(4, verbose=False)["name"] == "System"
+    assert len(executor.commands) == count
+
+    result = software.get_processes_info([0, 4])
+    assert result[0]["cpu_time"] == "10:00:00"
+    assert executor.commands[-1] == 'stream ' + TASKLIST_VERBOSE_CMD
+    assert software.get_process_info(1234)["username"] == "PC\\alice"
+    assert executor.commands[-1] == 'stream ' + TASKLIST_VERBOSE_CMD
+    print()
+
+
+def main():
+    """主测试函数"""
+    print("开始测试tasklist解析...\n")
+
+    test_basic_rows()
+    test_verbose_rows()
+    test_chinese_and_info_rows()
+    test_process_table()
+    test_pid_query()
+    test_process_table_cache()
+    test_software_info_lookups()
+
+    print("所有tasklist解析测试通过！")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""变化监视测试脚本
+
+用固定的采样序列检查DeltaTracker和watch()输出的新增、移除和变化事件，
+覆盖按标识索引的列表条目、标识重复的条目、字典和单个值。不需要Windows，也不启动任何命令。
+
+用法:
+    python examples/test_watch.py
+"""
+
+import os
+import sys
+
+# 将项目根目录添加到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from wsc.watch import DeltaTracker, get_identity, watch
+
+CONNECTIONS = [
+    {"proto": "TCP", "local_addr": "10.0.0.2:50000", "foreign_addr": "1.1.1.1:443", "state": "ESTABLISHED", "pid": 100},
+    {"proto": "TCP", "local_addr": "0.0.0.0:3389", "foreign_addr": "0.0.0.0:0", "state": "LISTENING", "pid": 200},
+]
+
+
+def events_by_type(events):
+    """按事件类型分组，便于断言"""
+    grouped = {"add": [], "remove": [], "change": []}
+    for event in events:
+        grouped[event["event"]].append(event)
+    return grouped
+
+
+def test_identity():
+    """连接按五元组标识，进程按PID标识，没有标识字段的条目使用自身的指纹"""
+    print("=== 测试条目标识 ===")
+    assert get_identity(CONNECTIONS[0]) == ("TCP", "10.0.0.2:50000", "1.1.1.1:443")
+    assert get_identity({"pid": 4, "name": "System"}) == 4
+    assert get_identity({"a": [1, 2]}) == (("a", (1, 2)),)
+    print()
+
+
+def test_first_sample_adds_everything():
+    """第一次采样的所有条目都以add事件输出"""
+    print("=== 测试第一次采样 ===")
+    tracker = DeltaTracker()
+    events = tracker.update([dict(item) for item in CONNECTIONS])
+    print(f"事件数量: {len(events)}")
+    assert [event["event"] for event in events] == ["add", "add"]
+    assert events[0]["value"]["pid"] == 100
+    assert tracker.update([dict(item) for item in CONNECTIONS]) == []
+    print()
+
+
+def test_added_removed_changed():
+    """相邻两次采样之间的新增、移除和变化条目"""
+    print("=== 测试新增、移除和变化 ===")
+    tracker = DeltaTracker()
+    tracker.update([dict(item) for item in CONNECTIONS])
+
+    current = [dict(CONNECTIONS[0], state="CLOSE_WAIT"),
+               {"proto": "UDP", "local_addr": "0.0.0.0:53", "foreign_addr": "*:*", "state": "", "pid": 300}]
+    grouped = events_by_type(tracker.update(current))
+    print(f"新增 {len(grouped['add'])}，移除 {len(grouped['remove'])}，变化 {len(grouped['change'])}")
+
+    assert [event["key"] for event in grouped["add"]] == [("UDP", "0.0.0.0:53", "*:*")]
+    assert [event["key"] for event in grouped["remove"]] == [("TCP", "0.0.0.0:3389", "0.0.0.0:0")]
+    assert grouped["remove"][0]["value"]["state"] == "LISTENING"
+    change, = grouped["change"]
+    assert change["key"] == ("TCP", "10.0.0.2:50000", "1.1.1.1:443")
+    # change事件只列出变化的字段
+    assert change["changes"] == {"state": ["ESTABLISHED", "CLOSE_WAIT"]}
+    print()
+
+
+def test_duplicate_identities():
+    """标识重复的条目按出现次序区分，移除其中一个只产生一个remove事件"""
+    print("=== 测试重复标识 ===")
+    tracker = DeltaTracker()
+    tracker.update([{"name": "svchost.exe", "mem": 1}, {"name": "svchost.exe", "mem": 2}])
+    events = tracker.update([{"name": "svchost.exe", "mem": 1}])
+    assert [event["event"] for event in events] == ["remove"]
+    assert events[0]["key"] == ("svchost.exe", 2)
+    print()
+
+
+def test_dicts_and_scalars():
+    """字典按键比较，单个值变化时change事件包含旧值"""
+    print("=== 测试字典和单个值 ===")
+    tracker = DeltaTracker()
+    tracker.update({"cpu": 10, "mem": 50})
+    grouped = events_by_type(tracker.update({"cpu": 20, "disk": 1}))
+    assert [(event["key"], event["value"], event["old"]) for event in grouped["change"]] == [("cpu", 20, 10)]
+    assert [event["key"] for event in grouped["add"]] == ["disk"]
+    assert [event["key"] for event in grouped["remove"]] == ["mem"]
+
+    tracker = DeltaTracker()
+    assert tracker.update("Running")[0]["event"] == "add"
+    assert tracker.update("Running") == []
+    event, = tracker.update("Stopped")
+    assert (event["event"], event["value"], event["old"]) == ("change", "Stopped", "Running")
+    print()
+
+
+def test_watch_emits_events():
+    """watch()按采样次数运行，每个事件带有时间戳和字段路径"""
+    print("=== 测试watch() ===")
+    samples = iter([[{"pid": 1}], [{"pid": 1}, {"pid": 2}], [{"pid": 2}]])
+    emitted = []
+    watch(lambda: next(samples), interval=0, emit=emitted.append, count=3, label="software.processes")
+    assert [(event["event"], event["key"]) for event in emitted] == [("add", 1), ("add", 2), ("remove", 1)]
+    assert all(event["path"] == "software.processes" and "ts" in event for event in emitted)
+    print()
+
+
+def main():
+    """主测试函数"""
+    print("开始测试变化监视...\n")
+
+    test_identity()
+    test_first_sample_adds_everything()
+    test_added_removed_changed()
+    test_duplicate_identities()
+    test_dicts_and_scalars()
+    test_watch_emits_events()
+
+    print("所有变化监视测试通过！")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,71 +3,167 @@
 # 版本信息
 __version__ = "0.1.1"
 
-# 导入主要类
-from .system import SystemInfo
-from .hardware import HardwareInfo
-from .configuration import ConfigurationInfo
-from .software import SoftwareInfo
-from .network import NetworkInfo
-from .security import SecurityInfo
-
-# 导入多语言支持
+import importlib
+import sys
+import threading
+import types
+
+# 导入多语言支持，翻译目录在第一次翻译消息时才加载
 from .i18n import _, set_language, get_supported_languages
 
-# 导入工具函数
-from .utils import (
-    format_bytes,
-    format_timestamp,
-    read_registry_value,
-    get_registry_subkeys,
-    get_registry_values,
-    safe_int,
-    safe_float
-)
-
-# 定义默认导出
-default_system_info = SystemInfo()
-default_hardware_info = HardwareInfo()
-default_configuration_info = ConfigurationInfo()
-default_software_info = SoftwareInfo()
-default_network_info = NetworkInfo()
-default_security_info = SecurityInfo()
+# 延迟导入的公开名称到所在子模块的映射，子模块在第一次访问对应属性时才导入
+_LAZY_IMPORTS = {
+    # 主要类
+    "SystemInfo": "system",
+    "HardwareInfo": "hardware",
+    "ConfigurationInfo": "configuration",
+    "SoftwareInfo": "software",
+    "NetworkInfo": "network",
+    "SecurityInfo": "security",
+    # 共享命令执行器
+    "CommandExecutor": "executor",
+    "get_default_executor": "executor",
+    "CommandCache": "cache",
+    "BOOT_TTL": "cache",
+    # 按需采集快照
+    "LazyMapping": "snapshot",
+    "LazySnapshot": "snapshot",
+    "get_path": "snapshot",
+    # 异步接口
+    "AsyncWSC": "aio",
+    # 吞吐量采样
+    "CounterRateSampler": "sampling",
+    "NetworkStatsSampler": "sampling",
+    "InterfaceTrafficSampler": "sampling",
+    # 已安装程序增量清单
+    "InstalledProgramInventory": "inventory",
+    # 注册表后端
+    "WinregBackend": "registry",
+    "HiveBackend": "registry",
+    "RegfHive": "regf",
+    "get_default_registry_backend": "registry",
+    "set_default_registry_backend": "registry",
+    # 常驻守护进程
+    "SnapshotDaemon": "daemon",
+    "DaemonClient": "daemon",
+    # 工具函数
+    "format_bytes": "utils",
+    "format_timestamp": "utils",
+    "read_registry_value": "utils",
+    "get_registry_subkeys": "utils",
+    "get_registry_values": "utils",
+    "iter_registry_subtree": "utils",
+    "safe_int": "utils",
+    "safe_float": "utils",
+}
+
+# 默认信息类实例到信息类名称的映射，实例在第一次访问时才创建
+_DEFAULT_INSTANCES = {
+    "default_system_info": "SystemInfo",
+    "default_hardware_info": "HardwareInfo",
+    "default_configuration_info": "ConfigurationInfo",
+    "default_software_info": "SoftwareInfo",
+    "default_network_info": "NetworkInfo",
+    "default_security_info": "SecurityInfo",
+}
+
+_default_lock = threading.Lock()
+
+
+class _LazyModule(types.ModuleType):
+    """按需导入子模块、按需创建默认实例的包模块类型"""
+
+    def __getattr__(self, name):
+        if name in _LAZY_IMPORTS:
+            module = importlib.import_module("." + _LAZY_IMPORTS[name], __name__)
+            value = getattr(module, name)
+        elif name in _DEFAULT_INSTANCES:
+            with _default_lock:
+                value = self.__dict__.get(name)
+                if value is None:
+                    value = getattr(self, _DEFAULT_INSTANCES[name])()
+        else:
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+        # 保存到模块字典，之后的访问不再经过__getattr__
+        setattr(self, name, value)
+        return value
+
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | set(_LAZY_IMPORTS) | set(_DEFAULT_INSTANCES))
+
+
+# 替换模块类型，使模块级属性访问支持延迟加载（兼容不支持模块__getattr__的Python 3.6）
+sys.modules[__name__].__class__ = _LazyModule
+
+
+def _get_default_instance(name):
+    """获取默认信息类实例，第一次调用时才创建
+    
+    Args:
+        name: 默认实例名称，如'default_system_info'
+        
+    Returns:
+        信息类实例
+    """
+    return getattr(sys.modules[__name__], name)
 
 # 导出便捷函数
-def get_system_info():
+def get_system_info(max_workers=None):
     """获取系统基本信息"""
-    return default_system_info.get_all_info()
+    return _get_default_instance("default_system_info").get_all_info(max_workers)
 
-def get_hardware_info():
+def get_hardware_info(max_workers=None):
     """获取硬件信息"""
-    return default_hardware_info.get_all_hardware_info()
+    return _get_default_instance("default_hardware_info").get_all_hardware_info(max_workers)
 
-def get_configuration_info():
+def get_configuration_info(max_workers=None):
     """获取系统配置信息"""
-    return default_configuration_info.get_all_configuration()
+    return _get_default_instance("default_configuration_info").get_all_configuration(max_workers)
 
-def get_software_info():
+def get_software_info(max_workers=None):
     """获取软件信息"""
-    return default_software_info.get_all_software_info()
+    return _get_default_instance("default_software_info").get_all_software_info(max_workers)
 
-def get_network_info():
+def get_network_info(max_workers=None):
     """获取网络信息"""
-    return default_network_info.get_all_network_info()
+    return _get_default_instance("default_network_info").get_all_network_info(max_workers)
 
-def get_security_info():
+def get_security_info(max_workers=None):
     """获取安全信息"""
-    return default_security_info.get_all_security_info()
+    return _get_default_instance("default_security_info").get_all_security_info(max_workers)
 
-def get_all_info():
-    """获取所有系统信息"""
-    return {
-        "system": get_system_info(),
-        "hardware": get_hardware_info(),
-        "configuration": get_configuration_info(),
-        "software": get_software_info(),
-        "network": get_network_info(),
-        "security": get_security_info()
+def get_all_info(max_workers=None, lazy=False):
+    """获取所有系统信息
+    
+    各模块及模块内的采集方法通过共享执行器并行执行，同时运行的命令数量受执行器并发上限约束。
+    
+    Args:
+        max_workers: 并行采集的线程数量，默认使用执行器的并发上限，为1时按顺序采集
+        lazy: 为True时返回按需采集的LazySnapshot，只有被读取的字段才会执行采集
+    """
+    if lazy:
+        return get_snapshot()
+    sections = {
+        "system": lambda: get_system_info(max_workers),
+        "hardware": lambda: get_hardware_info(max_workers),
+        "configuration": lambda: get_configuration_info(max_workers),
+        "software": lambda: get_software_info(max_workers),
+        "network": lambda: get_network_info(max_workers),
+        "security": lambda: get_security_info(max_workers)
     }
+    from .executor import get_default_executor
+    return get_default_executor().collect(sections, max_workers)
+
+def get_snapshot():
+    """获取按需采集的系统信息快照
+    
+    Returns:
+        LazySnapshot实例，结构与get_all_info()的返回值一致，调用materialize()可并行采集全部字段
+    """
+    from .snapshot import LazySnapshot
+    return LazySnapshot({
+        section: _get_default_instance(f"default_{section}_info") for section in _CLI_SECTIONS
+    })
 
 def main():
     """WSC库的命令行入口点"""
@@ -89,6 +185,21 @@ def main():
         # 移除语言选项，避免影响后续命令处理
         del sys.argv[lang_index:lang_index + 2]
     
+    # 处理--fields选项，只采集指定字段
+    fields = _pop_option(sys.argv, ['--fields', '-f'])
+    
+    # 处理--no-daemon选项，不向守护进程查询，直接在本进程中采集
+    use_daemon = not _pop_option(sys.argv, ['--no-daemon'], has_value=False)
+    
+    # 处理网络连接的过滤和汇总选项，以及防火墙规则的查询选项
+    try:
+        # --remote-port同时是两者的选项，先取出防火墙规则的查询选项
+        firewall_options = _pop_firewall_options(sys.argv) if _is_command(sys.argv, "security", "firewall") else None
+        connection_options = _pop_connection_options(sys.argv)
+    except ValueError as e:
+        print(_("无效的选项值: %s") % e)
+        sys.exit(1)
+    
     # 检查是否请求帮助
     if len(sys.argv) >= 2 and sys.argv[1] in ['--help', '-h']:
         print(_("Windows System Configuration (WSC) v") + __version__)
@@ -102,6 +213,8 @@ def main():
         print(_("  security    - 获取安全信息"))
         print(_("  all         - 获取所有系统信息"))
         print(_("  version     - 显示版本信息"))
+        print(_("  serve       - 启动常驻守护进程，在后台定时采集并应答查询"))
+        print(_("  watch       - 按间隔采样并以NDJSON格式输出变化"))
         print(_("\n可用选项:"))
         print(_("  system <选项>:"))
         print(_("    basic      - 只显示基本系统信息"))
@@ -115,19 +228,33 @@ def main():
         print(_("  network <选项>:"))
         print(_("    adapters   - 只显示传统网络适配器信息"))
         print(_("    nic        - 只显示优化的网卡信息（推荐）"))
+        print(_("      --traffic  - 附加每个网卡的流量计数器"))
+        print(_("      --rate [--interval <秒>] [--count <次数>] - 按间隔输出每个网卡的每秒吞吐量"))
         print(_("    ip         - 只显示IP地址信息"))
         print(_("    stats      - 只显示网络统计信息"))
+        print(_("      --rate [--interval <秒>] [--count <次数>] - 按间隔输出每秒吞吐量和平均吞吐量"))
         print(_("    connections - 只显示网络连接信息"))
+        print(_("      --proto/--state/--local-port/--remote-port/--pid <值> - 过滤连接，多个值用逗号分隔"))
+        print(_("      --limit <数量> - 最多显示的连接数量"))
+        print(_("      --with-process - 按PID加入进程映像名称和会话，只额外启动一次tasklist"))
+        print(_("      --summary [--group-by <字段>] [--top <数量>] - 只显示按字段汇总的连接数量，默认按state汇总"))
         print(_("  security <选项>:"))
         print(_("    users      - 只显示用户账户信息"))
         print(_("    groups     - 只显示用户组信息"))
         print(_("    current    - 只显示当前用户信息"))
         print(_("    sid        - 只显示当前用户SID信息"))
         print(_("    uac        - 只显示UAC设置"))
+        print(_("    firewall   - 只显示防火墙规则"))
+        print(_("      --port/--remote-port/--address/--local-address <值> - 查询匹配端口或地址的规则，考虑范围、子网和Any"))
+        print(_("      --direction/--action/--profile/--protocol/--program <值> - 按方向、操作、配置文件、协议或程序过滤规则"))
+        print(_("  --fields, -f <字段> - 只采集并显示指定字段，如 hardware.cpu,network.hostname"))
+        print(_("  --no-daemon - 不查询守护进程，直接采集"))
+        print(_("  serve --port <端口> - 指定守护进程监听的端口"))
+        print(_("  watch <模块> [选项] | <字段> --interval <秒> [--count <次数>] - 监视变化，如 watch network connections --interval 1"))
         print(_("  --lang, -l  - 设置显示语言（zh_CN 或 en_US）"))
         sys.exit(0)
     
-    if len(sys.argv) < 2:
+    if len(sys.argv) < 2 and fields is None:
         print(_("Windows System Configuration (WSC) v") + __version__)
         print(_("使用方法: wsc <命令> [选项]"))
         print(_("可用命令:"))
@@ -139,10 +266,12 @@ def main():
         print(_("  security    - 获取安全信息"))
         print(_("  all         - 获取所有系统信息"))
         print(_("  version     - 显示版本信息"))
+        print(_("  serve       - 启动常驻守护进程，在后台定时采集并应答查询"))
+        print(_("  watch       - 按间隔采样并以NDJSON格式输出变化"))
         print(_("\n使用 wsc --help 查看详细帮助"))
         sys.exit(0)
     
-    command = sys.argv[1].lower()
+    command = sys.argv[1].lower() if len(sys.argv) >= 2 else None
     
     # 处理带选项的命令
     subcommand = None
@@ -151,113 +280,379 @@ def main():
     
     if command == "version":
         print(_("Windows System Configuration (WSC) v") + __version__)
-    elif command == "system":
-        system_info = get_system_info()
-        if subcommand == "basic":
-            # 只显示基本系统信息
-            basic_info = {
-                "os_name": system_info.get("os_name", ""),
-                "os_version": system_info.get("os_version", ""),
-                "os_architecture": system_info.get("os_architecture", ""),
-                "computer_name": system_info.get("computer_name", ""),
-                "boot_time": system_info.get("boot_time", "")
-            }
-            print(json.dumps(basic_info, ensure_ascii=False, indent=2))
-        elif subcommand == "os":
-            # 只显示操作系统详细信息
-            os_info = {
-                "os_name": system_info.get("os_name", ""),
-                "os_version": system_info.get("os_version", ""),
-                "os_architecture": system_info.get("os_architecture", ""),
-                "os_build": system_info.get("os_build", ""),
-                "os_product_name": system_info.get("os_product_name", ""),
-                "os_release_id": system_info.get("os_release_id", "")
-            }
-            print(json.dumps(os_info, ensure_ascii=False, indent=2))
-        else:
-            # 显示所有系统信息
-            print(json.dumps(system_info, ensure_ascii=False, indent=2))
-    elif command == "hardware":
-        hardware_info = get_hardware_info()
-        if subcommand == "cpu":
-            # 只显示CPU信息
-            print(json.dumps(hardware_info.get('cpu', {}), ensure_ascii=False, indent=2))
-        elif subcommand == "memory":
-            # 只显示内存信息
-            print(json.dumps(hardware_info.get('memory', {}), ensure_ascii=False, indent=2))
-        elif subcommand == "disks":
-            # 只显示磁盘信息
-            print(json.dumps(hardware_info.get('disks', []), ensure_ascii=False, indent=2))
-        elif subcommand == "gpu":
-            # 只显示GPU信息
-            print(json.dumps(hardware_info.get('gpu', []), ensure_ascii=False, indent=2))
-        elif subcommand == "motherboard":
-            # 只显示主板信息
-            print(json.dumps(hardware_info.get('motherboard', {}), ensure_ascii=False, indent=2))
-        else:
-            # 显示所有硬件信息
-            print(json.dumps(hardware_info, ensure_ascii=False, indent=2))
-    elif command == "configuration":
-        print(json.dumps(get_configuration_info(), ensure_ascii=False, indent=2))
-    elif command == "software":
-        print(json.dumps(get_software_info(), ensure_ascii=False, indent=2))
-    elif command == "network":
-        network_info = get_network_info()
-        if subcommand == "adapters":
-            # 只显示传统适配器信息
-            print(json.dumps(network_info['adapters'], ensure_ascii=False, indent=2))
-        elif subcommand == "nic":
-            # 只显示优化的网卡信息
-            print(json.dumps(network_info['nic_info'], ensure_ascii=False, indent=2))
-        elif subcommand == "ip":
-            # 只显示IP地址信息
-            print(json.dumps(network_info['ip_addresses'], ensure_ascii=False, indent=2))
-        elif subcommand == "stats":
-            # 只显示网络统计信息
-            print(json.dumps(network_info['network_stats'], ensure_ascii=False, indent=2))
-        elif subcommand == "connections":
-            # 只显示网络连接信息
-            print(json.dumps(network_info['network_connections'], ensure_ascii=False, indent=2))
-        else:
-            # 显示所有网络信息
-            print(json.dumps(network_info, ensure_ascii=False, indent=2))
-    elif command == "security":
-        security_info = get_security_info()
-        if subcommand == "users":
-            # 只显示用户账户信息
-            print(json.dumps(security_info.get('user_accounts', []), ensure_ascii=False, indent=2))
-        elif subcommand == "groups":
-            # 只显示用户组信息
-            print(json.dumps(security_info.get('user_groups', []), ensure_ascii=False, indent=2))
-        elif subcommand == "current":
-            # 只显示当前用户信息
-            print(json.dumps(security_info.get('current_user', {}), ensure_ascii=False, indent=2))
-        elif subcommand == "sid":
-            # 只显示当前用户SID信息
-            from .security import SecurityInfo
-            security = SecurityInfo()
-            print(json.dumps(security.get_current_user_sid(), ensure_ascii=False, indent=2))
-        elif subcommand == "uac":
-            # 只显示UAC设置
-            print(json.dumps(security_info.get('uac_settings', {}), ensure_ascii=False, indent=2))
+        return
+    
+    if command == "serve":
+        from .daemon import serve
+        port = _pop_option(sys.argv, ['--port'])
+        try:
+            port = _convert_option('--port', port, int, 1, 65535) if port else None
+        except ValueError as e:
+            print(_("无效的选项值: %s") % e)
+            print(_("使用方法: wsc serve [--port <端口>]"))
+            sys.exit(1)
+        serve(port=port)
+        return
+    
+    if command == "watch":
+        _watch(sys.argv[2:])
+        return
+    
+    if command not in _CLI_SECTIONS and command not in (None, "all"):
+        print(_("未知命令: %s") % command)
+        print(_("使用 wsc --help 查看可用命令"))
+        sys.exit(1)
+    
+    if command == "network" and subcommand in ("stats", "nic") and "--rate" in sys.argv:
+        _sample_network_rates(sys.argv[3:], per_interface=(subcommand == "nic"))
+        return
+    
+    if command == "network" and subcommand == "nic" and "--traffic" in sys.argv:
+        result = _get_default_instance("default_network_info").get_nic_info(with_traffic=True)
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+        return
+    
+    if command == "network" and subcommand == "connections" and connection_options is not None:
+        # 过滤和汇总在读取netstat输出的同时完成，直接在本进程中执行
+        try:
+            result = _query_connections(connection_options)
+        except ValueError as e:
+            print(e)
+            sys.exit(1)
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+        return
+    
+    if command == "security" and subcommand == "firewall" and firewall_options is not None:
+        # 在本进程中建立规则索引后查询
+        result = _get_default_instance("default_security_info").find_firewall_rules(**firewall_options)
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+        return
+    
+    # 查询函数接收数据源：守护进程客户端或本进程的按需采集快照
+    if fields is not None:
+        # 按--fields投影，只执行涉及的采集方法，命令为模块名时路径相对于该模块
+        paths = [path.strip() for path in fields.split(',') if path.strip()]
+        if command in _CLI_SECTIONS:
+            query = lambda source: source.project([f"{command}.{path}" for path in paths])[command]
         else:
-            # 显示所有安全信息
-            print(json.dumps(security_info, ensure_ascii=False, indent=2))
+            query = lambda source: source.project(paths)
     elif command == "all":
-        print(json.dumps(get_all_info(), ensure_ascii=False, indent=2))
+        query = lambda source: source.materialize()
     else:
-        print(_("未知命令: %s") % command)
-        print(_("使用 wsc --help 查看可用命令"))
+        # 子命令只执行对应的采集方法，未知子命令显示整个模块
+        view = _CLI_VIEWS.get((command, subcommand), command)
+        query = lambda source: _render_view(view, source)
+    
+    try:
+        result = _run_query(query, use_daemon)
+    except KeyError as e:
+        print(_("未知字段: %s") % e.args[0])
         sys.exit(1)
+    
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+# 命令行支持的模块命令
+_CLI_SECTIONS = ("system", "hardware", "configuration", "software", "network", "security")
+
+# 命令行子命令到所需字段的映射，只有这些字段对应的采集方法会被执行
+# 值为字符串时输出该路径的值，为字典时输出由多个路径组成的字典，为函数时输出函数的返回值
+_CLI_VIEWS = {
+    ("system", "basic"): {
+        "os_name": "system.os_name",
+        "os_version": "system.os_version",
+        "os_architecture": "system.os_architecture",
+        "computer_name": "system.computer_name",
+        "boot_time": "system.boot_time"
+    },
+    ("system", "os"): {
+        "os_name": "system.os_name",
+        "os_version": "system.os_version",
+        "os_architecture": "system.os_architecture",
+        "os_build": "system.os_build",
+        "os_product_name": "system.os_product_name",
+        "os_release_id": "system.os_release_id"
+    },
+    ("hardware", "cpu"): "hardware.cpu",
+    ("hardware", "memory"): "hardware.memory",
+    ("hardware", "disks"): "hardware.disks",
+    ("hardware", "gpu"): "hardware.gpus",
+    ("hardware", "motherboard"): "hardware.motherboard",
+    ("network", "adapters"): "network.adapters",
+    ("network", "nic"): "network.nic_info",
+    ("network", "ip"): "network.ip_addresses",
+    ("network", "stats"): "network.network_stats",
+    ("network", "connections"): "network.network_connections",
+    ("security", "users"): "security.user_accounts",
+    ("security", "groups"): "security.user_groups",
+    ("security", "current"): "security.current_user",
+    ("security", "sid"): lambda: _get_default_instance("default_security_info").get_current_user_sid(),
+    ("security", "uac"): "security.uac_settings",
+    ("security", "firewall"): "security.firewall_rules"
+}
+
+def _pop_option(argv, names, has_value=True):
+    """从命令行参数中取出选项，避免影响后续命令处理
+    
+    Args:
+        argv: 命令行参数列表，会被原地修改
+        names: 选项名称列表，如['--fields']
+        has_value: 选项是否带有值
+        
+    Returns:
+        带值选项返回选项值，不带值选项返回True，选项不存在时返回None
+    """
+    for i, arg in enumerate(argv):
+        if arg in names:
+            if not has_value:
+                del argv[i]
+                return True
+            if i + 1 < len(argv):
+                value = argv[i + 1]
+                del argv[i:i + 2]
+                return value
+    return None
+
+def _convert_option(name, value, convert, minimum=None, maximum=None):
+    """把数字选项的值转换为数字并检查范围
+    
+    Args:
+        name: 选项名称，如'--port'
+        value: 命令行中的原始值
+        convert: 转换函数，如int或float
+        minimum: 允许的最小值，为None时不检查
+        maximum: 允许的最大值，为None时不检查
+        
+    Returns:
+        转换后的数字
+        
+    Raises:
+        ValueError: 值无法转换或超出范围，异常信息为选项名称和原始值
+    """
+    try:
+        number = convert(value)
+    except ValueError:
+        raise ValueError(f"{name} {value}")
+    # 用not (>=)的写法让NaN也被视为超出范围
+    if (minimum is not None and not number >= minimum) or (maximum is not None and not number <= maximum):
+        raise ValueError(f"{name} {value}")
+    return number
+
+# 网络连接过滤选项到iter_network_connections()参数和值转换函数的映射
+_CONNECTION_FILTER_OPTIONS = {
+    "--proto": ("proto", str.upper),
+    "--state": ("state", str.upper),
+    "--local-port": ("local_port", int),
+    "--remote-port": ("remote_port", int),
+    "--pid": ("pid", int)
+}
+
+def _pop_connection_options(argv):
+    """取出网络连接的过滤和汇总选项
+    
+    Args:
+        argv: 命令行参数列表，会被原地修改
+        
+    Returns:
+        包含filters、summary、group_by、top、limit和with_process的字典，没有任何相关选项时返回None
+    """
+    filters = {}
+    for option, (name, convert) in _CONNECTION_FILTER_OPTIONS.items():
+        value = _pop_option(argv, [option])
+        if value is not None:
+            filters[name] = [convert(item.strip()) for item in value.split(',') if item.strip()]
+    summary = _pop_option(argv, ['--summary'], has_value=False)
+    group_by = _pop_option(argv, ['--group-by'])
+    top = _pop_option(argv, ['--top'])
+    limit = _pop_option(argv, ['--limit'])
+    with_process = _pop_option(argv, ['--with-process'], has_value=False)
+    
+    if not filters and summary is None and group_by is None and limit is None and with_process is None:
+        return None
+    return {
+        "filters": filters,
+        "summary": bool(summary) or group_by is not None,
+        "group_by": [field.strip() for field in group_by.split(',')] if group_by else ["state"],
+        "top": int(top) if top else None,
+        "limit": int(limit) if limit else None,
+        "with_process": bool(with_process)
+    }
+
+# 防火墙规则查询选项到find_firewall_rules()参数和值转换函数的映射
+_FIREWALL_FILTER_OPTIONS = {
+    "--port": ("port", str),
+    "--remote-port": ("remote_port", str),
+    "--address": ("address", str),
+    "--local-address": ("local_address", str),
+    "--direction": ("direction", str),
+    "--action": ("action", str),
+    "--profile": ("profile", str),
+    "--protocol": ("protocol", str),
+    "--program": ("program", str)
+}
+
+def _is_command(argv, command, subcommand):
+    """判断命令行是否为指定的命令和子命令"""
+    return [arg.lower() for arg in argv[1:3]] == [command, subcommand]
+
+def _pop_firewall_options(argv):
+    """取出防火墙规则的查询选项
+    
+    Args:
+        argv: 命令行参数列表，会被原地修改
+        
+    Returns:
+        find_firewall_rules()的参数字典，没有任何查询选项时返回None
+    """
+    options = {}
+    for option, (name, convert) in _FIREWALL_FILTER_OPTIONS.items():
+        value = _pop_option(argv, [option])
+        if value is not None:
+            options[name] = convert(value.strip())
+    return options or None
+
+def _query_connections(options):
+    """按命令行选项过滤或汇总网络连接"""
+    network = _get_default_instance("default_network_info")
+    if options["summary"]:
+        return network.summarize_connections(options["group_by"], options["top"], **options["filters"])
+    return list(network.iter_network_connections(limit=options["limit"], with_process=options["with_process"],
+                                                 **options["filters"]))
+
+def _run_query(query, use_daemon):
+    """优先向守护进程查询，守护进程未运行时在本进程中按需采集
+    
+    Args:
+        query: 接收数据源并返回结果的函数，数据源提供project()和materialize()方法
+        use_daemon: 是否先尝试查询守护进程
+        
+    Returns:
+        查询结果
+    """
+    if use_daemon:
+        from .daemon import DaemonClient
+        try:
+            return query(DaemonClient())
+        except OSError:
+            # 守护进程未运行或连接中断，回退到本地采集
+            pass
+    return query(get_snapshot())
+
+def _watch(args):
+    """命令行watch命令：按间隔采样指定字段，以NDJSON格式输出新增、移除和变化的条目
+    
+    Args:
+        args: watch之后的命令行参数，如['network', 'connections', '--interval', '1']
+    """
+    import sys
+    from .executor import CommandExecutor
+    from .snapshot import LazySnapshot, create_collectors
+    from .cache import create_boot_only_cache
+    from .watch import watch
+    
+    interval = _pop_option(args, ['--interval', '-n'])
+    count = _pop_option(args, ['--count'])
+    try:
+        interval = _convert_option('--interval', interval, float, 0) if interval else 1.0
+        count = _convert_option('--count', count, int, 1) if count else None
+    except ValueError as e:
+        print(_("无效的选项值: %s") % e)
+        args = []
+    if not args:
+        print(_("使用方法: wsc watch <模块> [选项] | <字段> --interval <秒> [--count <次数>]"))
+        sys.exit(1)
+    
+    # 参数为点分隔的路径时直接监视该字段，否则按模块和子命令取对应的视图
+    if '.' in args[0]:
+        view = label = args[0]
+    else:
+        section = args[0].lower()
+        subcommand = args[1].lower() if len(args) >= 2 else None
+        if section not in _CLI_SECTIONS:
+            print(_("未知命令: %s") % section)
+            sys.exit(1)
+        view = _CLI_VIEWS.get((section, subcommand), section)
+        label = view if isinstance(view, str) else f"{section}.{subcommand}"
+    
+    # 监视使用独立的执行器，除开机期间不变的命令外每次采样都重新执行
+    executor = CommandExecutor(cache=create_boot_only_cache())
+    collectors = create_collectors(executor)
+    
+    def sample():
+        return _render_view(view, LazySnapshot(collectors, executor))
+    
+    try:
+        watch(sample, interval, count=count, label=label)
+    except KeyError as e:
+        print(_("未知字段: %s") % e.args[0])
+        sys.exit(1)
+    except KeyboardInterrupt:
+        pass
+
+def _sample_network_rates(args, per_interface=False):
+    """命令行network stats/nic --rate：按间隔输出网络吞吐量，每行一个JSON对象
+    
+    Args:
+        args: stats或nic之后的命令行参数，如['--rate', '--interval', '1']
+        per_interface: 为True时输出每个网卡的吞吐量，按网卡名称分组
+    """
+    import json
+    import sys
+    import time
+    from .sampling import NetworkStatsSampler, InterfaceTrafficSampler
+    
+    _pop_option(args, ['--rate'], has_value=False)
+    interval = _pop_option(args, ['--interval', '-n'])
+    count = _pop_option(args, ['--count'])
+    try:
+        interval = _convert_option('--interval', interval, float, 0) if interval else 1.0
+        count = _convert_option('--count', count, int, 1) if count else None
+    except ValueError as e:
+        print(_("无效的选项值: %s") % e)
+        print(_("使用方法: wsc network stats|nic --rate [--interval <秒>] [--count <次数>]"))
+        sys.exit(1)
+    
+    sampler = InterfaceTrafficSampler() if per_interface else NetworkStatsSampler()
+    # 每个网卡的速率按GUID分组，输出时换成网卡名称
+    names = getattr(sampler, "names", {})
+    rename = lambda rates: {names.get(key, key): value for key, value in rates.items()}
+    sampler.sample()
+    ticks = 0
+    try:
+        while count is None or ticks < count:
+            time.sleep(interval)
+            rates = sampler.sample()
+            ticks += 1
+            if rates is None:
+                continue
+            line = {"ts": time.time(), "rates": rename(rates), "average": rename(sampler.get_average())}
+            sys.stdout.write(json.dumps(line, ensure_ascii=False) + '\n')
+            sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+
+def _render_view(view, source):
+    """按命令行视图只采集需要的字段并组装输出"""
+    from .snapshot import get_path
+    if callable(view):
+        return view()
+    if isinstance(view, dict):
+        projected = source.project(list(view.values()), default="")
+        return {key: get_path(projected, path) for key, path in view.items()}
+    return get_path(source.project([view]), view)
 
 # 添加简化的库名引用
 class WSC:
     """Windows System Configuration (WSC) 简化访问类"""
     
     @staticmethod
-    def get_all_info():
+    def get_all_info(max_workers=None, lazy=False):
         """获取所有系统信息"""
-        return get_all_info()
+        return get_all_info(max_workers, lazy)
+    
+    @staticmethod
+    def get_snapshot():
+        """获取按需采集的系统信息快照"""
+        return get_snapshot()
     
     @staticmethod
     def get_system_info():
@@ -316,6 +711,17 @@ __all__ = [
     "NetworkInfo",
     "SecurityInfo",
     "WSC",
+    "AsyncWSC",
+    "SnapshotDaemon",
+    "CounterRateSampler",
+    "NetworkStatsSampler",
+    "InterfaceTrafficSampler",
+    "DaemonClient",
+    "LazyMapping",
+    "LazySnapshot",
+    "CommandExecutor",
+    "CommandCache",
+    "BOOT_TTL",
     
     # 便捷函数
     "get_system_info",
@@ -325,6 +731,8 @@ __all__ = [
     "get_network_info",
     "get_security_info",
     "get_all_info",
+    "get_snapshot",
+    "get_default_executor",
     
     # 工具函数
     "format_bytes",
@@ -332,6 +740,7 @@ __all__ = [
     "read_registry_value",
     "get_registry_subkeys",
     "get_registry_values",
+    "iter_registry_subtree",
     "safe_int",
     "safe_float",
     
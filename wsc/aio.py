@@ -0,0 +1,274 @@
+"""asyncio异步接口模块
+
+异步接口复用同步信息类的解析逻辑，命令通过asyncio子进程并发执行，不会阻塞事件循环。
+同步采集方法在线程池中以"重放"方式运行：尚未获取的命令先被记录下来并返回空输出，
+记录到的命令并发执行完毕后再重新运行采集方法，直到所有命令的输出都已就绪。
+因此异步接口的结果与同步接口完全一致。
+
+同一次调用的各轮重放共享同一个信息类实例，实例内按命令输出缓存的解析结果只在输出变化时重新解析，
+导出配置文件、读取注册表等有副作用或开销较大的步骤不会在每一轮重复执行。
+每个方法最后一轮用到的命令会被记录为执行计划，之后的调用先并发获取计划中的全部命令，
+通常只需要一轮重放。
+"""
+
+import asyncio
+import inspect
+import subprocess
+import weakref
+from .executor import get_default_executor
+from .system import SystemInfo
+from .hardware import HardwareInfo
+from .configuration import ConfigurationInfo
+from .software import SoftwareInfo
+from .network import NetworkInfo
+from .security import SecurityInfo
+
+# 单次调用最多重放的轮数，正常情况下命令依赖链不超过三层
+MAX_REPLAY_PASSES = 8
+
+
+class _ReplayExecutor:
+    """在线程池中重放同步采集方法的执行器"""
+
+    def __init__(self, outputs, executor):
+        """初始化
+
+        Args:
+            outputs: 已获取的命令输出字典，命令行到输出
+            executor: 同步命令执行器，提供共享的缓存和有副作用命令的执行
+        """
+        self.outputs = outputs
+        self.missing = []
+        self.requested = []
+        self.cache = executor.cache
+        self._executor = executor
+
+    def reset(self):
+        """开始新一轮重放，清空本轮记录的命令"""
+        self.missing = []
+        self.requested = []
+
+    def run(self, cmd):
+        """返回已获取的命令输出，尚未获取的命令记录下来并返回空输出"""
+        if cmd not in self.requested:
+            self.requested.append(cmd)
+        if cmd in self.outputs:
+            return self.outputs[cmd]
+        if cmd not in self.missing:
+            self.missing.append(cmd)
+        return ''
+
+    def run_uncached(self, cmd):
+        """有副作用的命令不参与重放，在重放线程中直接执行"""
+        return self._executor.run_uncached(cmd)
+
+    def stream(self, cmd):
+        """按行返回已获取的命令输出，尚未获取的命令返回空输出
+
+        与CommandExecutor.stream()一样返回生成器，调用者可以提前close()。
+        """
+        output = self.run(cmd)
+        return (line for line in (output.split('\n') if output else []))
+
+    def collect(self, tasks, max_workers=None):
+        """按顺序执行采集函数，命令的并发由重放的每一轮统一调度"""
+        return {name: func() for name, func in tasks.items()}
+
+
+class AsyncCollector:
+    """信息类的异步代理，访问的每个公开方法都返回对应的协程函数"""
+
+    def __init__(self, owner, collector_cls):
+        """初始化
+
+        Args:
+            owner: 所属的AsyncWSC实例
+            collector_cls: 被代理的同步信息类
+        """
+        self._owner = owner
+        self._collector_cls = collector_cls
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        method = getattr(self._collector_cls, name)
+        if not callable(method):
+            raise AttributeError(name)
+
+        async def call(*args, **kwargs):
+            return await self._owner.call(self._collector_cls, name, *args, **kwargs)
+
+        call.__name__ = name
+        call.__doc__ = method.__doc__
+        return call
+
+
+class AsyncWSC:
+    """Windows System Configuration (WSC) 异步访问类"""
+
+    def __init__(self, executor=None, max_workers=None):
+        """初始化
+
+        Args:
+            executor: 同步命令执行器，异步接口与其共享命令输出缓存，默认使用共享执行器
+            max_workers: 同时运行的子进程数量上限，默认与执行器一致
+        """
+        self._executor = executor or get_default_executor()
+        self.max_workers = max_workers or self._executor.max_workers
+        # 事件循环到(子进程信号量, 命令行到执行中任务的字典)，同一实例可以在多个事件循环中使用
+        self._loop_state = weakref.WeakKeyDictionary()
+        # (信息类, 方法名称, 参数)到上一次调用最后一轮用到的命令列表
+        self._plans = {}
+
+        self.system = AsyncCollector(self, SystemInfo)
+        self.hardware = AsyncCollector(self, HardwareInfo)
+        self.configuration = AsyncCollector(self, ConfigurationInfo)
+        self.software = AsyncCollector(self, SoftwareInfo)
+        self.network = AsyncCollector(self, NetworkInfo)
+        self.security = AsyncCollector(self, SecurityInfo)
+
+    async def run_cmd(self, cmd):
+        """使用asyncio子进程执行命令行命令并返回输出
+
+        Args:
+            cmd: 命令行字符串
+
+        Returns:
+            命令的标准输出
+        """
+        cache = self._executor.cache
+        if cache is not None:
+            hit, output = cache.lookup(cmd)
+            if hit:
+                return output
+
+        _, inflight = self._get_loop_state()
+        task = inflight.get(cmd)
+        if task is None:
+            task = asyncio.ensure_future(self._execute(cmd))
+            inflight[cmd] = task
+            task.add_done_callback(lambda _: inflight.pop(cmd, None))
+        return await asyncio.shield(task)
+
+    def _get_loop_state(self):
+        """获取当前事件循环的(子进程信号量, 执行中任务字典)，第一次使用时创建"""
+        loop = asyncio.get_event_loop()
+        state = self._loop_state.get(loop)
+        if state is None:
+            state = (asyncio.Semaphore(self.max_workers), {})
+            self._loop_state[loop] = state
+        return state
+
+    async def _execute(self, cmd):
+        """实际启动asyncio子进程执行命令"""
+        semaphore, _ = self._get_loop_state()
+        async with semaphore:
+            try:
+                process = await asyncio.create_subprocess_shell(
+                    cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            except NotImplementedError:
+                # Python 3.7及以下的默认事件循环不支持子进程，改为在线程池中执行
+                loop = asyncio.get_event_loop()
+                return await loop.run_in_executor(None, self._executor.run, cmd)
+            stdout, _ = await process.communicate()
+            self._executor._count_subprocess()
+
+        output = self._executor.decode_output(stdout)
+        if self._executor.cache is not None:
+            self._executor.cache.store(cmd, output)
+        return output
+
+    async def call(self, collector_cls, method_name, *args, **kwargs):
+        """以异步方式调用同步信息类的方法
+
+        Args:
+            collector_cls: 同步信息类
+            method_name: 方法名称
+            *args: 方法的位置参数
+            **kwargs: 方法的关键字参数
+
+        Returns:
+            与同步调用完全一致的结果
+        """
+        loop = asyncio.get_event_loop()
+        plan_key = (collector_cls, method_name, repr(args), repr(sorted(kwargs.items())))
+        outputs = {}
+        plan = self._plans.get(plan_key)
+        if plan:
+            # 先并发获取上一次用到的全部命令，命令没有变化时只需要一轮重放
+            results = await asyncio.gather(*[self.run_cmd(cmd) for cmd in plan])
+            outputs.update(zip(plan, results))
+
+        replay = _ReplayExecutor(outputs, self._executor)
+        # 各轮共享同一个实例，按命令输出缓存的解析结果在输出就绪后自动失效
+        collector = collector_cls(executor=replay)
+        for _ in range(MAX_REPLAY_PASSES):
+            # 采集方法中的解析和注册表读取是阻塞的，每一轮都在线程池中运行
+            result = await loop.run_in_executor(
+                None, self._replay, replay, collector, method_name, args, kwargs)
+            if not replay.missing:
+                self._plans[plan_key] = list(replay.requested)
+                return result
+
+            missing = replay.missing
+            results = await asyncio.gather(*[self.run_cmd(cmd) for cmd in missing])
+            outputs.update(zip(missing, results))
+
+        raise RuntimeError("命令依赖层数超过上限: %s.%s" % (collector_cls.__name__, method_name))
+
+    @staticmethod
+    def _replay(replay, collector, method_name, args, kwargs):
+        """使用已获取的命令输出运行一轮采集方法
+
+        Returns:
+            方法的返回值，生成器的结果为列表；尚未获取的命令记录在replay.missing中
+        """
+        replay.reset()
+        try:
+            result = getattr(collector, method_name)(*args, **kwargs)
+            # 生成器方法（如iter_firewall_rules）在本轮内读完，才能记录到需要的命令
+            if inspect.isgenerator(result):
+                result = list(result)
+            return result
+        except Exception:
+            # 空输出可能导致解析失败，只要还有未获取的命令就继续下一轮
+            if not replay.missing:
+                raise
+            return None
+
+    async def get_system_info(self):
+        """获取系统基本信息"""
+        return await self.system.get_all_info()
+
+    async def get_hardware_info(self):
+        """获取硬件信息"""
+        return await self.hardware.get_all_hardware_info()
+
+    async def get_configuration_info(self):
+        """获取系统配置信息"""
+        return await self.configuration.get_all_configuration()
+
+    async def get_software_info(self):
+        """获取软件信息"""
+        return await self.software.get_all_software_info()
+
+    async def get_network_info(self):
+        """获取网络信息"""
+        return await self.network.get_all_network_info()
+
+    async def get_security_info(self):
+        """获取安全信息"""
+        return await self.security.get_all_security_info()
+
+    async def get_all_info(self):
+        """获取所有系统信息，各模块的命令在同一个事件循环中并发执行"""
+        sections = ["system", "hardware", "configuration", "software", "network", "security"]
+        results = await asyncio.gather(
+            self.get_system_info(),
+            self.get_hardware_info(),
+            self.get_configuration_info(),
+            self.get_software_info(),
+            self.get_network_info(),
+            self.get_security_info()
+        )
+        return dict(zip(sections, results))
@@ -0,0 +1,171 @@
+"""命令输出缓存模块
+
+按命令行缓存命令输出，每条命令根据匹配的策略拥有独立的有效期（TTL）。
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# 缓存默认有效期（秒），用于没有匹配任何策略的命令
+DEFAULT_TTL = 10
+
+# 缓存默认最大条目数
+DEFAULT_MAX_ENTRIES = 256
+
+# 有效期为BOOT_TTL的命令在本次开机期间一直有效，直到被显式失效或淘汰
+BOOT_TTL = None
+
+# 默认缓存策略：(正则表达式, 有效期秒数)，按顺序匹配，第一条匹配的策略生效
+# 易变数据放在前面，避免被同一命令中的静态字段匹配到较长的有效期
+DEFAULT_CACHE_POLICIES = [
+    (r'netstat -e', 1),
+    (r'MSFT_NetAdapterStatistics', 1),
+    (r'netstat', 2),
+    (r'tasklist', 2),
+    (r'FreePhysicalMemory|CurrentClockSpeed', 2),
+    (r'\bsc (query|qc|description)\b', 5),
+    (r'FreeSpace', 30),
+    (r'ipconfig|Win32_NetworkAdapter', 30),
+    (r'advfirewall', 30),
+    (r'netsh wlan', 60),
+    (r'powercfg', 60),
+    (r'Win32_DiskDrive|Win32_VideoController', 600),
+    (r'Win32_UserAccount|Win32_Group|Win32_SystemDriver|Win32_StartupCommand|net localgroup', 300),
+    (r'dism', 600),
+    (r'Win32_BIOS|Win32_BaseBoard|Win32_Processor|Win32_OperatingSystem|Win32_ComputerSystem|whoami', BOOT_TTL),
+]
+
+
+class CommandCache:
+    """命令输出缓存，支持按命令设置有效期、显式失效、容量淘汰和命中统计"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, default_ttl=DEFAULT_TTL, policies=None):
+        """初始化
+
+        Args:
+            max_entries: 最大缓存条目数，超出时淘汰最久未使用的条目
+            default_ttl: 未匹配任何策略的命令的有效期（秒）
+            policies: (正则表达式, 有效期)列表，默认为DEFAULT_CACHE_POLICIES
+        """
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._policies = []
+        for pattern, ttl in (DEFAULT_CACHE_POLICIES if policies is None else policies):
+            self._policies.append((re.compile(pattern, re.IGNORECASE), ttl))
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def set_policy(self, pattern, ttl):
+        """添加缓存策略，新策略优先于已有策略匹配
+
+        Args:
+            pattern: 匹配命令行的正则表达式
+            ttl: 有效期（秒），0表示不缓存，BOOT_TTL表示本次开机期间一直有效
+        """
+        with self._lock:
+            self._policies.insert(0, (re.compile(pattern, re.IGNORECASE), ttl))
+
+    def get_ttl(self, cmd):
+        """获取命令的有效期
+
+        Args:
+            cmd: 命令行字符串
+
+        Returns:
+            有效期（秒），BOOT_TTL表示本次开机期间一直有效
+        """
+        for regex, ttl in self._policies:
+            if regex.search(cmd):
+                return ttl
+        return self.default_ttl
+
+    def lookup(self, cmd):
+        """查找命令的缓存输出
+
+        Args:
+            cmd: 命令行字符串
+
+        Returns:
+            (是否命中, 输出)元组
+        """
+        with self._lock:
+            entry = self._entries.get(cmd)
+            if entry is not None:
+                expires_at, output = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(cmd)
+                    self.hits += 1
+                    return True, output
+                del self._entries[cmd]
+            self.misses += 1
+            return False, None
+
+    def store(self, cmd, output):
+        """保存命令输出，有效期为0的命令不会被缓存
+
+        Args:
+            cmd: 命令行字符串
+            output: 命令输出
+        """
+        ttl = self.get_ttl(cmd)
+        if ttl == 0 or self.max_entries <= 0:
+            return
+        expires_at = None if ttl is BOOT_TTL else time.monotonic() + ttl
+        with self._lock:
+            self._entries[cmd] = (expires_at, output)
+            self._entries.move_to_end(cmd)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, pattern=None):
+        """使缓存失效
+
+        Args:
+            pattern: 匹配命令行的正则表达式，为None时清空全部缓存
+
+        Returns:
+            被移除的条目数
+        """
+        with self._lock:
+            if pattern is None:
+                count = len(self._entries)
+                self._entries.clear()
+                return count
+            regex = re.compile(pattern, re.IGNORECASE)
+            keys = [cmd for cmd in self._entries if regex.search(cmd)]
+            for cmd in keys:
+                del self._entries[cmd]
+            return len(keys)
+
+    def get_stats(self):
+        """获取缓存统计信息
+
+        Returns:
+            包含命中、未命中、淘汰次数和当前条目数的字典
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "max_entries": self.max_entries
+            }
+
+
+def create_boot_only_cache():
+    """创建只缓存本次开机期间不变的命令输出的缓存
+
+    用于按间隔采样的场景，除BOOT_TTL的命令外每次采样都重新执行命令。
+
+    Returns:
+        CommandCache实例
+    """
+    policies = [(pattern, ttl if ttl is BOOT_TTL else 0) for pattern, ttl in DEFAULT_CACHE_POLICIES]
+    return CommandCache(default_ttl=0, policies=policies)
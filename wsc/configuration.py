@@ -1,98 +1,203 @@
 import os
-import subprocess
 import re
-import winreg
-from .utils import read_registry_value, get_registry_values, get_registry_subkeys
+import threading
+import time
+from .utils import read_registry_value, get_registry_values, get_registry_subkeys, iter_registry_subtree
+from .executor import get_default_executor
+
+# 服务配置所在的注册表路径
+SERVICES_REG_PATH = r"SYSTEM\CurrentControlSet\Services"
+
+# 服务目录从每个服务的注册表键中读取的值
+SERVICE_CONFIG_VALUES = ("ImagePath", "Description", "Start", "DelayedAutostart", "Type")
+
+# 服务目录的有效期（秒），与sc命令输出的缓存有效期一致
+SERVICE_CATALOG_TTL = 5
+
+# 服务类型名称，与sc qc的TYPE字段一致
+SERVICE_TYPE_NAMES = {
+    0x1: "KERNEL_DRIVER",
+    0x2: "FILE_SYSTEM_DRIVER",
+    0x10: "WIN32_OWN_PROCESS",
+    0x20: "WIN32_SHARE_PROCESS",
+    0x50: "USER_OWN_PROCESS",
+    0x60: "USER_SHARE_PROCESS",
+    0xd0: "USER_OWN_PROCESS INSTANCE",
+    0xe0: "USER_SHARE_PROCESS INSTANCE"
+}
+
+# 服务启动类型名称，与sc qc的START_TYPE字段一致
+SERVICE_START_NAMES = {
+    0: "BOOT_START",
+    1: "SYSTEM_START",
+    2: "AUTO_START",
+    3: "DEMAND_START",
+    4: "DISABLED"
+}
+
+
+def format_service_type(service_type):
+    """按sc qc的格式显示服务类型，如'10  WIN32_OWN_PROCESS'"""
+    if not isinstance(service_type, int):
+        return ""
+    name = SERVICE_TYPE_NAMES.get(service_type & ~0x100, "")
+    if service_type & 0x100:
+        # SERVICE_INTERACTIVE_PROCESS
+        name += " (interactive)"
+    return '%x  %s' % (service_type, name)
+
+
+def format_start_type(start_type, delayed=False):
+    """按sc qc的格式显示启动类型，如'2   AUTO_START  (DELAYED)'"""
+    if not isinstance(start_type, int):
+        return ""
+    text = '%d   %s' % (start_type, SERVICE_START_NAMES.get(start_type, ""))
+    if delayed and start_type == 2:
+        text += "  (DELAYED)"
+    return text
+
+
+def _resolve_indirect_string(value):
+    """解析'@文件,-资源ID'形式的间接字符串，如服务描述，解析失败时返回原值"""
+    if not isinstance(value, str) or not value.startswith('@'):
+        return value
+    try:
+        import ctypes
+        buffer = ctypes.create_unicode_buffer(1024)
+        if ctypes.windll.shlwapi.SHLoadIndirectString(value, buffer, len(buffer), None) == 0:
+            return buffer.value
+    except Exception:
+        pass
+    return value
+
 
 class ConfigurationInfo:
     """Windows系统配置信息获取类，使用命令行工具获取信息"""
     
-    def __init__(self):
-        """初始化"""
-        pass
+    def __init__(self, executor=None, registry=None):
+        """初始化
+        
+        Args:
+            executor: 命令执行器，默认使用所有信息类共享的执行器
+            registry: 注册表后端，如读取离线配置单元的registry.HiveBackend，
+                默认使用registry.get_default_registry_backend()
+        """
+        self._executor = executor or get_default_executor()
+        self._registry = registry
+        # 服务目录：服务名称（小写）到服务信息的字典，及其生成时间和对应的sc query输出
+        self._service_catalog = None
+        self._service_catalog_time = 0
+        self._service_catalog_output = None
+        self._service_catalog_lock = threading.Lock()
     
     def _run_cmd(self, cmd):
         """执行命令行命令并返回输出"""
-        try:
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True, encoding='gbk')
-            return result.stdout
-        except Exception:
-            # 尝试使用utf-8编码
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True, encoding='utf-8')
-            return result.stdout
+        return self._executor.run(cmd)
     
     def get_environment_variables(self):
         """获取环境变量"""
         return dict(os.environ)
     
-    def get_system_services(self):
-        """使用sc命令获取系统服务列表"""
-        services = []
-        output = self._run_cmd('sc query state= all')
-        
-        # 分割输出为服务块
-        service_blocks = output.split('\n\n')
+    def _parse_service_states(self, output):
+        """解析sc query的输出
         
-        for block in service_blocks:
+        Args:
+            output: sc query state= all的输出
+            
+        Returns:
+            (服务名称, 显示名称, 状态)元组的列表
+        """
+        services = []
+        for block in output.split('\n\n'):
             if 'SERVICE_NAME:' not in block:
                 continue
-            
-            service_info = {
-                "name": "",
-                "display_name": "",
-                "description": "",
-                "state": "",
-                "start_mode": "",
-                "path_name": "",
-                "service_type": ""
-            }
-            
-            # 解析服务名称
             name_match = re.search(r'SERVICE_NAME:\s+(.+)', block)
-            if name_match:
-                service_info['name'] = name_match.group(1)
-            
-            # 解析显示名称
             display_name_match = re.search(r'DISPLAY_NAME:\s+(.+)', block)
-            if display_name_match:
-                service_info['display_name'] = display_name_match.group(1)
-            
-            # 解析状态
             state_match = re.search(r'STATE\s+: (.+)', block)
-            if state_match:
-                service_info['state'] = state_match.group(1)
-            
-            # 获取服务详细信息
-            if service_info['name']:
-                detail_output = self._run_cmd(f'sc qc "{service_info["name"]}"')
-                
-                # 解析服务类型
-                type_match = re.search(r'TYPE\s+: (.+)', detail_output)
-                if type_match:
-                    service_info['service_type'] = type_match.group(1)
-                
-                # 解析启动类型
-                start_type_match = re.search(r'START_TYPE\s+: (.+)', detail_output)
-                if start_type_match:
-                    service_info['start_mode'] = start_type_match.group(1)
-                
-                # 解析路径名称
-                path_match = re.search(r'BINARY_PATH_NAME\s+: (.+)', detail_output)
-                if path_match:
-                    service_info['path_name'] = path_match.group(1)
-                
-                # 解析描述
-                desc_output = self._run_cmd(f'sc description "{service_info["name"]}"')
-                desc_match = re.search(r'DESCRIPTION:\s+(.+)', desc_output)
-                if desc_match:
-                    service_info['description'] = desc_match.group(1)
+            services.append((
+                name_match.group(1) if name_match else "",
+                display_name_match.group(1) if display_name_match else "",
+                state_match.group(1) if state_match else ""
+            ))
+        return services
+    
+    def _read_service_configs(self):
+        """遍历一次Services键，读取全部服务的配置值
+        
+        Returns:
+            服务名称（小写）到值字典的字典，只包含SERVICE_CONFIG_VALUES中的值
+        """
+        return {
+            name.lower(): values
+            for name, values, _ in iter_registry_subtree(SERVICES_REG_PATH, SERVICE_CONFIG_VALUES, depth=1,
+                                                         backend=self._registry)
+        }
+    
+    @staticmethod
+    def _format_service_config(values):
+        """把服务的注册表值转换为服务信息字段
+        
+        Args:
+            values: 服务注册表键中的值字典
             
-            services.append(service_info)
+        Returns:
+            包含服务类型、启动类型、路径和描述的字典
+        """
+        path_name = values.get("ImagePath", "")
+        if isinstance(path_name, str) and '%' in path_name:
+            path_name = os.path.expandvars(path_name)
+        return {
+            "description": _resolve_indirect_string(values.get("Description", "")) or "",
+            "start_mode": format_start_type(values.get("Start"), values.get("DelayedAutostart") == 1),
+            "path_name": path_name or "",
+            "service_type": format_service_type(values.get("Type"))
+        }
+    
+    def get_service_catalog(self):
+        """获取所有服务的目录
         
-        return services
+        运行状态通过一次sc query state= all获取，启动类型、路径、服务类型和描述通过一次遍历注册表的
+        SYSTEM\\CurrentControlSet\\Services读取，不再为每个服务分别运行sc qc和sc description或打开注册表键。
+        目录在SERVICE_CATALOG_TTL秒内且sc query输出不变时重复使用。
+        
+        Returns:
+            服务名称（小写）到服务信息字典的字典，字段与get_system_services()的条目一致
+        """
+        with self._service_catalog_lock:
+            output = self._run_cmd('sc query state= all')
+            if self._service_catalog is not None and output == self._service_catalog_output and \
+                    time.monotonic() - self._service_catalog_time < SERVICE_CATALOG_TTL:
+                return self._service_catalog
+            
+            catalog = {}
+            configs = self._read_service_configs()
+            for name, display_name, state in self._parse_service_states(output):
+                service_info = {
+                    "name": name,
+                    "display_name": display_name,
+                    "description": "",
+                    "state": state,
+                    "start_mode": "",
+                    "path_name": "",
+                    "service_type": ""
+                }
+                if name:
+                    service_info.update(self._format_service_config(configs.get(name.lower(), {})))
+                catalog[name.lower()] = service_info
+            
+            self._service_catalog = catalog
+            self._service_catalog_time = time.monotonic()
+            self._service_catalog_output = output
+            return catalog
+    
+    def get_system_services(self):
+        """获取系统服务列表，运行状态来自sc query，配置来自注册表"""
+        return [dict(service_info) for service_info in self.get_service_catalog().values()]
     
     def get_service_status(self, service_name):
-        """使用sc命令获取特定服务状态
+        """获取特定服务状态
+        
+        优先从服务目录中查找，目录中没有的服务（如驱动程序）使用sc命令单独查询。
         
         Args:
             service_name: 服务名称
@@ -100,6 +205,15 @@ class ConfigurationInfo:
         Returns:
             服务状态信息字典，如果服务不存在则返回None
         """
+        service_info = self.get_service_catalog().get(service_name.lower())
+        if service_info is not None:
+            return {
+                "name": service_info["name"],
+                "display_name": service_info["display_name"],
+                "state": service_info["state"],
+                "start_mode": service_info["start_mode"]
+            }
+        
         output = self._run_cmd(f'sc query "{service_name}"')
         
         if 'FAILED' in output:
@@ -113,14 +227,13 @@ class ConfigurationInfo:
         state_match = re.search(r'STATE\s+: (.+)', output)
         
         # 获取服务启动类型
-        qc_output = self._run_cmd(f'sc qc "{service_name}"')
-        start_mode_match = re.search(r'START_TYPE\s+: (.+)', qc_output)
+        values = get_registry_values(f"{SERVICES_REG_PATH}\\{service_name}", backend=self._registry)
         
         return {
             "name": name_match.group(1) if name_match else service_name,
             "display_name": display_name_match.group(1) if display_name_match else "",
             "state": state_match.group(1) if state_match else "",
-            "start_mode": start_mode_match.group(1) if start_mode_match else ""
+            "start_mode": format_start_type(values.get("Start"), values.get("DelayedAutostart") == 1)
         }
     
     def get_startup_items(self):
@@ -136,7 +249,7 @@ class ConfigurationInfo:
         ]
         
         for reg_path in startup_reg_paths:
-            items = get_registry_values(reg_path)
+            items = get_registry_values(reg_path, backend=self._registry)
             for name, path in items.items():
                 startup_items.append({
                     "name": name,
@@ -191,7 +304,7 @@ class ConfigurationInfo:
         update_reg_path = r"SOFTWARE\Policies\Microsoft\Windows\WindowsUpdate"
         
         # 检查自动更新是否启用
-        au_option = read_registry_value(update_reg_path, "AUOptions")
+        au_option = read_registry_value(update_reg_path, "AUOptions", backend=self._registry)
         if au_option is not None:
             au_modes = {
                 1: "Never check for updates",
@@ -208,10 +321,12 @@ class ConfigurationInfo:
     def get_uac_settings(self):
         """获取UAC（用户账户控制）设置"""
         uac_reg_path = r"SOFTWARE\Microsoft\Windows\CurrentVersion\Policies\System"
-        enable_lua = read_registry_value(uac_reg_path, "EnableLUA")
-        consent_prompt_behavior_admin = read_registry_value(uac_reg_path, "ConsentPromptBehaviorAdmin")
-        consent_prompt_behavior_user = read_registry_value(uac_reg_path, "ConsentPromptBehaviorUser")
-        prompt_on_secure_desktop = read_registry_value(uac_reg_path, "PromptOnSecureDesktop")
+        # 一次读取UAC策略键下的全部值
+        values = get_registry_values(uac_reg_path, backend=self._registry)
+        enable_lua = values.get("EnableLUA")
+        consent_prompt_behavior_admin = values.get("ConsentPromptBehaviorAdmin")
+        consent_prompt_behavior_user = values.get("ConsentPromptBehaviorUser")
+        prompt_on_secure_desktop = values.get("PromptOnSecureDesktop")
         
         uac_levels = {
             0: "Never notify",
@@ -226,13 +341,25 @@ class ConfigurationInfo:
             "consent_prompt_behavior_admin": consent_prompt_behavior_admin
         }
     
-    def get_all_configuration(self):
-        """获取所有系统配置信息"""
+    def get_collectors(self):
+        """获取字段名到采集方法的映射
+        
+        Returns:
+            字段名到无参采集方法的字典，与get_all_configuration()返回的字段一一对应
+        """
         return {
-            "environment_variables": self.get_environment_variables(),
-            "startup_items": self.get_startup_items(),
-            "power_plans": self.get_power_plans(),
-            "current_power_plan": self.get_current_power_plan(),
-            "windows_update_settings": self.get_windows_update_settings(),
-            "uac_settings": self.get_uac_settings()
+            "environment_variables": self.get_environment_variables,
+            "startup_items": self.get_startup_items,
+            "power_plans": self.get_power_plans,
+            "current_power_plan": self.get_current_power_plan,
+            "windows_update_settings": self.get_windows_update_settings,
+            "uac_settings": self.get_uac_settings
         }
+    
+    def get_all_configuration(self, max_workers=None):
+        """获取所有系统配置信息
+        
+        Args:
+            max_workers: 并行采集的线程数量，默认使用执行器的并发上限，为1时按顺序采集
+        """
+        return self._executor.collect(self.get_collectors(), max_workers)
@@ -0,0 +1,427 @@
+"""常驻采集守护进程模块
+
+守护进程在后台按各模块的刷新周期重新采集信息，并通过本机回环地址上的TCP端口从内存中应答查询，
+命令行工具检测到守护进程运行时直接向其查询，不再为每次调用重新采集。
+
+守护进程启动时生成随机令牌，写入只有当前用户可以读取的令牌文件（见get_token_path()），
+每个请求都必须带有该令牌，因此本机的其他用户无法查询守护进程。
+
+协议为按行分隔的JSON，每行一个请求，每个请求对应一行响应：
+    {"op": "query", "token": "...", "fields": ["network.nic_info"], "default": ""}
+    -> {"ok": true, "data": {"network": {"nic_info": [...]}}, "collected_at": {"network": 1700000000.0}}
+    {"op": "status"}
+    -> {"ok": true, "sections": {"network": {"collected_at": ..., "interval": 30, "error": null}}, "executor": {...}}
+fields省略时返回全部模块，default省略时不存在的字段返回错误。
+令牌不正确时返回{"ok": false, "error": "unauthorized"}并关闭连接。
+模块最近一次刷新失败时，状态中的error为失败原因，同时通过logging模块记录警告。
+"""
+
+import hmac
+import json
+import logging
+import os
+import secrets
+import socket
+import socketserver
+import threading
+import time
+from .i18n import _
+from .snapshot import create_collectors, get_path, _set_path, _MISSING
+
+logger = logging.getLogger(__name__)
+
+# 守护进程监听的地址，只监听本机回环地址
+DEFAULT_HOST = '127.0.0.1'
+
+# 守护进程默认端口，可以通过环境变量WSC_DAEMON_PORT修改（见get_default_port()）
+DEFAULT_PORT = 47263
+
+# 令牌的字节数，令牌文件中保存其十六进制形式
+TOKEN_BYTES = 32
+
+# 命令行工具连接守护进程的超时时间（秒），守护进程未运行时连接会立即被拒绝
+DEFAULT_CLIENT_TIMEOUT = 5
+
+# 各模块默认的刷新周期（秒）
+DEFAULT_REFRESH_INTERVALS = {
+    "system": 60,
+    "hardware": 30,
+    "configuration": 300,
+    "software": 600,
+    "network": 30,
+    "security": 300
+}
+
+
+def get_default_port():
+    """获取守护进程默认端口，环境变量WSC_DAEMON_PORT不是有效端口时使用DEFAULT_PORT"""
+    try:
+        port = int(os.environ.get('WSC_DAEMON_PORT', DEFAULT_PORT))
+    except ValueError:
+        return DEFAULT_PORT
+    return port if 0 < port < 65536 else DEFAULT_PORT
+
+
+def get_token_path(port):
+    """获取守护进程令牌文件的路径，可以通过环境变量WSC_DAEMON_TOKEN_PATH修改
+
+    默认保存在当前用户的LOCALAPPDATA（没有时为~/.cache）下，每个端口使用一个文件。
+
+    Args:
+        port: 守护进程端口
+
+    Returns:
+        令牌文件路径
+    """
+    path = os.environ.get('WSC_DAEMON_TOKEN_PATH')
+    if path:
+        return path
+    base = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'wsc', f'daemon-{port}.token')
+
+
+def write_token(path):
+    """生成新令牌并写入令牌文件，文件只允许当前用户读写
+
+    Windows上LOCALAPPDATA目录的访问控制列表只允许当前用户（以及SYSTEM和管理员）访问；
+    其他系统上目录权限为0700，文件权限为0600。
+
+    Args:
+        path: 令牌文件路径
+
+    Returns:
+        令牌字符串
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+    token = secrets.token_hex(TOKEN_BYTES)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w') as f:
+        # 文件已经存在时os.open()不会修改权限
+        if hasattr(os, 'fchmod'):
+            os.fchmod(f.fileno(), 0o600)
+        f.write(token)
+    return token
+
+
+def read_token(path):
+    """读取令牌文件
+
+    Args:
+        path: 令牌文件路径
+
+    Returns:
+        令牌字符串
+
+    Raises:
+        OSError: 令牌文件不存在或无法读取，通常说明守护进程未运行
+    """
+    with open(path) as f:
+        return f.read().strip()
+
+
+class SnapshotDaemon:
+    """在后台定时刷新各模块信息，并在内存中保存最近一次采集结果的守护进程"""
+
+    def __init__(self, collectors=None, intervals=None, executor=None):
+        """初始化
+
+        Args:
+            collectors: 模块名到信息类实例的字典，默认使用全部六个信息类
+            intervals: 模块名到刷新周期（秒）的字典，未指定的模块使用DEFAULT_REFRESH_INTERVALS
+            executor: 命令执行器，默认使用共享执行器
+        """
+        from .executor import get_default_executor
+        self._executor = executor or get_default_executor()
+        if collectors is None:
+            collectors = create_collectors(self._executor)
+        self.collectors = collectors
+        self.intervals = dict(DEFAULT_REFRESH_INTERVALS)
+        self.intervals.update(intervals or {})
+
+        # 模块名到(采集结果, 采集时间)的字典
+        self._sections = {}
+        # 模块名到最近一次刷新失败原因的字典，刷新成功后移除
+        self._errors = {}
+        self._locks = {name: threading.Lock() for name in collectors}
+        self._due = {name: 0 for name in collectors}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def refresh(self, section):
+        """立即重新采集一个模块
+
+        Args:
+            section: 模块名
+
+        Returns:
+            (采集结果, 采集时间)元组
+        """
+        with self._locks[section]:
+            return self._refresh_locked(section)
+
+    def _refresh_locked(self, section):
+        """在持有模块锁时采集模块"""
+        try:
+            data = self._executor.collect(self.collectors[section].get_collectors())
+            self._sections[section] = (data, time.time())
+            self._errors.pop(section, None)
+        except Exception as e:
+            self._errors[section] = str(e)
+            logger.warning(_("刷新%s模块失败: %s"), section, e)
+        # 失败时保留上一次的结果，下一个周期再重试
+        self._due[section] = time.monotonic() + self.intervals.get(section, 60)
+        return self._sections.get(section, ({}, None))
+
+    def get_section(self, section):
+        """获取模块最近一次的采集结果，尚未采集时立即采集
+
+        Args:
+            section: 模块名
+
+        Returns:
+            (采集结果, 采集时间)元组，采集时间为Unix时间戳
+        """
+        cached = self._sections.get(section)
+        if cached is not None:
+            return cached
+        with self._locks[section]:
+            # 后台线程可能已经在等待锁期间完成了采集
+            cached = self._sections.get(section)
+            if cached is not None:
+                return cached
+            return self._refresh_locked(section)
+
+    def query(self, fields=None, default=_MISSING):
+        """从内存中查询指定字段
+
+        Args:
+            fields: 点分隔的路径列表，如['network.nic_info']，为None时返回全部模块
+            default: 路径不存在时使用的默认值，不提供时抛出KeyError
+
+        Returns:
+            (只包含请求路径的嵌套字典, 涉及模块到采集时间的字典)元组
+        """
+        if fields is None:
+            fields = list(self.collectors)
+
+        data = {}
+        collected_at = {}
+        for path in fields:
+            section, _, rest = path.partition('.')
+            if section not in self.collectors:
+                if default is _MISSING:
+                    raise KeyError(path)
+                _set_path(data, path, default)
+                continue
+            section_data, collected_at[section] = self.get_section(section)
+            value = get_path(section_data, rest, default) if rest else section_data
+            _set_path(data, path, value)
+        return data, collected_at
+
+    def get_status(self):
+        """获取各模块的采集时间、刷新周期、最近一次刷新失败的原因和执行器统计信息"""
+        sections = {}
+        for name in self.collectors:
+            cached = self._sections.get(name)
+            sections[name] = {
+                "collected_at": cached[1] if cached else None,
+                "interval": self.intervals.get(name, 60),
+                "error": self._errors.get(name)
+            }
+        return {"sections": sections, "executor": self._executor.get_stats()}
+
+    def start(self):
+        """启动后台刷新线程，按各模块的刷新周期重新采集"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._refresh_loop, name="wsc-refresh", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """停止后台刷新线程"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _refresh_loop(self):
+        """刷新到期的模块，然后等待到下一个模块到期"""
+        while not self._stop.is_set():
+            now = time.monotonic()
+            due = [name for name, at in self._due.items() if at <= now]
+            if due:
+                self._executor.collect({name: (lambda name=name: self.refresh(name)) for name in due})
+                continue
+            self._stop.wait(min(self._due.values()) - now)
+
+    def handle_request(self, request):
+        """处理一个协议请求
+
+        Args:
+            request: 已解析的请求字典
+
+        Returns:
+            响应字典
+        """
+        op = request.get("op", "query")
+        if op == "status":
+            response = {"ok": True}
+            response.update(self.get_status())
+            return response
+        if op != "query":
+            return {"ok": False, "error": "unknown_op", "op": op}
+        try:
+            data, collected_at = self.query(request.get("fields"), request.get("default", _MISSING))
+        except KeyError as e:
+            return {"ok": False, "error": "unknown_field", "field": e.args[0]}
+        return {"ok": True, "data": data, "collected_at": collected_at}
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """按行读取JSON请求，校验令牌后写回JSON响应"""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            authorized = True
+            try:
+                request = json.loads(line.decode('utf-8'))
+                if not isinstance(request, dict):
+                    raise ValueError("request must be a JSON object")
+                token = request.get("token")
+                authorized = isinstance(token, str) and hmac.compare_digest(token, self.server.token)
+                if authorized:
+                    response = self.server.snapshot_daemon.handle_request(request)
+                else:
+                    response = {"ok": False, "error": "unauthorized"}
+            except ValueError as e:
+                response = {"ok": False, "error": "bad_request", "message": str(e)}
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+            self.wfile.flush()
+            if not authorized:
+                return
+
+
+class _DaemonServer(socketserver.ThreadingTCPServer):
+    """每个连接使用一个线程处理的守护进程服务器"""
+
+    daemon_threads = True
+
+
+def serve(host=DEFAULT_HOST, port=None, intervals=None, executor=None, token_path=None):
+    """启动守护进程并一直运行，直到被中断
+
+    Args:
+        host: 监听地址，默认只监听本机回环地址
+        port: 监听端口，默认为get_default_port()
+        intervals: 模块名到刷新周期（秒）的字典
+        executor: 命令执行器，默认使用共享执行器
+        token_path: 令牌文件路径，默认为get_token_path(port)
+    """
+    if port is None:
+        port = get_default_port()
+    if token_path is None:
+        token_path = get_token_path(port)
+    daemon = SnapshotDaemon(intervals=intervals, executor=executor)
+    server = _DaemonServer((host, port), _RequestHandler)
+    server.snapshot_daemon = daemon
+    server.token = write_token(token_path)
+    daemon.start()
+    print(_("守护进程正在监听 %s:%d") % (host, port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        daemon.stop()
+        try:
+            os.remove(token_path)
+        except OSError:
+            pass
+
+
+class DaemonClient:
+    """守护进程客户端，提供与LazySnapshot相同的project()和materialize()接口"""
+
+    def __init__(self, host=DEFAULT_HOST, port=None, timeout=DEFAULT_CLIENT_TIMEOUT, token=None, token_path=None):
+        """初始化
+
+        Args:
+            host: 守护进程地址
+            port: 守护进程端口，默认为get_default_port()
+            timeout: 连接和等待响应的超时时间（秒）
+            token: 守护进程的令牌，默认在第一次请求时从令牌文件读取
+            token_path: 令牌文件路径，默认为get_token_path(port)
+        """
+        self.host = host
+        self.port = port if port is not None else get_default_port()
+        self.timeout = timeout
+        self.token = token
+        self.token_path = token_path or get_token_path(self.port)
+        # 最近一次查询涉及的模块到采集时间的字典
+        self.collected_at = {}
+
+    def request(self, request):
+        """发送一个请求并返回响应
+
+        Args:
+            request: 请求字典
+
+        Returns:
+            响应字典
+
+        Raises:
+            OSError: 守护进程未运行、连接中断或令牌不正确（PermissionError）
+        """
+        if self.token is None:
+            self.token = read_token(self.token_path)
+        request = dict(request, token=self.token)
+        with socket.create_connection((self.host, self.port), timeout=self.timeout) as conn:
+            conn.sendall(json.dumps(request, ensure_ascii=False).encode('utf-8') + b'\n')
+            conn.shutdown(socket.SHUT_WR)
+            with conn.makefile('rb') as reader:
+                line = reader.readline()
+        if not line:
+            raise ConnectionError("守护进程没有返回响应")
+        response = json.loads(line.decode('utf-8'))
+        if response.get("error") == "unauthorized":
+            raise PermissionError("守护进程拒绝了令牌")
+        return response
+
+    def query(self, fields=None, default=_MISSING):
+        """查询指定字段
+
+        Args:
+            fields: 点分隔的路径列表，为None时返回全部模块
+            default: 路径不存在时使用的默认值，不提供时抛出KeyError
+
+        Returns:
+            只包含请求路径的嵌套字典
+        """
+        request = {"op": "query"}
+        if fields is not None:
+            request["fields"] = list(fields)
+        if default is not _MISSING:
+            request["default"] = default
+        response = self.request(request)
+        if not response.get("ok"):
+            if response.get("error") == "unknown_field":
+                raise KeyError(response.get("field"))
+            raise RuntimeError(response.get("error"))
+        self.collected_at = response.get("collected_at", {})
+        return response["data"]
+
+    def project(self, paths, max_workers=None, default=_MISSING):
+        """只查询指定路径，参数与LazyMapping.project()一致，max_workers会被忽略"""
+        return self.query(paths, default)
+
+    def materialize(self, max_workers=None):
+        """查询全部模块，参数与LazyMapping.materialize()一致，max_workers会被忽略"""
+        return self.query()
+
+    def get_status(self):
+        """查询守护进程状态"""
+        return self.request({"op": "status"})
@@ -0,0 +1,240 @@
+"""共享命令执行器模块
+
+所有信息类通过同一个执行器运行命令行命令，并利用有界线程池并行采集互不依赖的信息。
+"""
+
+import codecs
+import ctypes
+import locale
+import os
+import subprocess
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from .cache import CommandCache
+from .utils import safe_decode
+
+# 默认并发数：同时运行的子进程数量上限
+DEFAULT_MAX_WORKERS = min(8, (os.cpu_count() or 1) + 4)
+
+
+def get_console_encoding():
+    """获取子进程输出使用的控制台代码页对应的编码
+
+    Returns:
+        编码名称，如'cp936'，检测失败时返回'gbk'
+    """
+    global _console_encoding
+    if _console_encoding is not None:
+        return _console_encoding
+
+    encoding = None
+    if sys.platform == 'win32':
+        try:
+            kernel32 = ctypes.windll.kernel32
+            # 没有附加控制台时GetConsoleOutputCP返回0，子进程会使用OEM代码页
+            code_page = kernel32.GetConsoleOutputCP() or kernel32.GetOEMCP()
+            if code_page:
+                encoding = 'cp%d' % code_page
+        except Exception:
+            encoding = None
+    else:
+        encoding = locale.getpreferredencoding(False)
+
+    try:
+        _console_encoding = codecs.lookup(encoding).name if encoding else 'gbk'
+    except LookupError:
+        _console_encoding = 'gbk'
+    return _console_encoding
+
+
+_console_encoding = None
+
+
+class CommandExecutor:
+    """命令执行器，负责执行命令行命令和并行调度采集函数"""
+
+    def __init__(self, max_workers=None, cache=None, encoding=None):
+        """初始化
+
+        Args:
+            max_workers: 同时运行的命令数量上限，默认为DEFAULT_MAX_WORKERS
+            cache: 命令输出缓存，默认创建新的CommandCache，为False时不缓存
+            encoding: 命令输出的首选编码，默认为检测到的控制台代码页
+        """
+        self.max_workers = max_workers or DEFAULT_MAX_WORKERS
+        self.encoding = encoding or get_console_encoding()
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+        self.cache = CommandCache() if cache is None else (cache or None)
+        # 正在执行的命令，相同命令的并发请求共享同一次执行结果
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        # 统计信息：启动的子进程数量和使用回退编码解码的次数
+        self._stats_lock = threading.Lock()
+        self.subprocess_count = 0
+        self.decode_fallbacks = 0
+
+    def set_max_workers(self, max_workers):
+        """修改同时运行的命令数量上限
+
+        Args:
+            max_workers: 新的并发上限
+        """
+        self.max_workers = max(1, int(max_workers))
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+
+    def run(self, cmd):
+        """执行命令行命令并返回输出，优先使用缓存中仍然有效的输出
+
+        Args:
+            cmd: 命令行字符串
+
+        Returns:
+            命令的标准输出
+        """
+        if self.cache is not None:
+            hit, output = self.cache.lookup(cmd)
+            if hit:
+                return output
+
+        with self._inflight_lock:
+            pending = self._inflight.get(cmd)
+            owner = pending is None
+            if owner:
+                pending = self._inflight[cmd] = Future()
+        if not owner:
+            return pending.result()
+
+        try:
+            with self._slots:
+                output = self._execute(cmd)
+            if self.cache is not None:
+                self.cache.store(cmd, output)
+            pending.set_result(output)
+            return output
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[cmd]
+
+    def run_uncached(self, cmd):
+        """执行有副作用的命令（如把文件导出到临时目录），不读写缓存，也不与相同命令的并发请求合并
+
+        Args:
+            cmd: 命令行字符串
+
+        Returns:
+            命令的标准输出
+        """
+        with self._slots:
+            return self._execute(cmd)
+
+    def _execute(self, cmd):
+        """实际启动子进程执行命令，只捕获一次原始字节输出"""
+        self._count_subprocess()
+        result = subprocess.run(cmd, shell=True, capture_output=True)
+        return self.decode_output(result.stdout)
+
+    def stream(self, cmd):
+        """执行命令行命令，并在输出到达时逐行返回
+
+        输出不经过缓存，也不会整体保存在内存中，适合输出非常大的命令。
+        生成器被提前关闭时会结束子进程。
+        只在启动子进程时占用并发名额，生成器的生命周期由调用者决定，
+        逐行读取期间不占用名额，否则max_workers较小时run()会一直等待。
+
+        Args:
+            cmd: 命令行字符串
+
+        Yields:
+            去掉换行符的输出行
+        """
+        with self._slots:
+            self._count_subprocess()
+            process = subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        try:
+            for raw_line in process.stdout:
+                yield self.decode_output(raw_line).rstrip('\n')
+        finally:
+            if process.poll() is None:
+                process.kill()
+            process.stdout.close()
+            process.wait()
+
+    def _count_subprocess(self):
+        """记录启动了一个子进程"""
+        with self._stats_lock:
+            self.subprocess_count += 1
+
+    def decode_output(self, data):
+        """把命令输出的原始字节解码为文本，并与文本模式一样统一换行符
+
+        先使用首选编码解码，失败时按utils.safe_decode的回退编码链解码并计数。
+
+        Args:
+            data: 命令输出的原始字节
+
+        Returns:
+            解码后的字符串
+        """
+        try:
+            text = data.decode(self.encoding)
+        except UnicodeDecodeError:
+            with self._stats_lock:
+                self.decode_fallbacks += 1
+            text = safe_decode(data, self.encoding)
+        return text.replace('\r\n', '\n').replace('\r', '\n')
+
+    def get_stats(self):
+        """获取执行器统计信息
+
+        Returns:
+            包含子进程数量、回退解码次数和缓存统计的字典
+        """
+        with self._stats_lock:
+            stats = {
+                "encoding": self.encoding,
+                "subprocesses": self.subprocess_count,
+                "decode_fallbacks": self.decode_fallbacks
+            }
+        stats["cache"] = self.cache.get_stats() if self.cache is not None else None
+        return stats
+
+    def collect(self, tasks, max_workers=None):
+        """并行执行一组互不依赖的采集函数
+
+        Args:
+            tasks: 字段名到无参采集函数的字典
+            max_workers: 采集线程数量，默认为执行器的并发上限，为1时按顺序执行
+
+        Returns:
+            字段名到采集结果的字典，顺序与tasks一致
+        """
+        workers = max_workers or self.max_workers
+        if workers <= 1 or len(tasks) <= 1:
+            return {name: func() for name, func in tasks.items()}
+
+        with ThreadPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            futures = {name: pool.submit(func) for name, func in tasks.items()}
+            return {name: future.result() for name, future in futures.items()}
+
+
+_default_executor = None
+_default_executor_lock = threading.Lock()
+
+
+def get_default_executor():
+    """获取所有信息类共享的默认执行器
+
+    Returns:
+        默认的CommandExecutor实例
+    """
+    global _default_executor
+    if _default_executor is None:
+        with _default_executor_lock:
+            if _default_executor is None:
+                _default_executor = CommandExecutor()
+    return _default_executor
+
@@ -0,0 +1,460 @@
+"""防火墙规则解析模块
+
+对netsh advfirewall firewall show rule name=all的输出只遍历一次，逐行读取"标签: 值"，
+每遇到新的规则名称就输出上一条规则，输出很大时也不需要先把整段文本按规则拆分。
+支持中文和英文系统，方向、操作、配置文件等取值统一为英文。
+FirewallRuleIndex在解析结果上建立端口、地址区间树和方向、操作等哈希索引，用于快速查询匹配的规则。
+"""
+
+import ipaddress
+import ntpath
+
+# 标签（小写）到规则字段的映射
+FIREWALL_RULE_LABELS = {
+    "rule name": "name",
+    "规则名称": "name",
+    "description": "description",
+    "描述": "description",
+    "enabled": "enabled",
+    "已启用": "enabled",
+    "direction": "direction",
+    "方向": "direction",
+    "profiles": "profiles",
+    "配置文件": "profiles",
+    "grouping": "grouping",
+    "分组": "grouping",
+    "localip": "local_addresses",
+    "本地 ip": "local_addresses",
+    "remoteip": "remote_addresses",
+    "远程 ip": "remote_addresses",
+    "protocol": "protocol",
+    "协议": "protocol",
+    "localport": "local_ports",
+    "本地端口": "local_ports",
+    "remoteport": "remote_ports",
+    "远程端口": "remote_ports",
+    "action": "action",
+    "操作": "action",
+    "program": "program",
+    "程序": "program",
+    "service": "service",
+    "服务": "service",
+}
+
+# 中文取值到英文取值的映射
+FIREWALL_VALUE_NAMES = {
+    "入": "In",
+    "出": "Out",
+    "允许": "Allow",
+    "阻止": "Block",
+    "绕过": "Bypass",
+    "任何": "Any",
+    "域": "Domain",
+    "专用": "Private",
+    "公用": "Public",
+}
+
+# 取值需要统一为英文的字段
+_TRANSLATED_FIELDS = {"direction", "action", "local_addresses", "remote_addresses",
+                      "local_ports", "remote_ports", "protocol"}
+
+# 表示"是"的取值
+_YES_VALUES = {"Yes", "yes", "YES", "是"}
+
+
+def _new_rule(name):
+    """创建规则记录，字段与SecurityInfo.get_firewall_rules()的条目一致"""
+    return {
+        "name": name,
+        "display_name": name,
+        "description": "",
+        "direction": "",
+        "action": "",
+        "enabled": False,
+        "protocol": "",
+        "profiles": "",
+        "grouping": "",
+        "local_ports": "",
+        "remote_ports": "",
+        "local_addresses": "",
+        "remote_addresses": "",
+        "program": "",
+        "service": ""
+    }
+
+
+def _finish_rule(rule, profiles_cache):
+    """把逐行读取的原始取值转换为最终取值：启用状态转为布尔值，中文取值统一为英文
+
+    Args:
+        rule: 规则字典
+        profiles_cache: 原始配置文件列表到转换结果的字典，不同规则的配置文件组合通常只有几种
+    """
+    translate = FIREWALL_VALUE_NAMES
+    rule["enabled"] = rule["enabled"] in _YES_VALUES
+    for field in _TRANSLATED_FIELDS:
+        value = rule[field]
+        if value in translate:
+            rule[field] = translate[value]
+    profiles = rule["profiles"]
+    if profiles:
+        translated = profiles_cache.get(profiles)
+        if translated is None:
+            translated = profiles_cache[profiles] = ','.join(
+                translate.get(item, item) for item in profiles.split(','))
+        rule["profiles"] = translated
+    return rule
+
+
+def iter_firewall_rules(lines):
+    """逐行解析防火墙规则，每解析完一条规则就立即返回
+
+    每行只做一次分割和一次字典查找，取值的转换在规则结束时统一完成。
+
+    Args:
+        lines: netsh advfirewall firewall show rule的输出行，可以是列表、文件或执行器的流式输出
+
+    Yields:
+        规则字典，端口和地址保留netsh的原始写法，如'80,443'、'5000-5010'、'Any'
+    """
+    # 原始标签到字段的缓存，每种标签只需要规范化一次，非规则字段的标签缓存为None
+    fields = {}
+    profiles_cache = {}
+    rule = None
+    for line in lines:
+        label, sep, value = line.partition(':')
+        if not sep:
+            continue
+        try:
+            field = fields[label]
+        except KeyError:
+            field = fields[label] = FIREWALL_RULE_LABELS.get(label.strip().lower())
+        if field is None:
+            continue
+
+        if field == "name":
+            if rule is not None:
+                yield _finish_rule(rule, profiles_cache)
+            rule = _new_rule(value.strip())
+        elif rule is not None:
+            rule[field] = value.strip()
+
+    if rule is not None:
+        yield _finish_rule(rule, profiles_cache)
+
+
+class IntervalTree:
+    """静态区间树（中心点划分），按点查询包含该点的全部区间
+
+    构建时间为O(n log² n)，查询时间为O(log n + k)，k为命中的区间数量。
+    """
+
+    def __init__(self, intervals):
+        """构建区间树
+
+        Args:
+            intervals: (下界, 上界, 值)元组的可迭代对象，区间为闭区间
+        """
+        self._root = self._build(list(intervals))
+
+    @classmethod
+    def _build(cls, intervals):
+        """递归构建节点：(中心点, 按下界升序的区间, 按上界降序的区间, 左子树, 右子树)"""
+        if not intervals:
+            return None
+        endpoints = sorted(bound for interval in intervals for bound in interval[:2])
+        center = endpoints[len(endpoints) // 2]
+        left, right, overlapping = [], [], []
+        for interval in intervals:
+            if interval[1] < center:
+                left.append(interval)
+            elif interval[0] > center:
+                right.append(interval)
+            else:
+                overlapping.append(interval)
+        return (
+            center,
+            sorted(overlapping, key=lambda interval: interval[0]),
+            sorted(overlapping, key=lambda interval: interval[1], reverse=True),
+            cls._build(left),
+            cls._build(right)
+        )
+
+    def query(self, point):
+        """查询包含指定点的全部区间
+
+        Args:
+            point: 查询点
+
+        Returns:
+            命中区间的值列表
+        """
+        result = []
+        node = self._root
+        while node is not None:
+            center, by_low, by_high, left, right = node
+            if point < center:
+                for low, _, value in by_low:
+                    if low > point:
+                        break
+                    result.append(value)
+                node = left
+            elif point > center:
+                for _, high, value in by_high:
+                    if high < point:
+                        break
+                    result.append(value)
+                node = right
+            else:
+                result.extend(interval[2] for interval in by_low)
+                break
+        return result
+
+
+# 表示任意值的取值，规则的端口、地址、配置文件、协议或程序为这些值时匹配任何查询
+_ANY_VALUES = {"any", ""}
+
+# 没有端口的协议，包括名称和协议号
+_ICMP_PROTOCOLS = {"icmpv4", "icmpv6", "icmp", "1", "58"}
+
+
+def _is_icmp(protocol):
+    """判断规则的协议是否为ICMP，ICMP规则的协议可能带有类型和代码，如ICMPv4:8,any"""
+    return protocol.split(':')[0].strip().lower() in _ICMP_PROTOCOLS
+
+
+def parse_port_spec(spec):
+    """解析规则的端口取值
+
+    Args:
+        spec: netsh输出中的端口，如'80,443'、'5000-5010'、'RPC'、'Any'
+
+    Returns:
+        (是否为任意端口, [(下界, 上界), ...], [关键字, ...])元组，
+        关键字为RPC、IPHTTPS等非数字端口，统一为小写
+    """
+    if spec.strip().lower() == "any":
+        return True, [], []
+    ranges = []
+    keywords = []
+    for item in spec.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        low, sep, high = item.partition('-')
+        if low.isdigit() and (not sep or high.isdigit()):
+            ranges.append((int(low), int(high) if sep else int(low)))
+        else:
+            keywords.append(item.lower())
+    return False, ranges, keywords
+
+
+def _parse_address(item):
+    """解析单个地址、地址范围或子网，返回(IP版本, 下界整数, 上界整数)，无法解析时返回None"""
+    try:
+        if '/' in item:
+            network = ipaddress.ip_network(item, strict=False)
+            return network.version, int(network.network_address), int(network.broadcast_address)
+        low, sep, high = item.partition('-')
+        low = ipaddress.ip_address(low.strip())
+        high = ipaddress.ip_address(high.strip()) if sep else low
+        if low.version != high.version:
+            return None
+        return low.version, int(low), int(high)
+    except ValueError:
+        return None
+
+
+def parse_address_spec(spec):
+    """解析规则的地址取值
+
+    Args:
+        spec: netsh输出中的地址，如'10.0.0.0/255.255.0.0,192.168.1.1-192.168.1.9'、'LocalSubnet'、'Any'
+
+    Returns:
+        (是否为任意地址, [(IP版本, 下界整数, 上界整数), ...], [关键字, ...])元组，
+        关键字为LocalSubnet、DefaultGateway等地址名称，统一为小写
+    """
+    if spec.strip().lower() == "any":
+        return True, [], []
+    ranges = []
+    keywords = []
+    for item in spec.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        parsed = _parse_address(item)
+        if parsed is None:
+            keywords.append(item.lower())
+        else:
+            ranges.append(parsed)
+    return False, ranges, keywords
+
+
+def normalize_program(path):
+    """把程序路径统一为展开环境变量并忽略大小写的形式，用于比较"""
+    return ntpath.normcase(ntpath.expandvars(path.strip()))
+
+
+class _RangeFieldIndex:
+    """端口或地址字段的索引：任意值集合、按关键字的哈希索引和按数值空间划分的区间树"""
+
+    def __init__(self):
+        self._any = set()
+        self._keywords = {}
+        # 数值空间（端口为None，地址为IP版本）到(下界, 上界, 规则序号)列表的字典，构建后替换为区间树
+        self._intervals = {}
+        self._trees = {}
+
+    def add(self, rule_id, parsed):
+        """加入一条规则的解析结果"""
+        matches_any, ranges, keywords = parsed
+        if matches_any:
+            self._any.add(rule_id)
+            return
+        for item in ranges:
+            if len(item) == 3:
+                space, low, high = item
+            else:
+                space, (low, high) = None, item
+            self._intervals.setdefault(space, []).append((low, high, rule_id))
+        for keyword in keywords:
+            self._keywords.setdefault(keyword, set()).add(rule_id)
+
+    def build(self):
+        """在全部规则加入后构建区间树"""
+        self._trees = {space: IntervalTree(intervals) for space, intervals in self._intervals.items()}
+        self._intervals = {}
+
+    def find(self, space, point):
+        """查询数值点命中的规则序号集合，包含任意值的规则"""
+        tree = self._trees.get(space)
+        found = set(tree.query(point)) if tree is not None else set()
+        return found | self._any
+
+    def find_keyword(self, keyword):
+        """查询关键字命中的规则序号集合，包含任意值的规则"""
+        return self._keywords.get(keyword.lower(), set()) | self._any
+
+
+class FirewallRuleIndex:
+    """防火墙规则的查询索引
+
+    端口和地址建立区间树，方向、操作、配置文件、协议、程序和启用状态建立哈希索引，
+    查询时取各条件命中的规则集合的交集，不需要遍历全部规则。
+    """
+
+    def __init__(self, rules):
+        """建立索引
+
+        Args:
+            rules: iter_firewall_rules()返回的规则字典的可迭代对象
+        """
+        self.rules = list(rules)
+        self._local_ports = _RangeFieldIndex()
+        self._remote_ports = _RangeFieldIndex()
+        self._local_addresses = _RangeFieldIndex()
+        self._remote_addresses = _RangeFieldIndex()
+        # 字段名到(取值到规则序号集合的字典, 任意值的规则序号集合)
+        self._hashes = {field: ({}, set()) for field in ("direction", "action", "profiles", "protocol", "program")}
+        self._enabled = {True: set(), False: set()}
+
+        for rule_id, rule in enumerate(self.rules):
+            # 没有端口的规则匹配0-65535的全部端口，ICMP规则没有端口，不参与端口查询
+            if not _is_icmp(rule["protocol"]):
+                self._local_ports.add(rule_id, parse_port_spec(rule["local_ports"] or "Any"))
+                self._remote_ports.add(rule_id, parse_port_spec(rule["remote_ports"] or "Any"))
+            self._local_addresses.add(rule_id, parse_address_spec(rule["local_addresses"] or "Any"))
+            self._remote_addresses.add(rule_id, parse_address_spec(rule["remote_addresses"] or "Any"))
+            self._enabled[bool(rule["enabled"])].add(rule_id)
+            for field, (values, any_ids) in self._hashes.items():
+                for value in self._hash_keys(field, rule[field]):
+                    if value in _ANY_VALUES:
+                        any_ids.add(rule_id)
+                    else:
+                        values.setdefault(value, set()).add(rule_id)
+
+        for index in (self._local_ports, self._remote_ports, self._local_addresses, self._remote_addresses):
+            index.build()
+
+    @staticmethod
+    def _hash_keys(field, value):
+        """计算字段取值的哈希键，配置文件可以有多个取值，程序路径展开环境变量后比较"""
+        if field == "program":
+            return [normalize_program(value) if value.strip().lower() not in _ANY_VALUES else ""]
+        if field == "profiles":
+            return [item.strip().lower() for item in value.split(',')] or [""]
+        return [value.strip().lower()]
+
+    def __len__(self):
+        return len(self.rules)
+
+    def _find_port(self, index, port):
+        """查询端口命中的规则序号集合，端口可以是数字或RPC等关键字"""
+        if isinstance(port, int) or str(port).isdigit():
+            return index.find(None, int(port))
+        return index.find_keyword(str(port))
+
+    def _find_address(self, index, address):
+        """查询地址命中的规则序号集合，地址可以是IP地址或LocalSubnet等关键字"""
+        try:
+            ip = ipaddress.ip_address(str(address).strip())
+        except ValueError:
+            return index.find_keyword(str(address).strip())
+        return index.find(ip.version, int(ip))
+
+    def _find_hash(self, field, value):
+        """查询哈希索引命中的规则序号集合，包含取值为Any的规则"""
+        values, any_ids = self._hashes[field]
+        key = self._hash_keys(field, value)[0]
+        if key in _ANY_VALUES:
+            return None
+        return values.get(key, set()) | any_ids
+
+    def find(self, port=None, remote_port=None, address=None, local_address=None, direction=None,
+             action=None, profile=None, protocol=None, program=None, enabled=None):
+        """查询满足全部条件的规则，条件为None时不限制
+
+        Args:
+            port: 本地端口，如3389或'RPC'
+            remote_port: 远程端口
+            address: 远程地址，如'10.1.2.3'或'LocalSubnet'
+            local_address: 本地地址
+            direction: 方向，In或Out
+            action: 操作，Allow、Block或Bypass
+            profile: 配置文件，Domain、Private或Public
+            protocol: 协议，如TCP
+            program: 程序路径，可以包含环境变量，不区分大小写
+            enabled: 是否只返回已启用（True）或已禁用（False）的规则
+
+        Returns:
+            规则字典列表，顺序与netsh输出一致；规则取值为Any的字段匹配任何查询值
+        """
+        candidates = []
+        if port is not None:
+            candidates.append(self._find_port(self._local_ports, port))
+        if remote_port is not None:
+            candidates.append(self._find_port(self._remote_ports, remote_port))
+        if address is not None:
+            candidates.append(self._find_address(self._remote_addresses, address))
+        if local_address is not None:
+            candidates.append(self._find_address(self._local_addresses, local_address))
+        for field, value in (("direction", direction), ("action", action), ("profiles", profile),
+                             ("protocol", protocol), ("program", program)):
+            if value is not None:
+                found = self._find_hash(field, value)
+                if found is not None:
+                    candidates.append(found)
+        if enabled is not None:
+            candidates.append(self._enabled[bool(enabled)])
+
+        if not candidates:
+            return list(self.rules)
+        # 从最小的集合开始求交集
+        candidates.sort(key=len)
+        rule_ids = set(candidates[0])
+        for found in candidates[1:]:
+            if not rule_ids:
+                break
+            rule_ids &= found
+        return [self.rules[rule_id] for rule_id in sorted(rule_ids)]
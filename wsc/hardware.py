@@ -1,22 +1,21 @@
-import subprocess
-import re
+from .executor import get_default_executor
+from .utils import safe_int
+from .wmi import query_wmi, query_wmi_value
 
 class HardwareInfo:
     """Windows硬件信息获取类，使用命令行工具获取硬件信息"""
     
-    def __init__(self):
-        """初始化"""
-        pass
+    def __init__(self, executor=None):
+        """初始化
+        
+        Args:
+            executor: 命令执行器，默认使用所有信息类共享的执行器
+        """
+        self._executor = executor or get_default_executor()
     
     def _run_cmd(self, cmd):
         """执行命令行命令并返回输出"""
-        try:
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True, encoding='gbk')
-            return result.stdout
-        except Exception:
-            # 尝试使用utf-8编码
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True, encoding='utf-8')
-            return result.stdout
+        return self._executor.run(cmd)
     
     def get_cpu_info(self):
         """使用wmic获取CPU信息"""
@@ -29,38 +28,18 @@ class HardwareInfo:
             "current_clock_speed": 0
         }
         
-        # 获取CPU制造商和型号
-        output = self._run_cmd('wmic cpu get manufacturer,name /value')
-        lines = output.strip().split('\n')
-        for line in lines:
-            if '=' in line:
-                key, value = line.split('=', 1)
-                if key.strip() == 'Manufacturer':
-                    cpu_info['manufacturer'] = value.strip()
-                elif key.strip() == 'Name':
-                    cpu_info['model'] = value.strip()
-        
-        # 获取CPU核心数和线程数
-        output = self._run_cmd('wmic cpu get NumberOfCores,NumberOfLogicalProcessors /value')
-        lines = output.strip().split('\n')
-        for line in lines:
-            if '=' in line:
-                key, value = line.split('=', 1)
-                if key.strip() == 'NumberOfCores':
-                    cpu_info['cores'] = int(value.strip()) if value.strip() else 0
-                elif key.strip() == 'NumberOfLogicalProcessors':
-                    cpu_info['threads'] = int(value.strip()) if value.strip() else 0
-        
-        # 获取CPU频率
-        output = self._run_cmd('wmic cpu get MaxClockSpeed,CurrentClockSpeed /value')
-        lines = output.strip().split('\n')
-        for line in lines:
-            if '=' in line:
-                key, value = line.split('=', 1)
-                if key.strip() == 'MaxClockSpeed':
-                    cpu_info['max_clock_speed'] = int(value.strip()) if value.strip() else 0
-                elif key.strip() == 'CurrentClockSpeed':
-                    cpu_info['current_clock_speed'] = int(value.strip()) if value.strip() else 0
+        # 制造商、型号、核心数、线程数和频率来自同一次Win32_Processor查询
+        processors = query_wmi(self._executor, 'Win32_Processor', [
+            'Manufacturer', 'Name', 'NumberOfCores', 'NumberOfLogicalProcessors',
+            'MaxClockSpeed', 'CurrentClockSpeed'
+        ])
+        for processor in processors:
+            cpu_info['manufacturer'] = processor['Manufacturer']
+            cpu_info['model'] = processor['Name']
+            cpu_info['cores'] = safe_int(processor['NumberOfCores'])
+            cpu_info['threads'] = safe_int(processor['NumberOfLogicalProcessors'])
+            cpu_info['max_clock_speed'] = safe_int(processor['MaxClockSpeed'])
+            cpu_info['current_clock_speed'] = safe_int(processor['CurrentClockSpeed'])
         
         return cpu_info
     
@@ -74,17 +53,14 @@ class HardwareInfo:
         }
         
         # 获取物理内存总量
-        output = self._run_cmd('wmic computersystem get TotalPhysicalMemory /value')
-        match = re.search(r'TotalPhysicalMemory=(\d+)', output)
-        if match:
-            memory_info['total'] = int(match.group(1))
+        total = query_wmi_value(self._executor, 'Win32_ComputerSystem', 'TotalPhysicalMemory')
+        if total.isdigit():
+            memory_info['total'] = int(total)
         
         # 使用wmic获取可用内存
-        output = self._run_cmd('wmic OS get FreePhysicalMemory /value')
-        match = re.search(r'FreePhysicalMemory=(\d+)', output)
-        if match:
-            available_kb = int(match.group(1))
-            available_bytes = available_kb * 1024
+        free_kb = query_wmi_value(self._executor, 'Win32_OperatingSystem', 'FreePhysicalMemory')
+        if free_kb.isdigit():
+            available_bytes = int(free_kb) * 1024
             memory_info['available'] = available_bytes
             memory_info['used'] = memory_info['total'] - available_bytes
             if memory_info['total'] > 0:
@@ -92,68 +68,36 @@ class HardwareInfo:
         
         return memory_info
     
+    def _get_disk_drives(self):
+        """获取所有磁盘驱动器，固定硬盘和USB存储设备共用同一次Win32_DiskDrive查询"""
+        return query_wmi(self._executor, 'Win32_DiskDrive', ['Caption', 'Size', 'InterfaceType', 'Name', 'MediaType'])
+    
     def get_disk_info(self):
         """使用wmic获取硬盘信息，仅返回固定硬盘，排除USB设备"""
         disks = []
         
-        # 使用wmic获取所有磁盘驱动器
-        output = self._run_cmd('wmic diskdrive get caption,size,interfacetype,name')
-        
-        # 处理wmic输出
-        lines = output.strip().split('\n')
-        if len(lines) < 2:
-            return disks
+        # 已知的接口类型（IDE/SATA/USB等）
+        interface_types = ['IDE', 'SATA', 'PCIe', 'USB', 'SCSI', 'SAS']
         
-        # 跳过标题行，处理数据行
-        for line in lines[1:]:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # 从输出中可以看到，实际字段顺序是：Caption, InterfaceType, Name, Size
-            # 使用更可靠的解析方式，处理没有size的情况
-            # 首先查找InterfaceType，然后查找Name
-            
-            # 查找InterfaceType (IDE/SATA/USB等)
-            interface_types = ['IDE', 'SATA', 'PCIe', 'USB', 'SCSI', 'SAS']
-            interface_type = None
-            for iface in interface_types:
-                if f' {iface} ' in f' {line} ':
-                    interface_type = iface
-                    break
-            
-            if not interface_type:
+        for drive in self._get_disk_drives():
+            interface_type = drive['InterfaceType']
+            if interface_type not in interface_types:
                 continue
             
             # 排除USB设备
             if interface_type == 'USB':
                 continue
             
-            # 查找Name (\\.\PHYSICALDRIVEX)
-            name_start = line.find('\\.\\PHYSICALDRIVE')
-            if name_start == -1:
+            # 只保留物理磁盘 (\\.\PHYSICALDRIVEX)
+            if '\\.\\PHYSICALDRIVE' not in drive['Name']:
                 continue
             
-            # 提取Caption (从开始到InterfaceType)
-            caption = line[:line.find(f' {interface_type} ')].strip()
-            
-            # 提取Name (从PHYSICALDRIVE开始到行尾或下一个空格)
-            name_end = line.find(' ', name_start)
-            if name_end == -1:
-                name = line[name_start:].strip()
-            else:
-                name = line[name_start:name_end].strip()
-            
-            # 提取Size (从Name之后到行尾)
-            size_str = line[name_end:].strip() if name_end != -1 else ''
-            size = int(size_str) if size_str and size_str.isdigit() else 0
-            
             disks.append({
-                "model": caption,
+                "model": drive['Caption'],
                 "manufacturer": "",
-                "size": size,
+                "size": safe_int(drive['Size']),
                 "interface_type": interface_type,
-                "name": name
+                "name": drive['Name']
             })
         
         return disks
@@ -162,43 +106,20 @@ class HardwareInfo:
         """使用wmic获取分区信息"""
         partitions = []
         
-        output = self._run_cmd('wmic logicaldisk get deviceid,description,freespace,size,volumename /value')
-        partition_sections = output.strip().split('\n\n')
+        logical_disks = query_wmi(self._executor, 'Win32_LogicalDisk', ['DeviceID', 'Description', 'FreeSpace', 'Size', 'VolumeName'])
         
-        for section in partition_sections:
-            if not section:
-                continue
-            
+        for logical_disk in logical_disks:
             partition = {
-                "device": "",
-                "mountpoint": "",
-                "description": "",
-                "total": 0,
-                "free": 0,
+                "device": logical_disk['DeviceID'],
+                "mountpoint": logical_disk['DeviceID'],
+                "description": logical_disk['Description'],
+                "total": safe_int(logical_disk['Size']),
+                "free": safe_int(logical_disk['FreeSpace']),
                 "used": 0,
                 "percent": 0,
-                "volume_name": ""
+                "volume_name": logical_disk['VolumeName']
             }
             
-            lines = section.split('\n')
-            for line in lines:
-                if '=' in line:
-                    key, value = line.split('=', 1)
-                    key = key.strip()
-                    value = value.strip()
-                    
-                    if key == 'DeviceID':
-                        partition['device'] = value
-                        partition['mountpoint'] = value
-                    elif key == 'Description':
-                        partition['description'] = value
-                    elif key == 'FreeSpace' and value:
-                        partition['free'] = int(value)
-                    elif key == 'Size' and value:
-                        partition['total'] = int(value)
-                    elif key == 'VolumeName':
-                        partition['volume_name'] = value
-            
             if partition['total'] > 0:
                 partition['used'] = partition['total'] - partition['free']
                 partition['percent'] = round((partition['used'] / partition['total']) * 100, 1)
@@ -211,37 +132,15 @@ class HardwareInfo:
         """使用wmic获取显卡信息"""
         gpus = []
         
-        output = self._run_cmd('wmic path win32_VideoController get AdapterCompatibility,Name,AdapterRAM,DriverVersion /value')
-        gpu_sections = output.strip().split('\n\n')
+        controllers = query_wmi(self._executor, 'Win32_VideoController', ['AdapterCompatibility', 'Name', 'AdapterRAM', 'DriverVersion'])
         
-        for section in gpu_sections:
-            if not section:
-                continue
-            
-            gpu_info = {
-                "manufacturer": "",
-                "model": "",
-                "vram": 0,
-                "driver_version": ""
-            }
-            
-            lines = section.split('\n')
-            for line in lines:
-                if '=' in line:
-                    key, value = line.split('=', 1)
-                    key = key.strip()
-                    value = value.strip()
-                    
-                    if key == 'AdapterCompatibility':
-                        gpu_info['manufacturer'] = value
-                    elif key == 'Name':
-                        gpu_info['model'] = value
-                    elif key == 'AdapterRAM' and value:
-                        gpu_info['vram'] = int(value)
-                    elif key == 'DriverVersion':
-                        gpu_info['driver_version'] = value
-            
-            gpus.append(gpu_info)
+        for controller in controllers:
+            gpus.append({
+                "manufacturer": controller['AdapterCompatibility'],
+                "model": controller['Name'],
+                "vram": safe_int(controller['AdapterRAM']),
+                "driver_version": controller['DriverVersion']
+            })
         
         return gpus
     
@@ -253,20 +152,10 @@ class HardwareInfo:
             "serial_number": ""
         }
         
-        output = self._run_cmd('wmic baseboard get product,manufacturer,serialnumber /value')
-        lines = output.strip().split('\n')
-        for line in lines:
-            if '=' in line:
-                key, value = line.split('=', 1)
-                key = key.strip()
-                value = value.strip()
-                
-                if key == 'Manufacturer':
-                    motherboard_info['manufacturer'] = value
-                elif key == 'Product':
-                    motherboard_info['model'] = value
-                elif key == 'SerialNumber':
-                    motherboard_info['serial_number'] = value
+        for board in query_wmi(self._executor, 'Win32_BaseBoard', ['Product', 'Manufacturer', 'SerialNumber']):
+            motherboard_info['manufacturer'] = board['Manufacturer']
+            motherboard_info['model'] = board['Product']
+            motherboard_info['serial_number'] = board['SerialNumber']
         
         return motherboard_info
     
@@ -274,39 +163,17 @@ class HardwareInfo:
         """使用wmic获取网络适配器信息"""
         adapters = []
         
-        output = self._run_cmd('wmic nic get name,manufacturer,macaddress,speed,netenabled /value')
-        adapter_sections = output.strip().split('\n\n')
+        nics = query_wmi(self._executor, 'Win32_NetworkAdapter', ['Name', 'Manufacturer', 'MACAddress', 'Speed', 'NetEnabled'])
         
-        for section in adapter_sections:
-            if not section:
-                continue
-            
+        for nic in nics:
             adapter_info = {
-                "name": "",
-                "manufacturer": "",
-                "mac_address": "",
-                "speed": 0,
-                "status": "Disabled"
+                "name": nic['Name'],
+                "manufacturer": nic['Manufacturer'],
+                "mac_address": nic['MACAddress'],
+                "speed": safe_int(nic['Speed']),
+                "status": "Enabled" if nic['NetEnabled'] == 'TRUE' else "Disabled"
             }
             
-            lines = section.split('\n')
-            for line in lines:
-                if '=' in line:
-                    key, value = line.split('=', 1)
-                    key = key.strip()
-                    value = value.strip()
-                    
-                    if key == 'Name':
-                        adapter_info['name'] = value
-                    elif key == 'Manufacturer':
-                        adapter_info['manufacturer'] = value
-                    elif key == 'MACAddress':
-                        adapter_info['mac_address'] = value
-                    elif key == 'Speed' and value:
-                        adapter_info['speed'] = int(value)
-                    elif key == 'NetEnabled' and value == 'TRUE':
-                        adapter_info['status'] = "Enabled"
-            
             if adapter_info['mac_address']:  # 只添加有MAC地址的适配器
                 adapters.append(adapter_info)
         
@@ -321,22 +188,11 @@ class HardwareInfo:
             "serial_number": ""
         }
         
-        output = self._run_cmd('wmic bios get manufacturer,version,releasedate,serialnumber /value')
-        lines = output.strip().split('\n')
-        for line in lines:
-            if '=' in line:
-                key, value = line.split('=', 1)
-                key = key.strip()
-                value = value.strip()
-                
-                if key == 'Manufacturer':
-                    bios_info['manufacturer'] = value
-                elif key == 'Version':
-                    bios_info['version'] = value
-                elif key == 'ReleaseDate':
-                    bios_info['release_date'] = value
-                elif key == 'SerialNumber':
-                    bios_info['serial_number'] = value
+        for bios in query_wmi(self._executor, 'Win32_BIOS', ['Manufacturer', 'Version', 'ReleaseDate', 'SerialNumber']):
+            bios_info['manufacturer'] = bios['Manufacturer']
+            bios_info['version'] = bios['Version']
+            bios_info['release_date'] = bios['ReleaseDate']
+            bios_info['serial_number'] = bios['SerialNumber']
         
         return bios_info
     
@@ -344,60 +200,44 @@ class HardwareInfo:
         """使用wmic获取USB存储设备信息"""
         usb_devices = []
         
-        # 使用wmic获取所有磁盘驱动器，然后过滤出USB设备
-        output = self._run_cmd('wmic diskdrive get caption,size,interfacetype,name,mediatype /value')
-        
-        # 处理输出，逐行解析，重新组织设备信息
-        current_device = None
-        lines = [line.strip() for line in output.strip().split('\n') if line.strip()]
-        
-        for line in lines:
-            if '=' in line:
-                key, value = line.split('=', 1)
-                key = key.strip()
-                value = value.strip()
-                
-                # 检查是否开始新的设备信息
-                if key == 'Caption':
-                    # 如果有当前设备且是USB设备，添加到列表
-                    if current_device and current_device['interface_type'] == 'USB' and current_device['name']:
-                        usb_devices.append(current_device)
-                    # 创建新设备信息
-                    current_device = {
-                        "model": value,
-                        "manufacturer": "",
-                        "size": 0,
-                        "interface_type": "",
-                        "name": "",
-                        "media_type": ""
-                    }
-                elif current_device:
-                    # 解析当前设备的其他字段
-                    if key == 'Size' and value:
-                        current_device['size'] = int(value)
-                    elif key == 'InterfaceType':
-                        current_device['interface_type'] = value
-                    elif key == 'Name':
-                        current_device['name'] = value
-                    elif key == 'MediaType':
-                        current_device['media_type'] = value
-        
-        # 处理最后一个设备
-        if current_device and current_device['interface_type'] == 'USB' and current_device['name']:
-            usb_devices.append(current_device)
+        # 从所有磁盘驱动器中过滤出USB设备
+        for drive in self._get_disk_drives():
+            if drive['InterfaceType'] != 'USB' or not drive['Name']:
+                continue
+            
+            usb_devices.append({
+                "model": drive['Caption'],
+                "manufacturer": "",
+                "size": safe_int(drive['Size']),
+                "interface_type": drive['InterfaceType'],
+                "name": drive['Name'],
+                "media_type": drive['MediaType']
+            })
         
         return usb_devices
     
-    def get_all_hardware_info(self):
-        """获取所有硬件信息"""
+    def get_collectors(self):
+        """获取字段名到采集方法的映射
+        
+        Returns:
+            字段名到无参采集方法的字典，与get_all_hardware_info()返回的字段一一对应
+        """
         return {
-            "cpu": self.get_cpu_info(),
-            "memory": self.get_memory_info(),
-            "disks": self.get_disk_info(),
-            "usb_devices": self.get_usb_storage_info(),
-            "partitions": self.get_partition_info(),
-            "gpus": self.get_gpu_info(),
-            "motherboard": self.get_motherboard_info(),
-            "network_adapters": self.get_network_adapters(),
-            "bios": self.get_bios_info()
+            "cpu": self.get_cpu_info,
+            "memory": self.get_memory_info,
+            "disks": self.get_disk_info,
+            "usb_devices": self.get_usb_storage_info,
+            "partitions": self.get_partition_info,
+            "gpus": self.get_gpu_info,
+            "motherboard": self.get_motherboard_info,
+            "network_adapters": self.get_network_adapters,
+            "bios": self.get_bios_info
         }
+    
+    def get_all_hardware_info(self, max_workers=None):
+        """获取所有硬件信息
+        
+        Args:
+            max_workers: 并行采集的线程数量，默认使用执行器的并发上限，为1时按顺序采集
+        """
+        return self._executor.collect(self.get_collectors(), max_workers)
@@ -1,10 +1,8 @@
 """多语言支持模块"""
 
-import gettext
 import os
 import sys
-import locale
-import ctypes
+import threading
 
 # 定义支持的语言列表
 SUPPORTED_LANGUAGES = {
@@ -22,9 +20,11 @@ def get_system_language():
     Returns:
         语言代码，如 'zh_CN' 或 'en_US'
     """
+    import locale
     try:
         # 尝试使用ctypes获取Windows系统语言
         if sys.platform == 'win32':
+            import ctypes
             # 获取系统区域设置
             windll = ctypes.windll.kernel32
             lang_id = windll.GetUserDefaultUILanguage()
@@ -49,6 +49,8 @@ def get_supported_language(lang_code):
     """
     if lang_code in SUPPORTED_LANGUAGES:
         return lang_code
+    if not lang_code:
+        return 'zh_CN'
     # 检查语言前缀是否支持
     lang_prefix = lang_code.split('_')[0]
     for supported_lang in SUPPORTED_LANGUAGES:
@@ -57,17 +59,40 @@ def get_supported_language(lang_code):
     # 默认使用中文
     return 'zh_CN'
 
-# 获取系统语言
-system_lang = get_system_language()
-supported_lang = get_supported_language(system_lang)
+# 翻译器在第一次翻译消息时才加载，导入模块时不检测系统语言、不读取翻译目录
+trans = None
+_trans_lock = threading.Lock()
+
+def _load_translation(language_code):
+    """加载指定语言的翻译目录
+    
+    Args:
+        language_code: 语言代码，如 'zh_CN' 或 'en_US'
+        
+    Returns:
+        gettext翻译器，找不到翻译目录时返回不做翻译的翻译器
+    """
+    import gettext
+    return gettext.translation(
+        'wsc',
+        localedir=i18n_dir,
+        languages=[language_code],
+        fallback=True
+    )
 
-# 初始化翻译器
-trans = gettext.translation(
-    'wsc',
-    localedir=i18n_dir,
-    languages=[supported_lang],  # 使用系统主语言
-    fallback=True
-)
+def get_translation():
+    """获取当前使用的翻译器，第一次调用时按系统主语言加载
+    
+    Returns:
+        gettext翻译器
+    """
+    global trans
+    if trans is None:
+        with _trans_lock:
+            if trans is None:
+                # 使用系统主语言
+                trans = _load_translation(get_supported_language(get_system_language()))
+    return trans
 
 def _(message):
     """翻译函数
@@ -78,7 +103,7 @@ def _(message):
     Returns:
         翻译后的消息
     """
-    return trans.gettext(message)
+    return get_translation().gettext(message)
 
 def set_language(language_code):
     """设置当前使用的语言
@@ -89,12 +114,7 @@ def set_language(language_code):
     global trans
     
     if language_code in SUPPORTED_LANGUAGES:
-        trans = gettext.translation(
-            'wsc',
-            localedir=i18n_dir,
-            languages=[language_code],
-            fallback=True
-        )
+        trans = _load_translation(language_code)
     else:
         print(f"不支持的语言: {language_code}")
         print(f"支持的语言: {', '.join(SUPPORTED_LANGUAGES.keys())}")
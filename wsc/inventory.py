@@ -0,0 +1,240 @@
+"""已安装程序的增量清单模块
+
+清单按注册表子键路径保存每个已安装程序的值和子键的最后写入时间，可以选择持久化到磁盘上的JSON文件。
+刷新时只读取新增或最后写入时间发生变化的子键，已删除的子键从清单中移除，
+安装、卸载和变更记录为带时间戳的事件，可以按时间查询两次轮询之间的变化。
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from .utils import iter_registry_subtree
+
+# 已安装程序所在的注册表路径
+INSTALLED_PROGRAM_PATHS = [
+    r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall",
+    r"SOFTWARE\WOW6432Node\Microsoft\Windows\CurrentVersion\Uninstall"
+]
+
+# 已安装程序需要读取的注册表值
+INSTALLED_PROGRAM_VALUES = (
+    "DisplayName", "DisplayVersion", "Publisher", "InstallDate", "UninstallString", "InstallLocation"
+)
+
+# 清单文件格式版本，版本不一致时重新建立清单
+INVENTORY_VERSION = 1
+
+# 事件保留的时间（秒）和最大数量
+INVENTORY_EVENT_RETENTION = 90 * 24 * 3600
+INVENTORY_MAX_EVENTS = 10000
+
+
+def get_default_inventory_path():
+    """获取默认的清单文件路径，可以通过环境变量WSC_INVENTORY_PATH修改"""
+    path = os.environ.get('WSC_INVENTORY_PATH')
+    if path:
+        return path
+    base = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'wsc', 'installed_programs.json')
+
+
+def to_program(values):
+    """把Uninstall子键中的值转换为已安装程序字典"""
+    return {
+        "name": values.get("DisplayName", ""),
+        "version": values.get("DisplayVersion", ""),
+        "publisher": values.get("Publisher", ""),
+        "install_date": values.get("InstallDate", ""),
+        "uninstall_string": values.get("UninstallString", ""),
+        "install_location": values.get("InstallLocation", "")
+    }
+
+
+def _to_json_values(values):
+    """只保留可以写入JSON的值，其他类型的值转换为字符串"""
+    return {
+        name: value if isinstance(value, (str, int, float)) or value is None else str(value)
+        for name, value in values.items()
+    }
+
+
+class InstalledProgramInventory:
+    """按子键最后写入时间增量刷新的已安装程序清单"""
+
+    def __init__(self, path=None, backend=None):
+        """初始化
+
+        Args:
+            path: 清单文件路径，为True时使用get_default_inventory_path()，
+                默认为None，只在内存中保存清单，不读写任何文件
+            backend: 注册表后端，默认为registry.get_default_registry_backend()
+        """
+        self.path = get_default_inventory_path() if path is True else path or None
+        self.backend = backend
+        self._lock = threading.Lock()
+        # 子键路径到{"last_write": 最后写入时间, "values": 值字典}的字典
+        self._keys = {}
+        self._events = []
+        # 清单建立的时间，以及事件记录完整的起始时间（更早的事件已被清理）
+        self.created_at = None
+        self.history_start = None
+        self.refreshed_at = None
+        # 清单文件无法读取或格式不正确时的原因，此时不会覆盖该文件，清单只保存在内存中
+        self.load_error = None
+        self._load()
+
+    def _load(self):
+        """从磁盘读取清单，文件不存在时从空清单开始
+
+        文件存在但无法读取、无法解析或版本不一致时保留原文件，不再写入，
+        避免覆盖清单建立时间和事件记录。
+        """
+        if not self.path:
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            self.load_error = str(e)
+            return
+        if not isinstance(data, dict) or data.get("version") != INVENTORY_VERSION:
+            self.load_error = "清单文件版本不一致: %r" % (data.get("version") if isinstance(data, dict) else None)
+            return
+        self._keys = data.get("keys", {})
+        self._events = data.get("events", [])
+        self.created_at = data.get("created_at")
+        self.history_start = data.get("history_start", self.created_at)
+        self.refreshed_at = data.get("refreshed_at")
+
+    def _save(self):
+        """先写入同一目录下名称唯一的临时文件再替换，避免中断或多个进程同时写入时留下不完整的清单"""
+        if not self.path or self.load_error is not None:
+            return
+        data = {
+            "version": INVENTORY_VERSION,
+            "created_at": self.created_at,
+            "history_start": self.history_start,
+            "refreshed_at": self.refreshed_at,
+            "keys": self._keys,
+            "events": self._events
+        }
+        directory = os.path.dirname(os.path.abspath(self.path))
+        temp_path = None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=directory, suffix='.tmp',
+                                             prefix=os.path.basename(self.path) + '.', delete=False) as f:
+                temp_path = f.name
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+        except OSError:
+            # 无法写入时清单仍然在内存中有效，下一次刷新重试
+            if temp_path is not None:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+
+    def refresh(self):
+        """重新枚举Uninstall子键，只读取新增或最后写入时间变化的子键
+
+        Returns:
+            本次刷新产生的事件列表
+        """
+        with self._lock:
+            now = time.time()
+            previous = self._keys
+
+            def changed(path, last_write):
+                entry = previous.get(path)
+                return entry is None or entry["last_write"] != last_write
+
+            keys = {}
+            for reg_path in INSTALLED_PROGRAM_PATHS:
+                prefix = reg_path + '\\'
+                want_values = lambda subkey, last_write, prefix=prefix: changed(prefix + subkey, last_write)
+                for subkey, values, last_write in iter_registry_subtree(
+                        reg_path, INSTALLED_PROGRAM_VALUES, want_values=want_values, backend=self.backend):
+                    path = prefix + subkey
+                    if values is None:
+                        keys[path] = previous[path]
+                    else:
+                        keys[path] = {"last_write": last_write, "values": _to_json_values(values)}
+
+            events = []
+            # 第一次建立清单时不记录事件，已有程序不视为新安装
+            if self.created_at is not None:
+                events = self._diff(previous, keys, now)
+            else:
+                self.created_at = self.history_start = now
+            self._keys = keys
+            self.refreshed_at = now
+            self._trim_events(self._events + events, now)
+            self._save()
+            return events
+
+    def _trim_events(self, events, now):
+        """清理超出保留时间或数量的事件，并推后事件记录完整的起始时间"""
+        kept = [event for event in events if now - event["time"] <= INVENTORY_EVENT_RETENTION]
+        kept = kept[-INVENTORY_MAX_EVENTS:]
+        if len(kept) < len(events):
+            dropped = events[len(events) - len(kept) - 1]
+            self.history_start = max(self.history_start or 0, dropped["time"])
+        self._events = kept
+
+    @staticmethod
+    def _diff(previous, current, now):
+        """比较两次刷新的子键，生成安装、卸载和变更事件，只关心带有DisplayName的子键"""
+        events = []
+        for path, entry in current.items():
+            values = entry["values"]
+            old = previous.get(path)
+            if old is entry:
+                continue
+            old_values = old["values"] if old is not None else {}
+            if "DisplayName" in values and "DisplayName" not in old_values:
+                events.append({"event": "install", "time": now, "key": path, "program": to_program(values)})
+            elif "DisplayName" not in values and "DisplayName" in old_values:
+                events.append({"event": "uninstall", "time": now, "key": path, "program": to_program(old_values)})
+            elif "DisplayName" in values and values != old_values:
+                events.append({"event": "change", "time": now, "key": path, "program": to_program(values),
+                               "previous": to_program(old_values)})
+        for path, entry in previous.items():
+            if path not in current and "DisplayName" in entry["values"]:
+                events.append({"event": "uninstall", "time": now, "key": path,
+                               "program": to_program(entry["values"])})
+        return events
+
+    def get_programs(self):
+        """获取清单中带有DisplayName的已安装程序，不刷新清单"""
+        with self._lock:
+            return [to_program(entry["values"]) for entry in self._keys.values()
+                    if "DisplayName" in entry["values"]]
+
+    def get_changes(self, since):
+        """获取指定时间之后的安装、卸载和变更
+
+        Args:
+            since: Unix时间戳
+
+        Returns:
+            包含installed、uninstalled、changed列表的字典，
+            complete为False表示since早于清单建立时间或已超出事件保留范围，结果可能不完整
+        """
+        with self._lock:
+            events = [event for event in self._events if event["time"] > since]
+            return {
+                "since": since,
+                "until": self.refreshed_at,
+                "complete": self.history_start is not None and since >= self.history_start,
+                "installed": [event["program"] for event in events if event["event"] == "install"],
+                "uninstalled": [event["program"] for event in events if event["event"] == "uninstall"],
+                "changed": [
+                    {"program": event["program"], "previous": event["previous"]}
+                    for event in events if event["event"] == "change"
+                ]
+            }
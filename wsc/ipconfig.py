@@ -0,0 +1,171 @@
+"""ipconfig /all输出解析模块
+
+把ipconfig /all的输出按行解析为统一的适配器模型，支持中文和英文系统，
+NetworkInfo中读取适配器、IP地址、网关和DNS服务器的方法都是这个模型的视图。
+"""
+
+import re
+
+# 字段行："   标签 . . . . . : 值"，标签与值之间的分隔符总是" :"，IPv6地址中的冒号前没有空格
+_FIELD_PATTERN = re.compile(r'^\s+(\S.*?)[\s.]*\s:(?:\s(.*))?$')
+
+# 适配器标题行："Ethernet adapter 以太网:"、"以太网适配器 以太网:"
+_ADAPTER_PATTERN = re.compile(r'^(.*?)\s*(?:adapter|适配器)\s+(.+?):\s*$', re.IGNORECASE)
+
+# 地址后的状态标记，如"(Preferred)"、"(首选)"
+_STATUS_SUFFIX = re.compile(r'\s*\([^)]*\)\s*$')
+
+# 标签（小写）到模型字段的映射
+IPCONFIG_LABELS = {
+    # 全局设置
+    "host name": "host_name",
+    "主机名": "host_name",
+    "primary dns suffix": "primary_dns_suffix",
+    "主 dns 后缀": "primary_dns_suffix",
+    "dns suffix search list": "dns_suffix_search_list",
+    "dns 后缀搜索列表": "dns_suffix_search_list",
+    # 适配器
+    "media state": "media_state",
+    "媒体状态": "media_state",
+    "connection-specific dns suffix": "dns_suffix",
+    "连接特定的 dns 后缀": "dns_suffix",
+    "connection-specific dns suffix search list": "dns_suffix_search_list",
+    "连接特定的 dns 后缀搜索列表": "dns_suffix_search_list",
+    "description": "description",
+    "描述": "description",
+    "physical address": "mac_address",
+    "物理地址": "mac_address",
+    "dhcp enabled": "dhcp_enabled",
+    "dhcp 已启用": "dhcp_enabled",
+    "ipv4 address": "ipv4_addresses",
+    "ipv4 地址": "ipv4_addresses",
+    "autoconfiguration ipv4 address": "ipv4_addresses",
+    "自动配置 ipv4 地址": "ipv4_addresses",
+    "ipv6 address": "ipv6_addresses",
+    "ipv6 地址": "ipv6_addresses",
+    "temporary ipv6 address": "ipv6_addresses",
+    "临时 ipv6 地址": "ipv6_addresses",
+    "link-local ipv6 address": "ipv6_addresses",
+    "本地链接 ipv6 地址": "ipv6_addresses",
+    "subnet mask": "subnet_masks",
+    "子网掩码": "subnet_masks",
+    "default gateway": "gateways",
+    "默认网关": "gateways",
+    "dhcp server": "dhcp_server",
+    "dhcp 服务器": "dhcp_server",
+    "dns servers": "dns_servers",
+    "dns 服务器": "dns_servers",
+}
+
+# 可以有多个值（续行）的字段
+_LIST_FIELDS = {"ipv4_addresses", "ipv6_addresses", "subnet_masks", "gateways", "dns_servers",
+                "dns_suffix_search_list"}
+
+# 表示"是"的取值
+_YES_VALUES = {"yes", "是"}
+
+
+def normalize_mac(mac):
+    """把MAC地址统一为冒号分隔的大写形式，如'00:11:22:33:44:55'"""
+    return (mac or '').strip().upper().replace('-', ':')
+
+
+def _new_adapter(adapter_type, name):
+    """创建空的适配器模型"""
+    return {
+        "name": name,
+        "type": adapter_type,
+        "description": "",
+        "mac_address": "",
+        "ipv4_addresses": [],
+        "ipv6_addresses": [],
+        "subnet_masks": [],
+        "gateways": [],
+        "dns_servers": [],
+        "dhcp_enabled": False,
+        "dhcp_server": "",
+        "dns_suffix": "",
+        "dns_suffix_search_list": [],
+        "media_disconnected": False
+    }
+
+
+class IpconfigModel:
+    """ipconfig /all的解析结果，包含全局设置和按MAC地址、名称索引的适配器列表"""
+
+    def __init__(self, output):
+        """解析ipconfig /all的输出
+
+        Args:
+            output: ipconfig /all的输出
+        """
+        self.settings = {"host_name": "", "primary_dns_suffix": "", "dns_suffix_search_list": []}
+        self.adapters = []
+        self._parse(output)
+        self.by_mac = {}
+        self.by_name = {}
+        for adapter in self.adapters:
+            if adapter["mac_address"]:
+                self.by_mac.setdefault(normalize_mac(adapter["mac_address"]), adapter)
+            self.by_name.setdefault(adapter["name"], adapter)
+
+    def _parse(self, output):
+        """逐行解析输出，一次遍历完成"""
+        section = self.settings
+        field = None
+        for line in output.split('\n'):
+            if not line.strip():
+                continue
+
+            if not line[0].isspace():
+                # 标题行：适配器或全局设置
+                match = _ADAPTER_PATTERN.match(line)
+                if match:
+                    section = _new_adapter(match.group(1).strip(), match.group(2).strip())
+                    self.adapters.append(section)
+                else:
+                    section = self.settings
+                field = None
+                continue
+
+            match = _FIELD_PATTERN.match(line)
+            if match:
+                field = IPCONFIG_LABELS.get(match.group(1).strip().lower())
+                value = (match.group(2) or '').strip()
+                if field == "media_state" and section is not self.settings:
+                    # 只有断开连接时才会显示媒体状态
+                    section["media_disconnected"] = True
+                    field = None
+                    continue
+                if field not in section:
+                    field = None
+                    continue
+                if field in _LIST_FIELDS:
+                    if value:
+                        section[field].append(_STATUS_SUFFIX.sub('', value))
+                elif field == "dhcp_enabled":
+                    section[field] = value.lower() in _YES_VALUES
+                else:
+                    section[field] = value
+            elif field in _LIST_FIELDS:
+                # 续行：上一个多值字段的下一个值
+                section[field].append(_STATUS_SUFFIX.sub('', line.strip()))
+
+    def get_adapter_by_mac(self, mac):
+        """按MAC地址查找适配器，MAC地址可以使用'-'或':'分隔
+
+        Args:
+            mac: MAC地址
+
+        Returns:
+            适配器字典，找不到时返回None
+        """
+        return self.by_mac.get(normalize_mac(mac))
+
+
+def get_ipv4_gateway(adapter):
+    """获取适配器的第一个IPv4默认网关，没有时返回None"""
+    for gateway in adapter["gateways"]:
+        if ':' not in gateway:
+            return gateway
+    return None
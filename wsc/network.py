@@ -1,214 +1,606 @@
-import subprocess
+import os
 import re
 import socket
+import tempfile
+import threading
+from collections import Counter
+from xml.etree import ElementTree
+from .executor import get_default_executor
+from .ipconfig import IpconfigModel, get_ipv4_gateway, normalize_mac
+from .registry import HKEY_LOCAL_MACHINE, get_default_registry_backend
+from .tasklist import ProcessTableCache, TASKLIST_CMD
+from .wmi import query_wmi
+
+# netstat连接行的协议列，标题行随系统语言变化，因此按协议列识别连接行
+CONNECTION_PROTOCOLS = ('TCP', 'UDP')
+
+
+def _parse_connection_line(line):
+    """解析netstat -ano的一行
+    
+    Args:
+        line: 输出行
+        
+    Returns:
+        (协议, 本地地址, 远程地址, 状态, PID字符串)元组，不是连接行时返回None
+    """
+    parts = line.split()
+    if len(parts) < 4 or parts[0] not in CONNECTION_PROTOCOLS:
+        return None
+    # UDP连接没有状态列
+    state = parts[3] if len(parts) > 4 else ''
+    return parts[0], parts[1], parts[2], state, parts[-1]
+
+
+def _get_port(address):
+    """获取'1.2.3.4:80'或'[::1]:80'形式地址的端口，端口为'*'时返回None"""
+    port = address.rpartition(':')[2]
+    return int(port) if port.isdigit() else None
+
+
+def _get_host(address):
+    """获取'1.2.3.4:80'或'[::1]:80'形式地址的主机部分"""
+    host = address.rpartition(':')[0]
+    if host.startswith('[') and host.endswith(']'):
+        host = host[1:-1]
+    return host
+
+
+def _to_filter(value, convert):
+    """把单个值或值的集合转换为集合，None表示不过滤"""
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return {convert(item) for item in value}
+    return {convert(value)}
+
+
+def _connection_to_dict(row):
+    """把连接行元组转换为与get_network_connections()条目一致的字典"""
+    proto, local_addr, foreign_addr, state, pid = row
+    return {
+        "proto": proto,
+        "local_addr": local_addr,
+        "foreign_addr": foreign_addr,
+        "state": state,
+        "pid": int(pid) if pid.isdigit() else None
+    }
+
+
+def _join_process(connection, processes):
+    """按PID把进程表中的映像名称和会话加入连接字典
+
+    Args:
+        connection: 连接字典
+        processes: PID到进程字典的字典
+
+    Returns:
+        加入process_name、session_name、session_number字段后的连接字典，找不到进程时为空字符串
+    """
+    process = processes.get(connection["pid"])
+    connection["process_name"] = process["name"] if process else ""
+    connection["session_name"] = process["session_name"] if process else ""
+    connection["session_number"] = process["session_number"] if process else ""
+    return connection
+
+
+# netstat -e统计表的行名称（小写）到字段的映射，支持中文和英文系统
+NETSTAT_E_ROWS = {
+    "bytes": "bytes",
+    "字节": "bytes",
+    "unicast packets": "unicast",
+    "单播数据包": "unicast",
+    "non-unicast packets": "non_unicast",
+    "非单播数据包": "non_unicast",
+    "discards": "discards",
+    "丢弃": "discards",
+    "errors": "errors",
+    "错误": "errors"
+}
+
+# 网卡流量计数器字段到MSFT_NetAdapterStatisticsSettingData属性的映射，多个属性的值相加
+INTERFACE_COUNTER_PROPERTIES = {
+    "bytes_sent": ['SentBytes'],
+    "bytes_recv": ['ReceivedBytes'],
+    "packets_sent": ['SentUnicastPackets', 'SentMulticastPackets', 'SentBroadcastPackets'],
+    "packets_recv": ['ReceivedUnicastPackets', 'ReceivedMulticastPackets', 'ReceivedBroadcastPackets'],
+    "errors_sent": ['OutboundPacketErrors'],
+    "errors_recv": ['ReceivedPacketErrors'],
+    "discards_sent": ['OutboundDiscardedPackets'],
+    "discards_recv": ['ReceivedDiscardedPackets']
+}
+
+
+def normalize_guid(guid):
+    """把网卡GUID统一为带花括号的大写形式，如'{4D36E972-...}'"""
+    guid = (guid or '').strip().upper()
+    if guid and not guid.startswith('{'):
+        guid = '{' + guid + '}'
+    return guid
+
+
+# 网络适配器设备类的注册表路径，每个子键（0000、0001……）对应一个网卡，NetCfgInstanceId为网卡GUID
+NETWORK_CLASS_KEY = r'SYSTEM\CurrentControlSet\Control\Class\{4d36e972-e325-11ce-bfc1-08002be10318}'
+
+# 表示无线网卡的*PhysicalMediaType取值（NdisPhysicalMediumWirelessLan、NdisPhysicalMediumNative802_11）
+WIRELESS_PHYSICAL_MEDIA_TYPES = {1, 9}
+
+
+def _is_wireless_class_entry(physical_media_type, lower_range):
+    """根据网卡类注册表子键中的物理介质类型和绑定接口判断是否为无线网卡"""
+    if physical_media_type in WIRELESS_PHYSICAL_MEDIA_TYPES:
+        return True
+    lower_range = (lower_range or '').lower()
+    return 'wifi' in lower_range or 'wlan' in lower_range
+
+
+def read_network_class_index(backend=None):
+    """遍历一次网络适配器设备类的注册表键，建立网卡注册表信息的索引
+
+    只打开一次父键，子键使用相对句柄打开，每个网卡只读取需要的值。
+
+    Args:
+        backend: 注册表后端，默认为registry.get_default_registry_backend()
+
+    Returns:
+        (按规范化GUID索引的字典, 按设备索引号索引的字典)元组，
+        值为包含index、guid、characteristics、wireless字段的字典，无法读取注册表时均为空字典
+    """
+    by_guid = {}
+    by_index = {}
+    backend = backend or get_default_registry_backend()
+    try:
+        parent = backend.open_key(HKEY_LOCAL_MACHINE, NETWORK_CLASS_KEY)
+    except OSError:
+        return by_guid, by_index
+
+    def query(key, name):
+        try:
+            return backend.query_value(key, name)
+        except OSError:
+            return None
+
+    try:
+        subkey_count = backend.query_info(parent)[0]
+        for i in range(subkey_count):
+            try:
+                name = backend.enum_key(parent, i)
+            except OSError:
+                break
+            # Properties等非数字子键不对应网卡
+            if not name.isdigit():
+                continue
+            try:
+                key = backend.open_key(parent, name)
+            except OSError:
+                continue
+            try:
+                guid = query(key, 'NetCfgInstanceId')
+                physical_media_type = query(key, '*PhysicalMediaType')
+                characteristics = query(key, 'Characteristics')
+                lower_range = None
+                try:
+                    interfaces = backend.open_key(key, r'Ndi\Interfaces')
+                    lower_range = query(interfaces, 'LowerRange')
+                    backend.close_key(interfaces)
+                except OSError:
+                    pass
+            finally:
+                backend.close_key(key)
+
+            entry = {
+                "index": int(name),
+                "guid": normalize_guid(guid),
+                "characteristics": characteristics or 0,
+                "wireless": _is_wireless_class_entry(physical_media_type, lower_range)
+            }
+            by_index[entry["index"]] = entry
+            if entry["guid"]:
+                by_guid[entry["guid"]] = entry
+    except OSError:
+        pass
+    finally:
+        backend.close_key(parent)
+    return by_guid, by_index
+
+
+# 导出失败时逐个查询配置文件的最大并发数
+WLAN_PROFILE_QUERY_WORKERS = 4
+
+# netsh wlan export profile导出的XML的命名空间
+WLAN_PROFILE_NAMESPACE = '{http://www.microsoft.com/networking/WLAN/profile/v1}'
+
+# 执行器缓存中保存导出解析结果的键，与netsh wlan命令的输出使用同一条缓存策略
+WLAN_EXPORT_CACHE_KEY = 'netsh wlan export profile'
+
+# 配置文件XML中的身份验证和加密方式，对应netsh wlan show profile显示的名称
+WLAN_AUTHENTICATION_NAMES = {
+    "open": "Open",
+    "shared": "Shared",
+    "WPA": "WPA-Enterprise",
+    "WPAPSK": "WPA-Personal",
+    "WPA2": "WPA2-Enterprise",
+    "WPA2PSK": "WPA2-Personal",
+    "WPA3": "WPA3-Enterprise 192 Bits",
+    "WPA3ENT192": "WPA3-Enterprise 192 Bits",
+    "WPA3ENT": "WPA3-Enterprise",
+    "WPA3SAE": "WPA3-Personal",
+    "OWE": "OWE",
+}
+WLAN_ENCRYPTION_NAMES = {
+    "none": "None",
+    "WEP": "WEP",
+    "TKIP": "TKIP",
+    "AES": "CCMP",
+    "GCMP": "GCMP",
+    "GCMP256": "GCMP-256",
+}
+
+# 中文系统中netsh wlan show profile显示的名称（去掉空格后），统一为英文名称
+WLAN_LOCALIZED_NAMES = {
+    "开放式": "Open",
+    "共享": "Shared",
+    "WPA-企业": "WPA-Enterprise",
+    "WPA-个人": "WPA-Personal",
+    "WPA2-企业": "WPA2-Enterprise",
+    "WPA2-个人": "WPA2-Personal",
+    "WPA3-企业": "WPA3-Enterprise",
+    "WPA3-个人": "WPA3-Personal",
+    "无": "None",
+}
+
+def parse_wlan_profile_xml(data):
+    """解析netsh wlan export profile导出的配置文件XML
+
+    Args:
+        data: XML文件内容（字节）
+
+    Returns:
+        包含name、ssid、authentication、encryption字段的字典，
+        身份验证和加密方式转换为netsh wlan show profile显示的名称，如WPA2-Personal、CCMP
+
+    Raises:
+        ElementTree.ParseError: XML格式错误
+    """
+    root = ElementTree.fromstring(data)
+    ns = WLAN_PROFILE_NAMESPACE
+    authentication = (root.findtext(f'.//{ns}authEncryption/{ns}authentication') or '').strip()
+    encryption = (root.findtext(f'.//{ns}authEncryption/{ns}encryption') or '').strip()
+    return {
+        "name": (root.findtext(ns + 'name') or '').strip(),
+        "ssid": (root.findtext(f'{ns}SSIDConfig/{ns}SSID/{ns}name') or '').strip(),
+        "authentication": WLAN_AUTHENTICATION_NAMES.get(authentication, authentication),
+        "encryption": WLAN_ENCRYPTION_NAMES.get(encryption, encryption)
+    }
+
+
+def normalize_wlan_security_name(value):
+    """把netsh wlan show profile显示的身份验证或加密方式统一为英文名称
+
+    Args:
+        value: 显示的名称，如"WPA2 - 个人"
+
+    Returns:
+        英文名称，如WPA2-Personal，无法识别时原样返回
+    """
+    return WLAN_LOCALIZED_NAMES.get(''.join(value.split()), value)
+
+
+# summarize_connections()支持的分组字段，值为从连接行元组取值的函数
+CONNECTION_GROUP_FIELDS = {
+    "proto": lambda row: row[0],
+    "local_addr": lambda row: row[1],
+    "local_host": lambda row: _get_host(row[1]),
+    "local_port": lambda row: _get_port(row[1]),
+    "foreign_addr": lambda row: row[2],
+    "remote_host": lambda row: _get_host(row[2]),
+    "remote_port": lambda row: _get_port(row[2]),
+    "state": lambda row: row[3],
+    "pid": lambda row: int(row[4]) if row[4].isdigit() else None
+}
+
+
+def _nest_counts(counter, top):
+    """把分组键元组的计数转换为按计数降序排列的嵌套字典
+    
+    Args:
+        counter: 分组键元组到计数的Counter
+        top: 每一层最多保留的分组数量，None表示全部保留
+        
+    Returns:
+        嵌套字典，最内层的值为计数
+    """
+    if not counter:
+        return {}
+    if len(next(iter(counter))) == 1:
+        return {key[0]: count for key, count in counter.most_common(top)}
+    
+    groups = {}
+    totals = Counter()
+    for key, count in counter.items():
+        groups.setdefault(key[0], Counter())[key[1:]] = count
+        totals[key[0]] += count
+    return {head: _nest_counts(groups[head], top) for head, _ in totals.most_common(top)}
+
 
 class NetworkInfo:
     """Windows网络配置信息获取类，使用命令行工具获取信息"""
     
-    def __init__(self):
-        """初始化"""
-        pass
+    def __init__(self, executor=None, registry=None):
+        """初始化
+        
+        Args:
+            executor: 命令执行器，默认使用所有信息类共享的执行器
+            registry: 注册表后端，如读取离线配置单元的registry.HiveBackend，
+                默认使用registry.get_default_registry_backend()
+        """
+        self._executor = executor or get_default_executor()
+        self._registry = registry
+        # (ipconfig /all输出, 解析模型)，输出不变时复用模型
+        self._ipconfig_model = None
+        self._ipconfig_lock = threading.Lock()
+        # 进程快照，在tasklist的缓存有效期内复用
+        self._process_tables = ProcessTableCache(self._executor)
+        # 最近一次采集WLAN配置文件的方式、配置文件数量和命令数量
+        self.network_profiles_stats = None
     
     def _run_cmd(self, cmd):
         """执行命令行命令并返回输出"""
-        try:
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True, encoding='gbk')
-            return result.stdout
-        except Exception:
-            # 尝试使用utf-8编码
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True, encoding='utf-8')
-            return result.stdout
+        return self._executor.run(cmd)
     
-    def get_network_adapters(self):
-        """使用ipconfig /all获取网络适配器列表"""
-        adapters = []
+    def get_ipconfig_model(self):
+        """获取ipconfig /all的解析模型
+
+        命令输出由执行器缓存，相同的输出只解析一次，各适配器相关方法共享同一个模型。
+
+        Returns:
+            IpconfigModel实例
+        """
         output = self._run_cmd('ipconfig /all')
+        with self._ipconfig_lock:
+            if self._ipconfig_model is None or self._ipconfig_model[0] != output:
+                self._ipconfig_model = (output, IpconfigModel(output))
+            return self._ipconfig_model[1]
+    
+    def get_network_adapters(self):
+        """使用ipconfig /all获取网络适配器列表
         
-        # 分割输出为适配器块
-        adapter_blocks = output.split('\n\n')
-        
-        for block in adapter_blocks:
-            if '适配器' not in block and 'Adapter' not in block:
-                continue
-            
-            adapter_info = {
-                "description": "",
-                "adapter_name": "",
-                "mac_address": "",
-                "ip_addresses": [],
-                "subnet_masks": [],
-                "default_gateway": None,
-                "dns_servers": [],
-                "dhcp_enabled": False,
-                "dhcp_server": "",
-                "dns_domain": ""
-            }
-            
-            # 解析适配器名称
-            name_match = re.search(r'(?:适配器|Adapter) (.+?):', block)
-            if name_match:
-                adapter_info['adapter_name'] = name_match.group(1)
-            
-            # 解析描述
-            desc_match = re.search(r'描述[.:\s]+(.+)', block)
-            if desc_match:
-                adapter_info['description'] = desc_match.group(1)
-            
-            # 解析物理地址（MAC）
-            mac_match = re.search(r'物理地址[.:\s]+([0-9A-Fa-f:-]+)', block)
-            if mac_match:
-                adapter_info['mac_address'] = mac_match.group(1)
-            
-            # 解析IPv4地址
-            ipv4_match = re.search(r'IPv4 地址[.:\s]+([0-9.]+)', block)
-            if ipv4_match:
-                adapter_info['ip_addresses'].append(ipv4_match.group(1))
-            
-            # 解析子网掩码
-            subnet_match = re.search(r'子网掩码[.:\s]+([0-9.]+)', block)
-            if subnet_match:
-                adapter_info['subnet_masks'].append(subnet_match.group(1))
-            
-            # 解析默认网关
-            gateway_match = re.search(r'默认网关[.:\s]+([0-9.]+)', block)
-            if gateway_match:
-                adapter_info['default_gateway'] = gateway_match.group(1)
-            
-            # 解析DNS服务器
-            dns_matches = re.findall(r'DNS 服务器[.:\s]+([0-9.]+)', block)
-            adapter_info['dns_servers'].extend(dns_matches)
-            
-            # 解析DHCP启用状态
-            dhcp_match = re.search(r'DHCP 已启用[.:\s]+(是|否|Yes|No)', block)
-            if dhcp_match:
-                dhcp_val = dhcp_match.group(1)
-                adapter_info['dhcp_enabled'] = dhcp_val in ['是', 'Yes']
-            
-            # 解析DHCP服务器
-            dhcp_server_match = re.search(r'DHCP 服务器[.:\s]+([0-9.]+)', block)
-            if dhcp_server_match:
-                adapter_info['dhcp_server'] = dhcp_server_match.group(1)
-            
-            # 解析DNS域
-            dns_domain_match = re.search(r'DNS 后缀搜索列表[.:\s]+(.+)', block)
-            if dns_domain_match:
-                adapter_info['dns_domain'] = dns_domain_match.group(1)
-            
-            adapters.append(adapter_info)
-        
+        dns_domain为适配器的连接特定DNS后缀搜索列表中的第一项，dns_suffix为连接特定的DNS后缀。
+        """
+        adapters = []
+        for adapter in self.get_ipconfig_model().adapters:
+            adapters.append({
+                "description": adapter["description"],
+                "adapter_name": adapter["name"],
+                "mac_address": adapter["mac_address"],
+                "ip_addresses": list(adapter["ipv4_addresses"]),
+                "ipv6_addresses": list(adapter["ipv6_addresses"]),
+                "subnet_masks": list(adapter["subnet_masks"]),
+                "default_gateway": get_ipv4_gateway(adapter),
+                "dns_servers": list(adapter["dns_servers"]),
+                "dhcp_enabled": adapter["dhcp_enabled"],
+                "dhcp_server": adapter["dhcp_server"],
+                "dns_domain": adapter["dns_suffix_search_list"][0] if adapter["dns_suffix_search_list"] else "",
+                "dns_suffix": adapter["dns_suffix"]
+            })
         return adapters
     
     def get_ip_addresses(self):
-        """使用ipconfig获取所有IP地址"""
-        ip_addresses = []
-        output = self._run_cmd('ipconfig')
-        
-        # 解析IPv4地址
-        ipv4_matches = re.findall(r'IPv4 地址[.:\s]+([0-9.]+)', output)
-        for ip in ipv4_matches:
-            ip_addresses.append({"ip": ip})
-        
-        return ip_addresses
+        """使用ipconfig /all获取所有IPv4地址"""
+        return [
+            {"ip": ip}
+            for adapter in self.get_ipconfig_model().adapters
+            for ip in adapter["ipv4_addresses"]
+        ]
     
     def get_network_stats(self):
         """使用netstat -e获取网络统计信息"""
         stats = {}
         output = self._run_cmd('netstat -e')
         
-        # 解析统计信息
-        bytes_recv_match = re.search(r'接收的字节数[\s]+([0-9,]+)', output)
-        bytes_sent_match = re.search(r'发送的字节数[\s]+([0-9,]+)', output)
-        packets_recv_match = re.search(r'接收的数据包[\s]+([0-9,]+)', output)
-        packets_sent_match = re.search(r'发送的数据包[\s]+([0-9,]+)', output)
-        
-        if bytes_recv_match and bytes_sent_match:
+        # 解析统计表，每行为"名称  接收  发送"
+        rows = {}
+        for line in output.split('\n'):
+            match = re.match(r'\s*(\D+?)\s+([0-9,]+)(?:\s+([0-9,]+))?\s*$', line)
+            if match:
+                field = NETSTAT_E_ROWS.get(match.group(1).strip().lower())
+                if field:
+                    rows[field] = (
+                        int(match.group(2).replace(',', '')),
+                        int(match.group(3).replace(',', '')) if match.group(3) else 0
+                    )
+        
+        if 'bytes' in rows:
+            unicast = rows.get('unicast', (0, 0))
+            non_unicast = rows.get('non_unicast', (0, 0))
             stats['total'] = {
-                "bytes_sent": int(bytes_sent_match.group(1).replace(',', '')),
-                "bytes_recv": int(bytes_recv_match.group(1).replace(',', '')),
-                "packets_sent": int(packets_sent_match.group(1).replace(',', '')) if packets_sent_match else 0,
-                "packets_recv": int(packets_recv_match.group(1).replace(',', '')) if packets_recv_match else 0
+                "bytes_sent": rows['bytes'][1],
+                "bytes_recv": rows['bytes'][0],
+                "packets_sent": unicast[1] + non_unicast[1],
+                "packets_recv": unicast[0] + non_unicast[0],
+                "errors_sent": rows.get('errors', (0, 0))[1],
+                "errors_recv": rows.get('errors', (0, 0))[0],
+                "discards_sent": rows.get('discards', (0, 0))[1],
+                "discards_recv": rows.get('discards', (0, 0))[0]
             }
         
         return stats
     
-    def get_network_connections(self):
-        """使用netstat -ano获取网络连接列表"""
+    def get_interface_stats(self):
+        """通过一次MSFT_NetAdapterStatisticsSettingData查询获取所有网卡的流量计数器
+        
+        Returns:
+            网卡GUID（带花括号的大写形式）到计数器字典的字典，计数器字段与get_network_stats()的total一致，
+            另外包含网卡名称name和描述description
+        """
+        from .utils import safe_int
+        
+        properties = ['InstanceID', 'Name', 'InterfaceDescription']
+        for names in INTERFACE_COUNTER_PROPERTIES.values():
+            properties.extend(names)
+        
+        stats = {}
+        for adapter in query_wmi(self._executor, 'MSFT_NetAdapterStatisticsSettingData', properties):
+            guid = normalize_guid(adapter['InstanceID'])
+            if not guid:
+                continue
+            interface = {"name": adapter['Name'], "description": adapter['InterfaceDescription']}
+            for field, names in INTERFACE_COUNTER_PROPERTIES.items():
+                interface[field] = sum(safe_int(adapter[name]) for name in names)
+            stats[guid] = interface
+        return stats
+    
+    def get_process_table(self):
+        """获取tasklist /FO CSV /NH的进程快照，用于按PID关联连接所属的进程
+        
+        快照从tasklist的流式输出逐行建立，在tasklist的缓存有效期内复用。
+        
+        Returns:
+            tasklist.ProcessTable实例
+        """
+        return self._process_tables.get(TASKLIST_CMD)
+    
+    def get_network_connections(self, with_process=False):
+        """使用netstat -ano获取网络连接列表
+        
+        Args:
+            with_process: 为True时按PID与一次tasklist快照做哈希连接，为每个连接加入进程映像名称和会话，
+                无论连接数量多少都只启动netstat和tasklist两个进程
+        """
         connections = []
         output = self._run_cmd('netstat -ano')
         
-        lines = output.strip().split('\n')
-        # 跳过标题行
-        if len(lines) >= 3:
-            lines = lines[3:]
+        for line in output.split('\n'):
+            row = _parse_connection_line(line)
+            if row is not None:
+                connections.append(_connection_to_dict(row))
         
-        for line in lines:
-            if not line.strip():
-                continue
-            
-            # 解析netstat输出
-            parts = re.split(r'\s+', line.strip())
-            if len(parts) >= 5:
-                proto = parts[0]
-                local_addr = parts[1]
-                foreign_addr = parts[2]
-                state = parts[3] if len(parts) > 4 else ''
-                pid = parts[-1]
-                
-                connections.append({
-                    "proto": proto,
-                    "local_addr": local_addr,
-                    "foreign_addr": foreign_addr,
-                    "state": state,
-                    "pid": int(pid) if pid.isdigit() else None
-                })
+        if with_process:
+            processes = self.get_process_table().by_pid
+            for connection in connections:
+                _join_process(connection, processes)
         
         return connections
     
+    def _iter_connection_rows(self, proto=None, state=None, local_port=None, remote_port=None, pid=None):
+        """逐行读取netstat -ano的输出，返回满足过滤条件的连接行元组
+        
+        过滤条件直接作用在拆分后的列上，不满足条件的行不会创建任何字典。
+        参数说明见iter_network_connections()。
+        """
+        protos = _to_filter(proto, lambda value: str(value).upper())
+        states = _to_filter(state, lambda value: str(value).upper())
+        local_ports = _to_filter(local_port, int)
+        remote_ports = _to_filter(remote_port, int)
+        pids = _to_filter(pid, str)
+        
+        for line in self._executor.stream('netstat -ano'):
+            row = _parse_connection_line(line)
+            if row is None:
+                continue
+            if protos is not None and row[0] not in protos:
+                continue
+            if states is not None and row[3].upper() not in states:
+                continue
+            if local_ports is not None and _get_port(row[1]) not in local_ports:
+                continue
+            if remote_ports is not None and _get_port(row[2]) not in remote_ports:
+                continue
+            if pids is not None and row[4] not in pids:
+                continue
+            yield row
+    
+    def iter_network_connections(self, proto=None, state=None, local_port=None, remote_port=None,
+                                 pid=None, limit=None, with_process=False):
+        """在netstat输出到达时逐条返回网络连接，内存占用与连接数量无关
+        
+        每个过滤参数可以是单个值或值的集合，为None时不过滤。
+        
+        Args:
+            proto: 协议，如'TCP'或'UDP'
+            state: 连接状态，如'ESTABLISHED'，UDP连接的状态为空字符串
+            local_port: 本地端口
+            remote_port: 远程端口
+            pid: 进程PID
+            limit: 最多返回的连接数量，达到数量后结束netstat进程
+            with_process: 为True时先读取一次tasklist快照，为每个连接加入进程映像名称和会话
+            
+        Yields:
+            与get_network_connections()条目一致的连接字典
+        """
+        if limit is not None and limit <= 0:
+            return
+        processes = self.get_process_table().by_pid if with_process else None
+        rows = self._iter_connection_rows(proto, state, local_port, remote_port, pid)
+        try:
+            for count, row in enumerate(rows, 1):
+                connection = _connection_to_dict(row)
+                yield connection if processes is None else _join_process(connection, processes)
+                if limit is not None and count >= limit:
+                    break
+        finally:
+            rows.close()
+    
+    def summarize_connections(self, group_by="state", top=None, **filters):
+        """在读取netstat输出的同时汇总网络连接数量，不保存任何连接条目
+        
+        Args:
+            group_by: 分组字段名或字段名列表，可选字段见CONNECTION_GROUP_FIELDS，
+                如"state"、["local_port"]或["pid", "remote_host"]
+            top: 每一层最多保留的分组数量，按连接数量降序，None表示全部保留
+            **filters: 过滤条件，与iter_network_connections()的proto、state、local_port、remote_port、pid参数一致
+            
+        Returns:
+            汇总字典，包含连接总数total、分组字段group_by和嵌套的分组计数counts，
+            如{"total": 3, "group_by": ["state"], "counts": {"ESTABLISHED": 2, "TIME_WAIT": 1}}
+        """
+        fields = [group_by] if isinstance(group_by, str) else list(group_by)
+        unknown = [field for field in fields if field not in CONNECTION_GROUP_FIELDS]
+        if unknown or not fields:
+            raise ValueError(f"不支持的分组字段: {', '.join(unknown)}")
+        getters = [CONNECTION_GROUP_FIELDS[field] for field in fields]
+        
+        counter = Counter()
+        for row in self._iter_connection_rows(**filters):
+            counter[tuple(get(row) for get in getters)] += 1
+        
+        return {
+            "total": sum(counter.values()),
+            "group_by": fields,
+            "counts": _nest_counts(counter, top)
+        }
+    
     def get_dns_servers(self):
-        """使用ipconfig /all获取DNS服务器列表"""
+        """使用ipconfig /all获取DNS服务器列表，按首次出现的顺序去重"""
         dns_servers = []
-        output = self._run_cmd('ipconfig /all')
-        
-        # 解析DNS服务器
-        dns_matches = re.findall(r'DNS 服务器[.:\s]+([0-9.]+)', output)
-        # 去重
-        dns_servers = list(set(dns_matches))
-        
+        for adapter in self.get_ipconfig_model().adapters:
+            for server in adapter["dns_servers"]:
+                if server not in dns_servers:
+                    dns_servers.append(server)
         return dns_servers
     
     def get_default_gateway(self):
         """使用ipconfig /all获取默认网关，优先返回物理网络适配器的网关"""
-        output = self._run_cmd('ipconfig /all')
+        adapters = self.get_ipconfig_model().adapters
         
         # 虚拟适配器名称列表，我们应该优先选择物理适配器
         virtual_adapters = ['VPN', 'VirtualBox', 'Teredo', 'VMware', 'Hyper-V', 'Docker']
         
-        # 按适配器分割输出
-        adapter_blocks = output.split('\n\n')
-        
         # 优先查找物理适配器的默认网关
-        for block in adapter_blocks:
-            # 跳过虚拟适配器
-            if any(virtual in block for virtual in virtual_adapters):
+        for adapter in adapters:
+            label = adapter["name"] + ' ' + adapter["description"]
+            if any(virtual in label for virtual in virtual_adapters):
                 continue
-            
-            # 查找默认网关
-            gateway_match = re.search(r'默认网关[.:\s]+([0-9.]+)', block)
-            if gateway_match:
-                return gateway_match.group(1)
+            gateway = get_ipv4_gateway(adapter)
+            if gateway:
+                return gateway
         
         # 如果没有找到物理适配器的网关，尝试查找所有适配器
-        for block in adapter_blocks:
-            gateway_match = re.search(r'默认网关[.:\s]+([0-9.]+)', block)
-            if gateway_match:
-                return gateway_match.group(1)
-        
-        # 尝试英文格式
-        for block in adapter_blocks:
-            gateway_match = re.search(r'Default Gateway[.:\s]+([0-9.]+)', block)
-            if gateway_match:
-                return gateway_match.group(1)
-                
+        for adapter in adapters:
+            gateway = get_ipv4_gateway(adapter)
+            if gateway:
+                return gateway
+        
         return None
     
     def get_hostname(self):
@@ -220,42 +612,102 @@ class NetworkInfo:
         return socket.getfqdn()
     
     def get_network_profiles(self):
-        """使用netsh获取网络配置文件"""
+        """获取所有WLAN配置文件
+        
+        优先通过一次netsh wlan export profile把全部配置文件导出到临时目录并在进程内解析XML，
+        导出失败时才回退为netsh wlan show profiles加上并发数受限的逐个配置文件查询。
+        两种方式返回的身份验证和加密方式都是netsh wlan show profile显示的英文名称。
+        network_profiles_stats属性记录最近一次采集的方式和命令数量。
+        
+        Returns:
+            配置文件字典列表，包含name、ssid、authentication、encryption字段
+        """
+        profiles = self._export_network_profiles()
+        if profiles is not None:
+            self.network_profiles_stats = {"method": "export", "profiles": len(profiles), "subprocesses": 1}
+            return profiles
+        return self._query_network_profiles()
+    
+    def _export_network_profiles(self):
+        """把全部配置文件导出到本次调用的临时目录并解析，没有导出任何文件时返回None
+        
+        导出时不使用key=clear，XML中不包含明文密钥，临时目录在解析后删除。
+        导出命令会写入文件，每次的命令行都不同，因此不经过命令输出缓存；
+        解析结果保存在执行器缓存的WLAN_EXPORT_CACHE_KEY下，有效期内不会重复导出。
+        """
+        cache = self._executor.cache
+        if cache is not None:
+            hit, profiles = cache.lookup(WLAN_EXPORT_CACHE_KEY)
+            if hit:
+                return [dict(profile) for profile in profiles] or None
+        
         profiles = []
+        try:
+            with tempfile.TemporaryDirectory(prefix='wsc-wlan-') as folder:
+                self._executor.run_uncached(f'netsh wlan export profile folder="{folder}"')
+                for filename in sorted(os.listdir(folder)):
+                    if not filename.lower().endswith('.xml'):
+                        continue
+                    try:
+                        with open(os.path.join(folder, filename), 'rb') as f:
+                            profiles.append(parse_wlan_profile_xml(f.read()))
+                    except (OSError, ElementTree.ParseError):
+                        continue
+        except OSError:
+            return None
+        
+        if cache is not None:
+            cache.store(WLAN_EXPORT_CACHE_KEY, profiles)
+        return [dict(profile) for profile in profiles] or None
+    
+    def _query_network_profiles(self):
+        """使用netsh wlan show profiles列出配置文件，再并发查询每个配置文件的详细信息"""
         output = self._run_cmd('netsh wlan show profiles')
         
-        # 解析网络配置文件名称
-        profile_names = re.findall(r'所有用户配置文件 : (.+)', output)
+        # 解析网络配置文件名称，同一配置文件在多个无线网卡上出现时只查询一次
+        profile_names = []
+        for name in re.findall(r'(?:所有用户配置文件|All User Profile)\s*: (.+)', output):
+            name = name.strip()
+            if name and name not in profile_names:
+                profile_names.append(name)
+        
+        tasks = {name: (lambda name=name: self._query_network_profile(name)) for name in profile_names}
+        profiles = list(self._executor.collect(tasks, max_workers=WLAN_PROFILE_QUERY_WORKERS).values())
+        self.network_profiles_stats = {
+            "method": "show_profile",
+            "profiles": len(profiles),
+            # 导出、列出配置文件和逐个查询的命令
+            "subprocesses": 2 + len(profile_names)
+        }
+        return profiles
+    
+    def _query_network_profile(self, profile_name):
+        """使用netsh wlan show profile获取一个配置文件的详细信息"""
+        profile_output = self._run_cmd(f'netsh wlan show profile name="{profile_name}"')
+        
+        profile_info = {
+            "name": profile_name,
+            "ssid": "",
+            "authentication": "",
+            "encryption": ""
+        }
         
-        for profile_name in profile_names:
-            # 获取每个配置文件的详细信息
-            profile_output = self._run_cmd(f'netsh wlan show profile name="{profile_name}"')
-            
-            profile_info = {
-                "name": profile_name,
-                "ssid": "",
-                "authentication": "",
-                "encryption": ""
-            }
-            
-            # 解析SSID
-            ssid_match = re.search(r'SSID 名称[.:\s]+(.+)', profile_output)
-            if ssid_match:
-                profile_info['ssid'] = ssid_match.group(1)
-            
-            # 解析身份验证
-            auth_match = re.search(r'身份验证[.:\s]+(.+)', profile_output)
-            if auth_match:
-                profile_info['authentication'] = auth_match.group(1)
-            
-            # 解析加密
-            encrypt_match = re.search(r'加密[.:\s]+(.+)', profile_output)
-            if encrypt_match:
-                profile_info['encryption'] = encrypt_match.group(1)
-            
-            profiles.append(profile_info)
+        # 解析SSID
+        ssid_match = re.search(r'(?:SSID 名称|SSID name)[.:\s]+(.+)', profile_output)
+        if ssid_match:
+            profile_info['ssid'] = ssid_match.group(1).strip().strip('"')
         
-        return profiles
+        # 解析身份验证
+        auth_match = re.search(r'(?:身份验证|Authentication)[.:\s]+(.+)', profile_output)
+        if auth_match:
+            profile_info['authentication'] = normalize_wlan_security_name(auth_match.group(1).strip())
+        
+        # 解析加密
+        encrypt_match = re.search(r'(?:加密|Cipher)[.:\s]+(.+)', profile_output)
+        if encrypt_match:
+            profile_info['encryption'] = normalize_wlan_security_name(encrypt_match.group(1).strip())
+        
+        return profile_info
     
     def get_firewall_status(self):
         """使用netsh advfirewall show allprofiles获取防火墙状态"""
@@ -284,8 +736,14 @@ class NetworkInfo:
         
         return firewall_status
     
-    def get_nic_info(self):
-        """获取优化的网卡信息，按照用户要求的逻辑实现"""
+    def get_nic_info(self, with_traffic=False):
+        """获取优化的网卡信息，按照用户要求的逻辑实现
+        
+        Args:
+            with_traffic: 为True时在每个网卡的traffic字段中附加流量计数器，优先按GUID关联，
+                网卡没有GUID或GUID不一致时按规范化的MAC地址关联；
+                所有网卡的计数器通过一次WMI查询获取，没有计数器的网卡为None
+        """
         import re
         from .utils import safe_int
         
@@ -293,172 +751,40 @@ class NetworkInfo:
         nic_list = []
         
         # 1. 获取Win32_NetworkAdapter信息
-        # 使用普通格式而不是list格式，更易于解析
-        win32_nic_cmd = 'wmic Path Win32_NetworkAdapter get GUID,MACAddress,NetEnabled,PhysicalAdapter,Index'
-        win32_nic_output = self._run_cmd(win32_nic_cmd)
-        
-        # 解析Win32_NetworkAdapter输出
-        win32_nic_info = []
-        lines = win32_nic_output.strip().split('\n')
-        if len(lines) < 2:
-            # 没有网卡数据
-            pass
-        else:
-            # 跳过标题行，处理数据行
-            for line in lines[1:]:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # 解析数据行，注意字段顺序：GUID, MACAddress, NetEnabled, PhysicalAdapter, Index
-                # 使用正则表达式提取字段值
-                # 查找MAC地址（格式：XX:XX:XX:XX:XX:XX）
-                mac_pattern = r'([0-9A-Fa-f]{2}(:[0-9A-Fa-f]{2}){5})'
-                mac_match = re.search(mac_pattern, line)
-                if not mac_match:
-                    continue
-                
-                mac_address = mac_match.group(1)
-                
-                # 提取GUID（格式：{XXXXXXXX-XXXX-XXXX-XXXX-XXXXXXXXXXXX}）
-                guid_pattern = r'({[0-9A-Fa-f]{8}-[0-9A-Fa-f]{4}-[0-9A-Fa-f]{4}-[0-9A-Fa-f]{4}-[0-9A-Fa-f]{12}})'
-                guid_match = re.search(guid_pattern, line)
-                guid = guid_match.group(1) if guid_match else ''
-                
-                # 提取Index（数字）
-                index_pattern = r'\b(\d+)\b'
-                index_matches = re.findall(index_pattern, line)
-                index = index_matches[-1] if index_matches else ''
-                
-                # 提取NetEnabled（TRUE/FALSE）
-                net_enabled = 'TRUE' in line.upper()
-                
-                # 提取PhysicalAdapter（TRUE/FALSE）
-                physical_adapter = 'TRUE' in line.upper() and ('PHYSICAL' in line.upper() or 'TRUE' in line.upper().split())
-                
-                # 创建网卡信息
-                nic_info = {
-                    'GUID': guid,
-                    'MACAddress': mac_address,
-                    'NetEnabled': 'TRUE' if net_enabled else 'FALSE',
-                    'PhysicalAdapter': 'TRUE' if physical_adapter else 'FALSE',
-                    'Index': index
-                }
-                
-                win32_nic_info.append(nic_info)
+        # 与HardwareInfo.get_network_adapters共用同一次Win32_NetworkAdapter查询
+        win32_nic_info = [
+            nic for nic in query_wmi(self._executor, 'Win32_NetworkAdapter',
+                                     ['GUID', 'MACAddress', 'NetEnabled', 'PhysicalAdapter', 'Index'])
+            if nic['MACAddress']
+        ]
         
         # 2. 获取Win32_NetworkAdapterConfiguration信息
-        # 使用普通格式而不是list格式，更易于解析
-        win32_nic_config_cmd = 'wmic Path Win32_NetworkAdapterConfiguration get IPEnabled,MACAddress,SettingID,IPAddress,IPSubnet,Index'
-        win32_nic_config_output = self._run_cmd(win32_nic_config_cmd)
-        
-        # 解析Win32_NetworkAdapterConfiguration输出
-        win32_nic_config_info = []
-        lines = win32_nic_config_output.strip().split('\n')
-        if len(lines) >= 2:
-            # 跳过标题行，处理数据行
-            for line in lines[1:]:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # 查找MAC地址（格式：XX:XX:XX:XX:XX:XX）
-                mac_pattern = r'([0-9A-Fa-f]{2}(:[0-9A-Fa-f]{2}){5})'
-                mac_match = re.search(mac_pattern, line)
-                if not mac_match:
-                    continue
-                
-                mac_address = mac_match.group(1)
-                
-                # 提取SettingID（格式：{XXXXXXXX-XXXX-XXXX-XXXX-XXXXXXXXXXXX}）
-                setting_id_pattern = r'({[0-9A-Fa-f]{8}-[0-9A-Fa-f]{4}-[0-9A-Fa-f]{4}-[0-9A-Fa-f]{4}-[0-9A-Fa-f]{12}})'
-                setting_id_match = re.search(setting_id_pattern, line)
-                setting_id = setting_id_match.group(1) if setting_id_match else ''
-                
-                # 提取Index（数字）
-                index_pattern = r'\b(\d+)\b'
-                index_matches = re.findall(index_pattern, line)
-                index = index_matches[-1] if index_matches else ''
-                
-                # 提取IPEnabled（TRUE/FALSE）
-                ip_enabled = 'TRUE' in line.upper()
-                
-                # 创建配置信息
-                config_info = {
-                    'IPEnabled': 'TRUE' if ip_enabled else 'FALSE',
-                    'MACAddress': mac_address,
-                    'SettingID': setting_id,
-                    'IPAddress': '',
-                    'IPSubnet': '',
-                    'Index': index
-                }
-                
-                win32_nic_config_info.append(config_info)
-        
-        # 3. 解析注册表获取Characteristics值（用于区分物理/虚拟网卡）
-        def get_registry_characteristics(index):
-            """从注册表获取Characteristics值"""
-            import winreg
-            try:
-                # 尝试不同的索引格式
-                for index_format in ['{:04d}', '{}']:
-                    try:
-                        reg_path = r'SYSTEM\ControlSet001\Control\Class\{4d36e972-e325-11ce-bfc1-08002be10318}\{}'.format(index_format.format(int(index)))
-                        key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, reg_path, 0, winreg.KEY_READ)
-                        characteristics, _ = winreg.QueryValueEx(key, 'Characteristics')
-                        winreg.CloseKey(key)
-                        return characteristics
-                    except Exception:
-                        continue
-                return 0
-            except Exception:
-                return 0
+        win32_nic_config_info = [
+            config for config in query_wmi(self._executor, 'Win32_NetworkAdapterConfiguration',
+                                           ['IPEnabled', 'MACAddress', 'SettingID', 'IPAddress', 'IPSubnet', 'Index'])
+            if config['MACAddress']
+        ]
         
-        # 4. 解析注册表判断是否为无线网卡
-        def is_wireless_nic(index):
+        # 3. 遍历一次网卡设备类注册表键，按GUID和设备索引号建立索引（用于区分有线/无线网卡）
+        class_by_guid, class_by_index = read_network_class_index(self._registry)
+        
+        # 4. 判断是否为无线网卡：优先按GUID匹配注册表子键，其次按设备索引号匹配
+        def is_wireless_nic(guid, index):
             """判断是否为无线网卡"""
-            import winreg
-            try:
-                # 方法1：检查MediaSubType
-                for index_format in ['{:04d}', '{}']:
-                    try:
-                        reg_path = r'SYSTEM\CurrentControlSet\Control\Network\{4D36E972-E325-11CE-BFC1-08002BE10318}\{}'.format(index_format.format(int(index)))
-                        key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, reg_path, 0, winreg.KEY_READ)
-                        media_subtype, _ = winreg.QueryValueEx(key, 'MediaSubType')
-                        winreg.CloseKey(key)
-                        if media_subtype == 2:
-                            return True
-                        break
-                    except Exception:
-                        continue
-            except Exception:
-                pass
-            
-            try:
-                # 方法2：检查LowerRange
-                for index_format in ['{:04d}', '{}']:
-                    try:
-                        reg_path = r'SYSTEM\ControlSet001\Control\Class\{4d36e972-e325-11ce-bfc1-08002be10318}\{}'.format(index_format.format(int(index)))
-                        reg_path += r'\Ndi\Interfaces'
-                        key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, reg_path, 0, winreg.KEY_READ)
-                        lower_range, _ = winreg.QueryValueEx(key, 'LowerRange')
-                        winreg.CloseKey(key)
-                        if any(keyword in lower_range.lower() for keyword in ['wifi', 'wlan']):
-                            return True
-                        break
-                    except Exception:
-                        continue
-            except Exception:
-                pass
-            
-            return False
+            entry = class_by_guid.get(normalize_guid(guid))
+            if entry is None:
+                entry = class_by_index.get(safe_int(index, -1))
+            return entry is not None and entry["wireless"]
         
-        # 创建MAC地址到配置信息的映射
+        # 创建规范化MAC地址到配置信息的映射
         mac_to_config = {}
         for config in win32_nic_config_info:
-            mac = config.get('MACAddress', '').upper()
+            mac = normalize_mac(config.get('MACAddress', ''))
             if mac:
-                mac_to_config[mac] = config
+                mac_to_config.setdefault(mac, config)
+        
+        # 已经加入网卡列表的规范化MAC地址
+        seen_macs = set()
         
         # 5. 处理Win32_NetworkAdapter信息（适用于Win7+）
         for nic in win32_nic_info:
@@ -490,9 +816,10 @@ class NetworkInfo:
             }
             
             # 6. 关联Win32_NetworkAdapterConfiguration信息
-            mac_upper = mac_address.upper()
-            if mac_upper in mac_to_config:
-                config = mac_to_config[mac_upper]
+            mac_key = normalize_mac(mac_address)
+            seen_macs.add(mac_key)
+            config = mac_to_config.get(mac_key)
+            if config is not None:
                 # 解析IP地址
                 if config.get('IPAddress'):
                     ip_addresses = re.findall(r'"([^"]+)"', config['IPAddress'])
@@ -511,7 +838,7 @@ class NetworkInfo:
             
             # 8. 判断有线网卡和无线网卡
             if nic_info['adapter_type'] == 'Physical':
-                if is_wireless_nic(nic_info['index']):
+                if is_wireless_nic(guid, index):
                     nic_info['connection_type'] = 'Wireless'
                 else:
                     nic_info['connection_type'] = 'Wired'
@@ -526,9 +853,10 @@ class NetworkInfo:
                 continue
             
             # 跳过已经处理过的网卡
-            mac_upper = mac_address.upper()
-            if any(nic['mac_address'].upper() == mac_upper for nic in nic_list):
+            mac_key = normalize_mac(mac_address)
+            if mac_key in seen_macs:
                 continue
+            seen_macs.add(mac_key)
             
             # 获取网卡基本信息
             nic_info = {
@@ -557,48 +885,60 @@ class NetworkInfo:
             
             nic_list.append(nic_info)
         
-        # 10. 对于没有IP地址的网卡，尝试从ipconfig获取
+        # 10. 按MAC地址从ipconfig模型补充默认网关和DNS服务器
         if nic_list:
-            ipconfig_output = self._run_cmd('ipconfig /all')
-            
-            # 按适配器分割输出
-            adapter_blocks = ipconfig_output.split('\n\n')
-            
-            for block in adapter_blocks:
-                if '适配器' not in block and 'Adapter' not in block:
+            model = self.get_ipconfig_model()
+            for nic in nic_list:
+                adapter = model.get_adapter_by_mac(nic['mac_address'])
+                if adapter is None:
                     continue
-                
-                # 解析物理地址
-                mac_match = re.search(r'(?:物理地址|Physical Address)[.:\s]+([0-9A-Fa-f:-]+)', block)
-                if mac_match:
-                    mac = mac_match.group(1).upper().replace('-', ':')
-                    # 查找对应的网卡
-                    for nic in nic_list:
-                        if nic['mac_address'].upper().replace('-', ':') == mac:
-                            # 解析默认网关
-                            gateway_match = re.search(r'(?:默认网关|Default Gateway)[.:\s]+([0-9.]+)', block)
-                            if gateway_match:
-                                nic['default_gateway'] = gateway_match.group(1)
-                            # 解析DNS服务器
-                            dns_matches = re.findall(r'(?:DNS 服务器|DNS Servers)[.:\s]+([0-9.]+)', block)
-                            if dns_matches:
-                                nic['dns_servers'] = dns_matches
-                            break
+                gateway = get_ipv4_gateway(adapter)
+                if gateway:
+                    nic['default_gateway'] = gateway
+                if adapter["dns_servers"]:
+                    nic['dns_servers'] = list(adapter["dns_servers"])
+        
+        # 11. 按GUID关联每个网卡的流量计数器，关联不上时按MAC地址关联
+        if with_traffic:
+            interface_stats = self.get_interface_stats()
+            # 计数器中没有MAC地址，按网卡名称从ipconfig模型中查找MAC地址
+            model = self.get_ipconfig_model()
+            stats_by_mac = {}
+            for counters in interface_stats.values():
+                adapter = model.by_name.get(counters["name"])
+                if adapter is not None and adapter["mac_address"]:
+                    stats_by_mac.setdefault(normalize_mac(adapter["mac_address"]), counters)
+            for nic in nic_list:
+                counters = interface_stats.get(normalize_guid(nic['guid'])) or \
+                    stats_by_mac.get(normalize_mac(nic['mac_address']))
+                nic['traffic'] = {field: counters[field] for field in INTERFACE_COUNTER_PROPERTIES} if counters else None
         
         return nic_list
     
-    def get_all_network_info(self):
-        """获取所有网络信息"""
+    def get_collectors(self):
+        """获取字段名到采集方法的映射
+        
+        Returns:
+            字段名到无参采集方法的字典，与get_all_network_info()返回的字段一一对应
+        """
         return {
-            "adapters": self.get_network_adapters(),
-            "nic_info": self.get_nic_info(),
-            "ip_addresses": self.get_ip_addresses(),
-            "network_stats": self.get_network_stats(),
-            "network_connections": self.get_network_connections(),
-            "dns_servers": self.get_dns_servers(),
-            "default_gateway": self.get_default_gateway(),
-            "hostname": self.get_hostname(),
-            "fqdn": self.get_fqdn(),
-            "network_profiles": self.get_network_profiles(),
-            "firewall_status": self.get_firewall_status()
+            "adapters": self.get_network_adapters,
+            "nic_info": self.get_nic_info,
+            "ip_addresses": self.get_ip_addresses,
+            "network_stats": self.get_network_stats,
+            "network_connections": self.get_network_connections,
+            "dns_servers": self.get_dns_servers,
+            "default_gateway": self.get_default_gateway,
+            "hostname": self.get_hostname,
+            "fqdn": self.get_fqdn,
+            "network_profiles": self.get_network_profiles,
+            "firewall_status": self.get_firewall_status
         }
+    
+    def get_all_network_info(self, max_workers=None):
+        """获取所有网络信息
+        
+        Args:
+            max_workers: 并行采集的线程数量，默认使用执行器的并发上限，为1时按顺序采集
+        """
+        return self._executor.collect(self.get_collectors(), max_workers)
@@ -0,0 +1,525 @@
+"""离线注册表配置单元（regf）解析模块
+
+直接读取从Windows系统中收集的配置单元文件（SOFTWARE、SYSTEM、NTUSER.DAT等），不依赖winreg，
+可以在非Windows系统上运行。文件通过mmap映射到内存，键和值的单元（cell）只在访问时按偏移解码，
+打开配置单元时不会读取或复制整个文件，也不会预先建立键树。
+
+不支持事务日志（.LOG1/.LOG2），未正常卸载的配置单元（dirty为True）中可能缺少最近的修改。
+"""
+
+import bisect
+import mmap
+import os
+import struct
+
+# 基本块（文件头）的大小，单元偏移都相对于基本块之后的第一个hbin
+BASE_BLOCK_SIZE = 4096
+
+# 值的数据类型，与winreg中的REG_*常量一致
+REG_NONE = 0
+REG_SZ = 1
+REG_EXPAND_SZ = 2
+REG_BINARY = 3
+REG_DWORD = 4
+REG_DWORD_BIG_ENDIAN = 5
+REG_LINK = 6
+REG_MULTI_SZ = 7
+REG_QWORD = 11
+
+# nk单元的标志：键名为扩展ASCII编码
+_KEY_COMP_NAME = 0x0020
+# vk单元的标志：值名称为扩展ASCII编码
+_VALUE_COMP_NAME = 0x0001
+# vk单元数据大小的最高位：数据直接保存在数据偏移字段中
+_DATA_INLINE = 0x80000000
+# 超过这个大小的值数据保存在db单元指向的多个数据段中（格式1.4及以上）
+_BIG_DATA_SEGMENT = 16344
+
+# 单元结构，偏移均相对于单元数据起始位置
+_BASE_BLOCK = struct.Struct('<4sII8xII8xI')
+_NK = struct.Struct('<2sHQ8xI4xI4xII28xHH')
+_VK = struct.Struct('<2sHIIIH')
+_LIST_HEADER = struct.Struct('<2sH')
+_INT32 = struct.Struct('<i')
+_UINT32 = struct.Struct('<I')
+
+
+class RegfError(ValueError):
+    """配置单元文件格式错误"""
+
+
+def _decode_name(raw, compressed):
+    """解码键名或值名称"""
+    return raw.decode('latin-1') if compressed else raw.decode('utf-16-le', errors='replace')
+
+
+def _name_hash(name):
+    """计算lh子键列表中使用的键名哈希，只对ASCII键名可靠，其他键名返回None"""
+    value = 0
+    for char in name:
+        code = ord(char)
+        if code > 0x7f:
+            return None
+        if 0x61 <= code <= 0x7a:
+            code -= 0x20
+        value = (value * 37 + code) & 0xffffffff
+    return value
+
+
+def _decode_string(data):
+    """解码REG_SZ数据，截断到第一个NUL字符"""
+    if len(data) % 2:
+        data = data[:-1]
+    text = data.decode('utf-16-le', errors='replace')
+    end = text.find('\x00')
+    return text if end < 0 else text[:end]
+
+
+def decode_value_data(value_type, data):
+    """按值类型把原始数据转换为与winreg.QueryValueEx一致的Python对象
+
+    Args:
+        value_type: 值类型，REG_*常量
+        data: 原始数据（字节）
+
+    Returns:
+        字符串、字符串列表、整数或字节，空的二进制数据返回None
+    """
+    if value_type in (REG_SZ, REG_EXPAND_SZ, REG_LINK):
+        return _decode_string(data)
+    if value_type == REG_MULTI_SZ:
+        if len(data) % 2:
+            data = data[:-1]
+        strings = data.decode('utf-16-le', errors='replace').split('\x00')
+        # 列表以两个NUL结束，去掉末尾的空字符串
+        while strings and not strings[-1]:
+            strings.pop()
+        return strings
+    if value_type == REG_DWORD and len(data) >= 4:
+        return struct.unpack_from('<I', data)[0]
+    if value_type == REG_DWORD_BIG_ENDIAN and len(data) >= 4:
+        return struct.unpack_from('>I', data)[0]
+    if value_type == REG_QWORD and len(data) >= 8:
+        return struct.unpack_from('<Q', data)[0]
+    return bytes(data) if data else None
+
+
+class RegfHive:
+    """配置单元文件，支持with语句，退出时解除内存映射"""
+
+    def __init__(self, source):
+        """打开配置单元
+
+        Args:
+            source: 配置单元文件路径，或包含配置单元内容的bytes、bytearray
+
+        Raises:
+            OSError: 无法打开文件
+            RegfError: 不是有效的配置单元文件
+        """
+        self._mmap = None
+        if isinstance(source, (bytes, bytearray)):
+            self._buf = source
+            self.path = None
+        else:
+            self.path = os.fspath(source)
+            with open(self.path, 'rb') as f:
+                try:
+                    self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError:
+                    raise RegfError(f"配置单元文件为空: {self.path}")
+            self._buf = self._mmap
+        self._size = len(self._buf)
+        if self._size < BASE_BLOCK_SIZE:
+            self.close()
+            raise RegfError("配置单元文件过小")
+
+        signature, primary_seq, secondary_seq, self.major_version, self.minor_version, root_offset = \
+            _BASE_BLOCK.unpack_from(self._buf, 0)
+        if signature != b'regf':
+            self.close()
+            raise RegfError("缺少regf签名")
+        # 两个序号不一致表示写入中断，文件中可能缺少只保存在事务日志中的修改
+        self.dirty = primary_seq != secondary_seq
+        self.last_written = struct.unpack_from('<Q', self._buf, 12)[0]
+        self._root_offset = root_offset
+        self._control_set = None
+
+    def close(self):
+        """解除内存映射，之后不能再访问从这个配置单元得到的键"""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _cell(self, offset):
+        """返回单元数据在文件中的起始位置和长度"""
+        position = BASE_BLOCK_SIZE + offset
+        if offset < 0 or position + 4 > self._size:
+            raise RegfError(f"单元偏移越界: {offset:#x}")
+        size = _INT32.unpack_from(self._buf, position)[0]
+        # 已分配单元的大小为负数
+        size = -size if size < 0 else size
+        if size < 4 or position + size > self._size:
+            raise RegfError(f"单元大小无效: {offset:#x}")
+        return position + 4, size - 4
+
+    def _cell_bytes(self, offset, length):
+        """读取单元数据的前length个字节"""
+        position, size = self._cell(offset)
+        return self._buf[position:position + min(length, size)]
+
+    @property
+    def root(self):
+        """根键"""
+        return RegfKey(self, self._root_offset)
+
+    def open(self, path):
+        """按相对于根键的路径打开键，路径不区分大小写
+
+        对SYSTEM配置单元，路径开头的CurrentControlSet会按Select键的Current值映射到ControlSet00N。
+
+        Args:
+            path: 以反斜杠分隔的键路径，空字符串表示根键
+
+        Returns:
+            RegfKey对象
+
+        Raises:
+            FileNotFoundError: 键不存在
+        """
+        parts = [part for part in path.split('\\') if part]
+        if parts and parts[0].lower() == 'currentcontrolset':
+            parts[0] = self._get_current_control_set()
+        return self.root.open(parts)
+
+    def _get_current_control_set(self):
+        """读取Select\\Current，返回当前控制集的键名"""
+        if self._control_set is None:
+            current = None
+            select = self.root.get_subkey('Select')
+            if select is not None:
+                value = select.get_value('Current')
+                current = value.data if value is not None else None
+            self._control_set = 'ControlSet%03d' % (current if isinstance(current, int) and current else 1)
+        return self._control_set
+
+
+class _SubkeyOffsets:
+    """子键nk单元偏移的只读序列，按索引直接从列表单元中读取偏移"""
+
+    __slots__ = ('_buf', '_segments', '_ends')
+
+    def __init__(self, buf, segments):
+        """初始化
+
+        Args:
+            buf: 配置单元的数据
+            segments: (偏移数组起始位置, 每项字节数, 项数, 是否为lh列表)元组的列表，ri列表对应多个元组
+        """
+        self._buf = buf
+        self._segments = segments
+        self._ends = []
+        total = 0
+        for segment in segments:
+            total += segment[2]
+            self._ends.append(total)
+
+    def __len__(self):
+        return self._ends[-1] if self._ends else 0
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("子键索引越界")
+        number = bisect.bisect_right(self._ends, index)
+        start, stride, _, _ = self._segments[number]
+        first = self._ends[number - 1] if number else 0
+        return _UINT32.unpack_from(self._buf, start + stride * (index - first))[0]
+
+    def __iter__(self):
+        for start, stride, count, _ in self._segments:
+            entries = struct.unpack_from('<%dI' % (count * stride // 4), self._buf, start)
+            yield from entries[::stride // 4]
+
+    def find_candidates(self, name_hash):
+        """返回可能与键名匹配的偏移，lh列表中只返回哈希相同的项，name_hash为None时返回全部"""
+        for start, stride, count, hashed in self._segments:
+            entries = struct.unpack_from('<%dI' % (count * stride // 4), self._buf, start)
+            if hashed and name_hash is not None:
+                for i in range(0, 2 * count, 2):
+                    if entries[i + 1] == name_hash:
+                        yield entries[i]
+            else:
+                yield from entries[::stride // 4]
+
+
+class RegfKey:
+    """配置单元中的键，创建时只记录nk单元的偏移，访问属性时才解码单元"""
+
+    __slots__ = ('_hive', '_offset', '_header', '_subkey_offsets', '_value_offsets', '_enumerated')
+
+    def __init__(self, hive, offset):
+        self._hive = hive
+        self._offset = offset
+        self._header = None
+        self._subkey_offsets = None
+        self._value_offsets = None
+        # 已经按索引枚举过的子键：键名（大写）到偏移的字典，按名称打开枚举到的子键时不需要再查找
+        self._enumerated = None
+
+    def _get_header(self):
+        """解码nk单元的固定字段"""
+        if self._header is None:
+            position, size = self._hive._cell(self._offset)
+            if size < _NK.size:
+                raise RegfError(f"nk单元过小: {self._offset:#x}")
+            header = _NK.unpack_from(self._hive._buf, position)
+            if header[0] != b'nk':
+                raise RegfError(f"缺少nk签名: {self._offset:#x}")
+            self._header = (position,) + header[1:]
+        return self._header
+
+    @property
+    def name(self):
+        """键名"""
+        position, flags, _, _, _, _, _, name_length, _ = self._get_header()
+        start = position + _NK.size
+        return _decode_name(self._hive._buf[start:start + name_length], flags & _KEY_COMP_NAME)
+
+    @property
+    def last_written(self):
+        """最后写入时间，FILETIME（自1601年起的100纳秒数）"""
+        return self._get_header()[2]
+
+    @property
+    def subkey_count(self):
+        """子键数量"""
+        return self._get_header()[3]
+
+    @property
+    def value_count(self):
+        """值的数量"""
+        return self._get_header()[5]
+
+    def _get_subkey_offsets(self):
+        """返回子键列表的只读视图，只读取列表单元的头部，不展开列表"""
+        if self._subkey_offsets is None:
+            _, _, _, count, list_offset, _, _, _, _ = self._get_header()
+            segments = []
+            if count:
+                self._collect_segments(list_offset, segments)
+            self._subkey_offsets = _SubkeyOffsets(self._hive._buf, segments)
+        return self._subkey_offsets
+
+    def _collect_segments(self, list_offset, segments):
+        """记录子键列表单元（lf、lh、li，ri展开为其中的列表）中偏移数组的位置"""
+        hive = self._hive
+        position, size = hive._cell(list_offset)
+        signature, count = _LIST_HEADER.unpack_from(hive._buf, position)
+        start = position + _LIST_HEADER.size
+        stride = 8 if signature in (b'lf', b'lh') else 4
+        if signature not in (b'lf', b'lh', b'li', b'ri'):
+            raise RegfError(f"未知的子键列表类型: {signature!r}")
+        if stride * count > size - _LIST_HEADER.size:
+            raise RegfError(f"子键列表越界: {list_offset:#x}")
+        if signature == b'ri':
+            for entry in struct.unpack_from('<%dI' % count, hive._buf, start):
+                self._collect_segments(entry, segments)
+        elif count:
+            segments.append((start, stride, count, signature == b'lh'))
+
+    def iter_subkeys(self):
+        """按配置单元中的顺序（键名的大写排序）返回子键"""
+        for offset in self._get_subkey_offsets():
+            yield RegfKey(self._hive, offset)
+
+    def get_subkey_at(self, index):
+        """按索引返回子键，索引越界时抛出IndexError"""
+        return RegfKey(self._hive, self._get_subkey_offsets()[index])
+
+    def get_subkey_name_at(self, index):
+        """按索引返回子键名称，并记住名称对应的子键，索引越界时抛出IndexError"""
+        offset = self._get_subkey_offsets()[index]
+        name = RegfKey(self._hive, offset).name
+        if self._enumerated is None:
+            self._enumerated = {}
+        self._enumerated[name.upper()] = offset
+        return name
+
+    def get_subkey(self, name):
+        """按名称查找直接子键，不区分大小写
+
+        子键列表按键名的大写排序，先二分查找；找不到时再逐个比较，
+        lh列表只比较键名哈希相同的子键，以兼容排序规则不同的非ASCII键名。
+
+        Args:
+            name: 子键名称
+
+        Returns:
+            RegfKey对象，不存在时返回None
+        """
+        offsets = self._get_subkey_offsets()
+        if not offsets:
+            return None
+        hive = self._hive
+        target = name.upper()
+        if self._enumerated is not None and target in self._enumerated:
+            return RegfKey(hive, self._enumerated[target])
+        low, high = 0, len(offsets)
+        while low < high:
+            middle = (low + high) // 2
+            if RegfKey(hive, offsets[middle]).name.upper() < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(offsets):
+            key = RegfKey(hive, offsets[low])
+            if key.name.upper() == target:
+                return key
+
+        for offset in offsets.find_candidates(_name_hash(name)):
+            key = RegfKey(hive, offset)
+            if key.name.upper() == target:
+                return key
+        return None
+
+    def open(self, path):
+        """按相对路径打开子键
+
+        Args:
+            path: 以反斜杠分隔的路径，或路径各部分组成的列表
+
+        Returns:
+            RegfKey对象
+
+        Raises:
+            FileNotFoundError: 键不存在
+        """
+        parts = path.split('\\') if isinstance(path, str) else path
+        key = self
+        for part in parts:
+            if not part:
+                continue
+            key = key.get_subkey(part)
+            if key is None:
+                raise FileNotFoundError(f"注册表键不存在: {path}")
+        return key
+
+    def _get_value_offsets(self):
+        """读取值列表单元，返回vk单元偏移的元组"""
+        if self._value_offsets is None:
+            _, _, _, _, _, count, list_offset, _, _ = self._get_header()
+            if count:
+                position, size = self._hive._cell(list_offset)
+                if 4 * count > size:
+                    raise RegfError(f"值列表越界: {list_offset:#x}")
+                self._value_offsets = struct.unpack_from('<%dI' % count, self._hive._buf, position)
+            else:
+                self._value_offsets = ()
+        return self._value_offsets
+
+    def iter_values(self):
+        """按配置单元中的顺序返回值"""
+        for offset in self._get_value_offsets():
+            yield RegfValue(self._hive, offset)
+
+    def get_value_at(self, index):
+        """按索引返回值，索引越界时抛出IndexError"""
+        return RegfValue(self._hive, self._get_value_offsets()[index])
+
+    def get_value(self, name):
+        """按名称查找值，不区分大小写，空字符串表示默认值
+
+        Args:
+            name: 值名称
+
+        Returns:
+            RegfValue对象，不存在时返回None
+        """
+        target = name.lower()
+        for offset in self._get_value_offsets():
+            value = RegfValue(self._hive, offset)
+            if value.name.lower() == target:
+                return value
+        return None
+
+
+class RegfValue:
+    """配置单元中的值，名称和数据在访问时才解码"""
+
+    __slots__ = ('_hive', '_offset', '_header')
+
+    def __init__(self, hive, offset):
+        self._hive = hive
+        self._offset = offset
+        self._header = None
+
+    def _get_header(self):
+        """解码vk单元的固定字段"""
+        if self._header is None:
+            position, size = self._hive._cell(self._offset)
+            if size < _VK.size + 2:
+                raise RegfError(f"vk单元过小: {self._offset:#x}")
+            header = _VK.unpack_from(self._hive._buf, position)
+            if header[0] != b'vk':
+                raise RegfError(f"缺少vk签名: {self._offset:#x}")
+            self._header = (position,) + header[1:]
+        return self._header
+
+    @property
+    def name(self):
+        """值名称，默认值为空字符串"""
+        position, name_length, _, _, _, flags = self._get_header()
+        start = position + _VK.size + 2
+        return _decode_name(self._hive._buf[start:start + name_length], flags & _VALUE_COMP_NAME)
+
+    @property
+    def type(self):
+        """值类型，REG_*常量"""
+        return self._get_header()[4]
+
+    @property
+    def raw_data(self):
+        """原始数据（字节）"""
+        hive = self._hive
+        position, _, data_size, data_offset, _, _ = self._get_header()
+        length = data_size & ~_DATA_INLINE
+        if data_size & _DATA_INLINE:
+            # 不超过4字节的数据直接保存在数据偏移字段中
+            return hive._buf[position + 8:position + 8 + min(length, 4)]
+        if not length:
+            return b''
+        if length > _BIG_DATA_SEGMENT and hive.minor_version >= 4:
+            cell_position, _ = hive._cell(data_offset)
+            if hive._buf[cell_position:cell_position + 2] == b'db':
+                return self._read_big_data(cell_position, length)
+        return hive._cell_bytes(data_offset, length)
+
+    def _read_big_data(self, position, length):
+        """拼接db单元指向的数据段"""
+        hive = self._hive
+        count, segments_offset = struct.unpack_from('<HI', hive._buf, position + 2)
+        segments_position, size = hive._cell(segments_offset)
+        if 4 * count > size:
+            raise RegfError(f"数据段列表越界: {segments_offset:#x}")
+        chunks = []
+        remaining = length
+        for segment in struct.unpack_from('<%dI' % count, hive._buf, segments_position):
+            if remaining <= 0:
+                break
+            chunk = hive._cell_bytes(segment, min(remaining, _BIG_DATA_SEGMENT))
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b''.join(chunks)
+
+    @property
+    def data(self):
+        """按值类型转换后的数据，与winreg.QueryValueEx返回的数据一致"""
+        return decode_value_data(self.type, self.raw_data)
@@ -0,0 +1,222 @@
+"""注册表访问后端模块
+
+utils中的注册表函数通过后端访问注册表：WinregBackend读取本机的实时注册表，
+HiveBackend读取离线配置单元文件（见regf模块），使启动项、已安装程序、UAC设置和网卡注册表信息
+可以在非Windows系统上对收集到的配置单元进行分析。
+
+后端接口与winreg对应，键句柄由后端自行定义，失败时都抛出OSError：
+    open_key(parent, sub_key)：相对于根键常量或已打开的键打开子键
+    close_key(key)
+    query_info(key)：返回(子键数量, 值数量, 最后写入时间)
+    enum_key(key, index)：返回子键名称
+    enum_value(key, index)：返回(值名称, 数据, 类型)
+    query_value(key, name)：返回数据
+"""
+
+import functools
+import os
+import threading
+from .regf import RegfError, RegfHive
+
+try:
+    import winreg
+except ImportError:
+    winreg = None
+
+# 根键常量，与winreg中的取值一致，没有winreg时也可以用于HiveBackend
+HKEY_CURRENT_USER = winreg.HKEY_CURRENT_USER if winreg else 0x80000001
+HKEY_LOCAL_MACHINE = winreg.HKEY_LOCAL_MACHINE if winreg else 0x80000002
+HKEY_USERS = winreg.HKEY_USERS if winreg else 0x80000003
+
+# HiveBackend.from_directory()识别的配置单元文件名（大写）及其挂载位置
+HIVE_FILE_MOUNTS = {
+    "SOFTWARE": (HKEY_LOCAL_MACHINE, "SOFTWARE"),
+    "SYSTEM": (HKEY_LOCAL_MACHINE, "SYSTEM"),
+    "SAM": (HKEY_LOCAL_MACHINE, "SAM"),
+    "SECURITY": (HKEY_LOCAL_MACHINE, "SECURITY"),
+    "NTUSER.DAT": (HKEY_CURRENT_USER, None),
+}
+
+
+class WinregBackend:
+    """通过winreg读取本机实时注册表的后端，没有winreg时打开任何键都会失败"""
+
+    def open_key(self, parent, sub_key):
+        if winreg is None:
+            raise FileNotFoundError("当前系统不支持winreg")
+        return winreg.OpenKey(parent, sub_key, 0, winreg.KEY_READ)
+
+    def close_key(self, key):
+        winreg.CloseKey(key)
+
+    def query_info(self, key):
+        return winreg.QueryInfoKey(key)
+
+    def enum_key(self, key, index):
+        return winreg.EnumKey(key, index)
+
+    def enum_value(self, key, index):
+        return winreg.EnumValue(key, index)
+
+    def query_value(self, key, name):
+        return winreg.QueryValueEx(key, name)[0]
+
+
+def _hive_errors(method):
+    """把配置单元格式错误转换为OSError，与读取实时注册表失败时的处理方式一致"""
+    @functools.wraps(method)
+    def wrapper(*args):
+        try:
+            return method(*args)
+        except RegfError as error:
+            raise OSError(str(error)) from error
+    return wrapper
+
+
+class HiveBackend:
+    """读取离线配置单元文件的后端，支持with语句，退出时关闭所有配置单元
+
+    配置单元按根键挂载：值为单个配置单元时，根键下的路径直接从配置单元的根键开始；
+    值为字典时，路径的第一部分（如SOFTWARE、SYSTEM）选择配置单元。
+    """
+
+    def __init__(self, hives):
+        """初始化
+
+        Args:
+            hives: 根键常量到配置单元的字典，配置单元可以是文件路径、RegfHive对象，
+                或第一层键名到文件路径/RegfHive对象的字典，如
+                {HKEY_LOCAL_MACHINE: {"SOFTWARE": "SOFTWARE", "SYSTEM": "SYSTEM"},
+                 HKEY_CURRENT_USER: "NTUSER.DAT"}
+
+        Raises:
+            OSError: 无法打开配置单元文件
+            regf.RegfError: 配置单元文件格式错误
+        """
+        self._mounts = {}
+        self._opened = []
+        try:
+            for hkey, mount in hives.items():
+                if isinstance(mount, dict):
+                    self._mounts[hkey] = {name.upper(): self._open_hive(hive) for name, hive in mount.items()}
+                else:
+                    self._mounts[hkey] = self._open_hive(mount)
+        except Exception:
+            self.close()
+            raise
+
+    @classmethod
+    def from_directory(cls, path):
+        """挂载目录中按标准文件名保存的配置单元（见HIVE_FILE_MOUNTS），文件名不区分大小写
+
+        Args:
+            path: 配置单元所在目录
+
+        Returns:
+            HiveBackend对象
+        """
+        hives = {}
+        for name in sorted(os.listdir(path)):
+            mount = HIVE_FILE_MOUNTS.get(name.upper())
+            if mount is None:
+                continue
+            hkey, top = mount
+            file_path = os.path.join(path, name)
+            if top is None:
+                hives[hkey] = file_path
+            else:
+                hives.setdefault(hkey, {})[top] = file_path
+        return cls(hives)
+
+    def _open_hive(self, hive):
+        """打开配置单元文件，已经打开的RegfHive对象由调用者负责关闭"""
+        if isinstance(hive, RegfHive):
+            return hive
+        opened = RegfHive(hive)
+        self._opened.append(opened)
+        return opened
+
+    def close(self):
+        """关闭由这个后端打开的配置单元"""
+        for hive in self._opened:
+            hive.close()
+        self._opened = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @_hive_errors
+    def open_key(self, parent, sub_key):
+        if not isinstance(parent, int):
+            return parent.open(sub_key)
+        mount = self._mounts.get(parent)
+        if mount is None:
+            raise FileNotFoundError(f"未挂载的根键: {parent:#x}")
+        if not isinstance(mount, dict):
+            return mount.open(sub_key)
+        top, _, rest = sub_key.strip('\\').partition('\\')
+        hive = mount.get(top.upper())
+        if hive is None:
+            raise FileNotFoundError(f"未挂载的配置单元: {top}")
+        return hive.open(rest)
+
+    def close_key(self, key):
+        pass
+
+    @_hive_errors
+    def query_info(self, key):
+        return key.subkey_count, key.value_count, key.last_written
+
+    @_hive_errors
+    def enum_key(self, key, index):
+        try:
+            return key.get_subkey_name_at(index)
+        except IndexError:
+            raise OSError("没有更多子键")
+
+    @_hive_errors
+    def enum_value(self, key, index):
+        try:
+            value = key.get_value_at(index)
+        except IndexError:
+            raise OSError("没有更多值")
+        return value.name, value.data, value.type
+
+    @_hive_errors
+    def query_value(self, key, name):
+        value = key.get_value(name or '')
+        if value is None:
+            raise FileNotFoundError(f"注册表值不存在: {name}")
+        return value.data
+
+
+_default_backend = None
+_default_backend_lock = threading.Lock()
+
+
+def get_default_registry_backend():
+    """获取注册表函数默认使用的后端，未设置时为读取本机注册表的WinregBackend
+
+    Returns:
+        注册表后端对象
+    """
+    global _default_backend
+    if _default_backend is None:
+        with _default_backend_lock:
+            if _default_backend is None:
+                _default_backend = WinregBackend()
+    return _default_backend
+
+
+def set_default_registry_backend(backend):
+    """设置注册表函数默认使用的后端，如对整个进程改为分析离线配置单元
+
+    Args:
+        backend: 注册表后端对象，为None时恢复为WinregBackend
+    """
+    global _default_backend
+    with _default_backend_lock:
+        _default_backend = backend
@@ -0,0 +1,192 @@
+"""计数器速率采样模块
+
+对累计计数器（如netstat -e的字节数、数据包数）定时采样，用相邻两次采样的差值计算每秒速率，
+并在固定大小的环形缓冲区中保存最近的速率，读取当前速率和短时间窗口的平均速率不会启动任何进程。
+"""
+
+import threading
+import time
+from collections import deque
+
+# 默认保存的速率条目数量
+DEFAULT_HISTORY = 60
+
+
+def counter_delta(previous, current):
+    """计算累计计数器两次读数的差值，并处理计数器回绕和重置
+
+    计数器变小时，上一次读数不超过32位范围时按32位计数器回绕处理，否则按64位处理；
+    回绕后的增量超过计数器范围的一半时不可能是回绕（如网卡被禁用后重新启用），
+    视为计数器从0重新开始计数，增量为本次读数。
+
+    Args:
+        previous: 上一次读数
+        current: 本次读数
+
+    Returns:
+        两次读数之间的增量
+    """
+    if current >= previous:
+        return current - previous
+    modulus = 2 ** 32 if previous < 2 ** 32 else 2 ** 64
+    wrapped = current + modulus - previous
+    if wrapped > modulus // 2:
+        return current
+    return wrapped
+
+
+def _create_sampling_network():
+    """创建采样使用的NetworkInfo实例，只缓存开机期间不变的命令，保证每次采样读取最新计数器"""
+    from .cache import create_boot_only_cache
+    from .executor import CommandExecutor
+    from .network import NetworkInfo
+    return NetworkInfo(CommandExecutor(cache=create_boot_only_cache()))
+
+
+class CounterRateSampler:
+    """累计计数器的速率采样器
+
+    采样函数返回两层字典，如{"total": {"bytes_sent": 100, "bytes_recv": 200}}，
+    速率使用相同的结构，值为每秒的增量。
+    """
+
+    def __init__(self, sample, history=DEFAULT_HISTORY, clock=time.monotonic):
+        """初始化
+
+        Args:
+            sample: 无参采样函数，返回计数器的两层字典
+            history: 环形缓冲区保存的速率条目数量
+            clock: 返回单调时间（秒）的函数
+        """
+        self._sample = sample
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._previous = None
+        # 每个条目为(采样时间, 与上一次采样的间隔秒数, 计数器增量)
+        self._history = deque(maxlen=history)
+
+    def sample(self):
+        """采样一次，并计算与上一次采样之间的速率
+
+        Returns:
+            本次速率的两层字典，第一次采样没有可比较的读数，返回None
+        """
+        counters = self._sample()
+        now = self._clock()
+        with self._lock:
+            previous = self._previous
+            self._previous = (now, counters)
+            if previous is None or now <= previous[0]:
+                return None
+
+            elapsed = now - previous[0]
+            deltas = {}
+            for name, values in counters.items():
+                old_values = previous[1].get(name)
+                if not old_values:
+                    continue
+                deltas[name] = {
+                    key: counter_delta(old_values[key], value)
+                    for key, value in values.items() if key in old_values
+                }
+            self._history.append((now, elapsed, deltas))
+        return self._to_rates(elapsed, deltas)
+
+    @staticmethod
+    def _to_rates(elapsed, deltas):
+        """把增量转换为每秒速率"""
+        return {
+            name: {key: delta / elapsed for key, delta in values.items()}
+            for name, values in deltas.items()
+        }
+
+    def get_current(self):
+        """获取最近一次采样的速率
+
+        Returns:
+            速率的两层字典，尚未有两次采样时返回None
+        """
+        with self._lock:
+            if not self._history:
+                return None
+            _, elapsed, deltas = self._history[-1]
+        return self._to_rates(elapsed, deltas)
+
+    def get_average(self, window=None):
+        """获取最近一段时间内的平均速率，按总增量除以总时间计算
+
+        Args:
+            window: 时间窗口（秒），默认为缓冲区中的全部条目
+
+        Returns:
+            平均速率的两层字典，缓冲区为空时返回None
+        """
+        with self._lock:
+            entries = list(self._history)
+        if window is not None and entries:
+            latest = entries[-1][0]
+            entries = [entry for entry in entries if latest - entry[0] < window]
+        if not entries:
+            return None
+
+        elapsed = sum(entry[1] for entry in entries)
+        totals = {}
+        for _, _, deltas in entries:
+            for name, values in deltas.items():
+                target = totals.setdefault(name, {})
+                for key, delta in values.items():
+                    target[key] = target.get(key, 0) + delta
+        return self._to_rates(elapsed, totals)
+
+    def get_history(self):
+        """获取环形缓冲区中的全部速率
+
+        Returns:
+            (采样时间, 速率两层字典)元组的列表，按时间先后排列
+        """
+        with self._lock:
+            entries = list(self._history)
+        return [(timestamp, self._to_rates(elapsed, deltas)) for timestamp, elapsed, deltas in entries]
+
+
+class NetworkStatsSampler(CounterRateSampler):
+    """基于get_network_stats()的网络吞吐量采样器，每次采样只启动一个netstat -e进程"""
+
+    def __init__(self, network=None, history=DEFAULT_HISTORY, clock=time.monotonic):
+        """初始化
+
+        Args:
+            network: NetworkInfo实例，默认创建只缓存开机期间不变命令的实例
+            history: 环形缓冲区保存的速率条目数量
+            clock: 返回单调时间（秒）的函数
+        """
+        self.network = network or _create_sampling_network()
+        super().__init__(self.network.get_network_stats, history, clock)
+
+
+class InterfaceTrafficSampler(CounterRateSampler):
+    """基于get_interface_stats()的网卡吞吐量采样器，每次采样只启动一个wmic进程
+
+    速率按网卡GUID分组，names属性保存最近一次采样中GUID到网卡名称的映射。
+    """
+
+    def __init__(self, network=None, history=DEFAULT_HISTORY, clock=time.monotonic):
+        """初始化
+
+        Args:
+            network: NetworkInfo实例，默认创建只缓存开机期间不变命令的实例
+            history: 环形缓冲区保存的速率条目数量
+            clock: 返回单调时间（秒）的函数
+        """
+        self.network = network or _create_sampling_network()
+        self.names = {}
+        super().__init__(self._sample_interfaces, history, clock)
+
+    def _sample_interfaces(self):
+        """读取所有网卡的计数器，并记录网卡名称"""
+        from .network import INTERFACE_COUNTER_PROPERTIES
+        counters = {}
+        for guid, interface in self.network.get_interface_stats().items():
+            self.names[guid] = interface["name"]
+            counters[guid] = {field: interface[field] for field in INTERFACE_COUNTER_PROPERTIES}
+        return counters
@@ -1,111 +1,70 @@
-import subprocess
 import re
-import winreg
-from .utils import read_registry_value
+import threading
+from .utils import get_registry_values
+from .executor import get_default_executor
+from .firewall import iter_firewall_rules, FirewallRuleIndex
+from .wmi import query_wmi
+
+# 获取防火墙规则的命令
+FIREWALL_RULES_CMD = 'netsh advfirewall firewall show rule name=all'
+
+# verbose输出额外包含程序、服务和描述字段，输出约为普通输出的两倍，只在需要这些字段时使用
+FIREWALL_RULES_VERBOSE_CMD = FIREWALL_RULES_CMD + ' verbose'
 
 class SecurityInfo:
     """Windows安全信息获取类，使用命令行工具获取信息"""
     
-    def __init__(self):
-        """初始化"""
-        pass
+    def __init__(self, executor=None, registry=None):
+        """初始化
+        
+        Args:
+            executor: 命令执行器，默认使用所有信息类共享的执行器
+            registry: 注册表后端，如读取离线配置单元的registry.HiveBackend，
+                默认使用registry.get_default_registry_backend()
+        """
+        self._executor = executor or get_default_executor()
+        self._registry = registry
+        # (防火墙规则命令输出, 规则索引)，输出不变时复用索引
+        self._firewall_index = None
+        self._firewall_index_lock = threading.Lock()
     
     def _run_cmd(self, cmd):
         """执行命令行命令并返回输出"""
-        try:
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True, encoding='gbk')
-            return result.stdout
-        except Exception:
-            # 尝试使用utf-8编码
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True, encoding='utf-8')
-            return result.stdout
+        return self._executor.run(cmd)
     
     def get_user_accounts(self):
         """使用wmic获取用户账户列表"""
         accounts = []
-        output = self._run_cmd('wmic useraccount get name,fullname,description,disabled,lockout,passwordrequired,sid /value')
         
-        # 分割输出为账户块
-        account_sections = output.strip().split('\n\n')
-        
-        for section in account_sections:
-            if not section:
-                continue
-            
-            account_info = {
-                "name": "",
-                "full_name": "",
-                "description": "",
-                "disabled": False,
-                "lockout": False,
-                "password_required": False,
-                "sid": ""
-            }
-            
-            lines = section.split('\n')
-            for line in lines:
-                if '=' in line:
-                    key, value = line.split('=', 1)
-                    key = key.strip()
-                    value = value.strip()
-                    
-                    if key == 'Name':
-                        account_info['name'] = value
-                    elif key == 'FullName':
-                        account_info['full_name'] = value
-                    elif key == 'Description':
-                        account_info['description'] = value
-                    elif key == 'Disabled' and value == 'TRUE':
-                        account_info['disabled'] = True
-                    elif key == 'Lockout' and value == 'TRUE':
-                        account_info['lockout'] = True
-                    elif key == 'PasswordRequired' and value == 'TRUE':
-                        account_info['password_required'] = True
-                    elif key == 'SID':
-                        account_info['sid'] = value
-            
-            if account_info['name']:  # 只添加有名称的账户
-                accounts.append(account_info)
+        user_accounts = query_wmi(self._executor, 'Win32_UserAccount', [
+            'Name', 'FullName', 'Description', 'Disabled', 'Lockout', 'PasswordRequired', 'SID'
+        ])
+        for account in user_accounts:
+            if account['Name']:  # 只添加有名称的账户
+                accounts.append({
+                    "name": account['Name'],
+                    "full_name": account['FullName'],
+                    "description": account['Description'],
+                    "disabled": account['Disabled'] == 'TRUE',
+                    "lockout": account['Lockout'] == 'TRUE',
+                    "password_required": account['PasswordRequired'] == 'TRUE',
+                    "sid": account['SID']
+                })
         
         return accounts
     
     def get_user_groups(self):
         """使用wmic获取用户组列表"""
         groups = []
-        output = self._run_cmd('wmic group get name,description,sid,domain /value')
         
-        # 分割输出为组块
-        group_sections = output.strip().split('\n\n')
-        
-        for section in group_sections:
-            if not section:
-                continue
-            
-            group_info = {
-                "name": "",
-                "description": "",
-                "sid": "",
-                "domain": ""
-            }
-            
-            lines = section.split('\n')
-            for line in lines:
-                if '=' in line:
-                    key, value = line.split('=', 1)
-                    key = key.strip()
-                    value = value.strip()
-                    
-                    if key == 'Name':
-                        group_info['name'] = value
-                    elif key == 'Description':
-                        group_info['description'] = value
-                    elif key == 'SID':
-                        group_info['sid'] = value
-                    elif key == 'Domain':
-                        group_info['domain'] = value
-            
-            if group_info['name']:  # 只添加有名称的组
-                groups.append(group_info)
+        for group in query_wmi(self._executor, 'Win32_Group', ['Name', 'Description', 'SID', 'Domain']):
+            if group['Name']:  # 只添加有名称的组
+                groups.append({
+                    "name": group['Name'],
+                    "description": group['Description'],
+                    "sid": group['SID'],
+                    "domain": group['Domain']
+                })
         
         return groups
     
@@ -168,30 +127,15 @@ class SecurityInfo:
         else:
             user = username
         
-        # 使用wmic获取所有用户的name和sid
-        output = self._run_cmd('wmic useraccount get name,sid')
-        
-        # 解析输出，查找当前用户的SID
-        lines = output.strip().split('\n')
-        for line in lines[1:]:  # 跳过标题行
-            line = line.strip()
-            if not line:
-                continue
-            
-            # 提取用户名和SID
-            # 用户名和SID之间有多个空格分隔
-            parts = line.split()
-            if len(parts) >= 2:
-                user_name = parts[0]
-                sid = ' '.join(parts[1:])
-                
-                if user_name == user:
-                    return {
-                        "username": username,
-                        "name": user,
-                        "sid": sid,
-                        "domain": current_user['domain']
-                    }
+        # 与get_user_accounts共用同一次Win32_UserAccount查询，查找当前用户的SID
+        for account in query_wmi(self._executor, 'Win32_UserAccount', ['Name', 'SID']):
+            if account['Name'] == user:
+                return {
+                    "username": username,
+                    "name": user,
+                    "sid": account['SID'],
+                    "domain": current_user['domain']
+                }
         
         # 如果没有找到，返回基本信息
         return {
@@ -204,10 +148,12 @@ class SecurityInfo:
     def get_uac_settings(self):
         """获取UAC（用户账户控制）设置"""
         uac_reg_path = r"SOFTWARE\Microsoft\Windows\CurrentVersion\Policies\System"
-        enable_lua = read_registry_value(uac_reg_path, "EnableLUA")
-        consent_prompt_behavior_admin = read_registry_value(uac_reg_path, "ConsentPromptBehaviorAdmin")
-        consent_prompt_behavior_user = read_registry_value(uac_reg_path, "ConsentPromptBehaviorUser")
-        prompt_on_secure_desktop = read_registry_value(uac_reg_path, "PromptOnSecureDesktop")
+        # 一次读取UAC策略键下的全部值
+        values = get_registry_values(uac_reg_path, backend=self._registry)
+        enable_lua = values.get("EnableLUA")
+        consent_prompt_behavior_admin = values.get("ConsentPromptBehaviorAdmin")
+        consent_prompt_behavior_user = values.get("ConsentPromptBehaviorUser")
+        prompt_on_secure_desktop = values.get("PromptOnSecureDesktop")
         
         uac_levels = {
             0: "Never notify",
@@ -238,74 +184,93 @@ class SecurityInfo:
             "start_mode": start_type_match.group(1) if start_type_match else ""
         }
     
-    def get_firewall_rules(self):
-        """使用netsh advfirewall获取防火墙规则列表"""
-        rules = []
-        output = self._run_cmd('netsh advfirewall firewall show rule name=all')
+    def get_firewall_rules(self, verbose=False):
+        """使用netsh advfirewall获取防火墙规则列表
         
-        # 分割输出为规则块
-        rule_sections = output.split('\n\n')
+        输出只遍历一次，字段说明见firewall.iter_firewall_rules()。
         
-        for section in rule_sections:
-            if 'Rule Name:' not in section:
-                continue
-            
-            rule_info = {
-                "name": "",
-                "display_name": "",
-                "description": "",
-                "direction": "",
-                "action": "",
-                "enabled": False,
-                "protocol": "",
-                "local_ports": "",
-                "remote_ports": "",
-                "local_addresses": "",
-                "remote_addresses": ""
-            }
-            
-            # 解析规则名称
-            name_match = re.search(r'Rule Name:\s+(.+)', section)
-            if name_match:
-                rule_info['name'] = name_match.group(1)
-                rule_info['display_name'] = name_match.group(1)
-            
-            # 解析描述
-            desc_match = re.search(r'Description:\s+(.+)', section)
-            if desc_match:
-                rule_info['description'] = desc_match.group(1)
-            
-            # 解析方向
-            dir_match = re.search(r'Direction:\s+(.+)', section)
-            if dir_match:
-                rule_info['direction'] = dir_match.group(1)
-            
-            # 解析操作
-            action_match = re.search(r'Action:\s+(.+)', section)
-            if action_match:
-                rule_info['action'] = action_match.group(1)
-            
-            # 解析启用状态
-            enabled_match = re.search(r'Enabled:\s+(.+)', section)
-            if enabled_match:
-                rule_info['enabled'] = enabled_match.group(1).lower() == 'yes'
-            
-            # 解析协议
-            protocol_match = re.search(r'Protocol:\s+(.+)', section)
-            if protocol_match:
-                rule_info['protocol'] = protocol_match.group(1)
-            
-            rules.append(rule_info)
+        Args:
+            verbose: 是否使用verbose输出填充程序、服务和描述字段，否则这些字段为空字符串
+        """
+        output = self._run_cmd(FIREWALL_RULES_VERBOSE_CMD if verbose else FIREWALL_RULES_CMD)
+        return list(iter_firewall_rules(output.split('\n')))
+    
+    def iter_firewall_rules(self, verbose=False):
+        """在netsh输出到达时逐条返回防火墙规则，不缓存输出，内存占用与规则数量无关
+        
+        Args:
+            verbose: 是否使用verbose输出填充程序、服务和描述字段
         
-        return rules
+        Yields:
+            与get_firewall_rules()条目一致的规则字典
+        """
+        lines = self._executor.stream(FIREWALL_RULES_VERBOSE_CMD if verbose else FIREWALL_RULES_CMD)
+        try:
+            yield from iter_firewall_rules(lines)
+        finally:
+            lines.close()
+    
+    def get_firewall_rule_index(self):
+        """获取防火墙规则的查询索引
+        
+        索引支持按程序查询，因此使用verbose输出。命令输出由执行器缓存，相同的输出只解析并建立一次索引。
+        
+        Returns:
+            FirewallRuleIndex实例
+        """
+        output = self._run_cmd(FIREWALL_RULES_VERBOSE_CMD)
+        with self._firewall_index_lock:
+            if self._firewall_index is None or self._firewall_index[0] != output:
+                self._firewall_index = (output, FirewallRuleIndex(iter_firewall_rules(output.split('\n'))))
+            return self._firewall_index[1]
     
-    def get_all_security_info(self):
-        """获取所有安全信息"""
+    def find_firewall_rules(self, port=None, remote_port=None, address=None, local_address=None,
+                            direction=None, action=None, profile=None, protocol=None, program=None,
+                            enabled=None):
+        """查询满足全部条件的防火墙规则，如find_firewall_rules(port=3389, direction='In', action='Allow')
+        
+        端口和地址会考虑规则中的范围、子网和Any，条件为None时不限制。
+        
+        Args:
+            port: 本地端口，如3389或'RPC'
+            remote_port: 远程端口
+            address: 远程地址，如'10.1.2.3'或'LocalSubnet'
+            local_address: 本地地址
+            direction: 方向，In或Out
+            action: 操作，Allow、Block或Bypass
+            profile: 配置文件，Domain、Private或Public
+            protocol: 协议，如TCP
+            program: 程序路径，可以包含环境变量，不区分大小写
+            enabled: 是否只返回已启用（True）或已禁用（False）的规则
+            
+        Returns:
+            与get_firewall_rules()条目一致的规则字典列表
+        """
+        return self.get_firewall_rule_index().find(
+            port=port, remote_port=remote_port, address=address, local_address=local_address,
+            direction=direction, action=action, profile=profile, protocol=protocol, program=program,
+            enabled=enabled
+        )
+    
+    def get_collectors(self):
+        """获取字段名到采集方法的映射
+        
+        Returns:
+            字段名到无参采集方法的字典，与get_all_security_info()返回的字段一一对应
+        """
         return {
-            "user_accounts": self.get_user_accounts(),
-            "user_groups": self.get_user_groups(),
-            "current_user": self.get_current_user(),
-            "uac_settings": self.get_uac_settings(),
-            "windows_defender_status": self.get_windows_defender_status(),
-            "firewall_rules": self.get_firewall_rules()
+            "user_accounts": self.get_user_accounts,
+            "user_groups": self.get_user_groups,
+            "current_user": self.get_current_user,
+            "uac_settings": self.get_uac_settings,
+            "windows_defender_status": self.get_windows_defender_status,
+            "firewall_rules": self.get_firewall_rules
         }
+    
+    def get_all_security_info(self, max_workers=None):
+        """获取所有安全信息
+        
+        Args:
+            max_workers: 并行采集的线程数量，默认使用执行器的并发上限，为1时按顺序采集
+        """
+        return self._executor.collect(self.get_collectors(), max_workers)
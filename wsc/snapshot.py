@@ -0,0 +1,191 @@
+"""按需采集的系统信息快照模块
+
+快照实现只读的Mapping接口，每个模块、每个字段只在第一次被读取时才执行对应的采集方法，
+结果会被缓存，之后的读取不再启动任何命令。
+"""
+
+import threading
+from collections.abc import Mapping
+from .executor import get_default_executor
+
+# 表示没有提供默认值的占位对象
+_MISSING = object()
+
+
+def get_path(data, path, default=_MISSING):
+    """按点分隔的路径从嵌套的字典或列表中取值
+
+    Args:
+        data: 字典、列表或LazyMapping
+        path: 点分隔的路径，如'hardware.memory.total'，列表使用数字下标
+        default: 路径不存在时返回的默认值，不提供时抛出KeyError
+
+    Returns:
+        路径对应的值
+    """
+    value = data
+    for part in path.split('.') if path else []:
+        try:
+            if isinstance(value, list):
+                value = value[int(part)]
+            else:
+                value = value[part]
+        except (KeyError, IndexError, ValueError, TypeError):
+            if default is _MISSING:
+                raise KeyError(path)
+            return default
+    return value
+
+
+class LazyMapping(Mapping):
+    """按需采集的只读映射，每个字段在第一次读取时才执行对应的采集函数"""
+
+    def __init__(self, loaders, executor=None):
+        """初始化
+
+        Args:
+            loaders: 字段名到无参采集函数的字典
+            executor: 用于并行采集的执行器，默认使用共享执行器
+        """
+        self._loaders = dict(loaders)
+        self._values = {}
+        self._locks = {name: threading.Lock() for name in self._loaders}
+        self._executor = executor or get_default_executor()
+
+    def __getitem__(self, key):
+        if key in self._values:
+            return self._values[key]
+        loader = self._loaders[key]
+        with self._locks[key]:
+            if key not in self._values:
+                self._values[key] = loader()
+        return self._values[key]
+
+    def __iter__(self):
+        return iter(self._loaders)
+
+    def __len__(self):
+        return len(self._loaders)
+
+    def __repr__(self):
+        fields = ', '.join(
+            f"{name!r}: {'<loaded>' if name in self._values else '<pending>'}" for name in self._loaders
+        )
+        return f"{type(self).__name__}({{{fields}}})"
+
+    def is_loaded(self, key):
+        """判断字段是否已经采集
+
+        Args:
+            key: 字段名
+
+        Returns:
+            已采集返回True，否则返回False
+        """
+        return key in self._values
+
+    def materialize(self, max_workers=None):
+        """并行采集所有尚未采集的字段，并转换为普通字典
+
+        Args:
+            max_workers: 并行采集的线程数量，默认使用执行器的并发上限，为1时按顺序采集
+
+        Returns:
+            包含所有字段的普通字典，嵌套的LazyMapping也会被展开
+        """
+        def load(key):
+            value = self[key]
+            if isinstance(value, LazyMapping):
+                return value.materialize(max_workers)
+            return value
+
+        return self._executor.collect({key: (lambda key=key: load(key)) for key in self._loaders}, max_workers)
+
+    def project(self, paths, max_workers=None, default=_MISSING):
+        """只采集指定路径涉及的字段，并按路径组装结果
+
+        未被请求的字段对应的采集方法不会执行，涉及的字段之间并行采集。
+
+        Args:
+            paths: 点分隔的路径列表，如['hardware.memory', 'network.hostname']
+            max_workers: 并行采集的线程数量，默认使用执行器的并发上限，为1时按顺序采集
+            default: 路径不存在时使用的默认值，不提供时抛出KeyError
+
+        Returns:
+            只包含请求路径的嵌套普通字典
+        """
+        # 按第一级字段分组，剩余部分交给下一级处理
+        groups = {}
+        for path in paths:
+            key, _, rest = path.partition('.')
+            groups.setdefault(key, []).append(rest)
+
+        def load(key, rests):
+            if key not in self._loaders:
+                if default is _MISSING:
+                    raise KeyError(key)
+                return default
+            value = self[key]
+            if '' in rests:
+                # 请求了整个字段
+                return value.materialize(max_workers) if isinstance(value, LazyMapping) else value
+            if isinstance(value, LazyMapping):
+                return value.project(rests, max_workers, default)
+            result = {}
+            for rest in rests:
+                _set_path(result, rest, get_path(value, rest, default))
+            return result
+
+        tasks = {key: (lambda key=key, rests=rests: load(key, rests)) for key, rests in groups.items()}
+        return self._executor.collect(tasks, max_workers)
+
+
+def _set_path(data, path, value):
+    """按点分隔的路径向嵌套字典中写入值"""
+    parts = path.split('.')
+    for part in parts[:-1]:
+        data = data.setdefault(part, {})
+    data[parts[-1]] = value
+
+
+class LazySnapshot(LazyMapping):
+    """所有系统信息的按需采集快照，结构与get_all_info()的返回值一致"""
+
+    def __init__(self, collectors, executor=None):
+        """初始化
+
+        Args:
+            collectors: 模块名到信息类实例的字典，如{"hardware": HardwareInfo()}
+            executor: 用于并行采集的执行器，默认使用共享执行器
+        """
+        executor = executor or get_default_executor()
+        loaders = {
+            name: (lambda collector=collector: LazyMapping(collector.get_collectors(), executor))
+            for name, collector in collectors.items()
+        }
+        super().__init__(loaders, executor)
+
+
+def create_collectors(executor=None):
+    """创建全部六个信息类的实例
+
+    Args:
+        executor: 信息类共享的命令执行器，默认使用共享执行器
+
+    Returns:
+        模块名到信息类实例的字典，顺序与get_all_info()的返回值一致
+    """
+    from .system import SystemInfo
+    from .hardware import HardwareInfo
+    from .configuration import ConfigurationInfo
+    from .software import SoftwareInfo
+    from .network import NetworkInfo
+    from .security import SecurityInfo
+    return {
+        "system": SystemInfo(executor),
+        "hardware": HardwareInfo(executor),
+        "configuration": ConfigurationInfo(executor),
+        "software": SoftwareInfo(executor),
+        "network": NetworkInfo(executor),
+        "security": SecurityInfo(executor)
+    }
@@ -1,66 +1,97 @@
-import subprocess
+import datetime
 import re
-from .utils import get_registry_subkeys, get_registry_values
+import threading
+from .executor import get_default_executor
+from .inventory import InstalledProgramInventory
+from .tasklist import ProcessTableCache, TASKLIST_CMD, TASKLIST_VERBOSE_CMD, build_pid_query, iter_tasklist_rows
+from .wmi import query_wmi
 
 class SoftwareInfo:
     """Windows软件信息获取类，使用命令行工具获取信息"""
     
-    def __init__(self):
-        """初始化"""
-        pass
+    def __init__(self, executor=None, inventory_path=None, registry=None):
+        """初始化
+        
+        Args:
+            executor: 命令执行器，默认使用所有信息类共享的执行器
+            inventory_path: 已安装程序清单文件路径，为True时使用inventory.get_default_inventory_path()；
+                默认为None，清单只保存在内存中，读取已安装程序不会写入任何文件
+            registry: 注册表后端，如读取离线配置单元的registry.HiveBackend，
+                默认使用registry.get_default_registry_backend()
+        """
+        self._executor = executor or get_default_executor()
+        self._registry = registry
+        self._inventory_path = inventory_path
+        self._inventory = None
+        self._inventory_lock = threading.Lock()
+        # 进程快照，在tasklist的缓存有效期内复用
+        self._process_tables = ProcessTableCache(self._executor)
     
     def _run_cmd(self, cmd):
         """执行命令行命令并返回输出"""
-        try:
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True, encoding='gbk')
-            return result.stdout
-        except Exception:
-            # 尝试使用utf-8编码
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True, encoding='utf-8')
-            return result.stdout
+        return self._executor.run(cmd)
+    
+    def get_inventory(self):
+        """获取已安装程序的增量清单，指定了清单文件时第一次调用从磁盘加载"""
+        with self._inventory_lock:
+            if self._inventory is None:
+                self._inventory = InstalledProgramInventory(self._inventory_path, self._registry)
+            return self._inventory
     
-    def get_installed_programs(self):
-        """获取已安装程序列表"""
-        programs = []
+    def get_installed_programs(self, changed_since=None):
+        """获取已安装程序列表
         
-        # 从注册表获取已安装程序
-        reg_paths = [
-            r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall",
-            r"SOFTWARE\WOW6432Node\Microsoft\Windows\CurrentVersion\Uninstall"
-        ]
+        清单只重新读取新增或最后写入时间变化的Uninstall子键，并记录安装、卸载和变更事件。
+        只有构造时指定了inventory_path才会把清单写入文件，跨进程保留事件记录。
         
-        for reg_path in reg_paths:
-            subkeys = get_registry_subkeys(reg_path)
-            for subkey in subkeys:
-                program_key = f"{reg_path}\\{subkey}"
-                program_info = get_registry_values(program_key)
-                
-                # 过滤掉空的或系统组件
-                if not program_info or "DisplayName" not in program_info:
-                    continue
-                
-                program = {
-                    "name": program_info.get("DisplayName", ""),
-                    "version": program_info.get("DisplayVersion", ""),
-                    "publisher": program_info.get("Publisher", ""),
-                    "install_date": program_info.get("InstallDate", ""),
-                    "uninstall_string": program_info.get("UninstallString", ""),
-                    "install_location": program_info.get("InstallLocation", "")
-                }
-                programs.append(program)
+        Args:
+            changed_since: Unix时间戳或datetime，指定时只返回该时间之后的变化
+            
+        Returns:
+            未指定changed_since时返回按名称排序并去重的程序列表；
+            指定时返回包含installed、uninstalled、changed和complete的字典，
+            complete为False表示该时间早于清单建立时间，结果可能不完整
+        """
+        inventory = self.get_inventory()
+        inventory.refresh()
+        
+        if changed_since is not None:
+            if isinstance(changed_since, datetime.datetime):
+                changed_since = changed_since.timestamp()
+            return inventory.get_changes(changed_since)
         
         # 去重，按程序名称排序
         seen = set()
         unique_programs = []
-        for program in programs:
+        for program in inventory.get_programs():
             if program["name"] not in seen:
                 seen.add(program["name"])
                 unique_programs.append(program)
         
         return sorted(unique_programs, key=lambda x: x["name"])
     
-    def get_running_processes(self):
-        """使用tasklist命令获取正在运行的进程列表"""
+    def get_process_table(self, verbose=True):
+        """获取tasklist /FO CSV /NH的进程快照
+        
+        快照从tasklist的流式输出逐行建立，在tasklist的缓存有效期内复用，不会重复启动tasklist。
+        
+        Args:
+            verbose: 为True时使用tasklist /V，包含用户名、状态、CPU时间和窗口标题，但要慢得多
+        
+        Returns:
+            ProcessTable实例
+        """
+        return self._process_tables.get(TASKLIST_VERBOSE_CMD if verbose else TASKLIST_CMD)
+    
+    def get_running_processes(self, verbose=False):
+        """使用tasklist命令获取正在运行的进程列表
+        
+        Args:
+            verbose: 为True时从一次tasklist /V快照中读取，包含用户名、状态、CPU时间和窗口标题
+        """
+        if verbose:
+            return [dict(process) for process in self.get_process_table().processes]
+        
         processes = []
         # 使用更简单的tasklist命令，不带详细信息，提高性能
         output = self._run_cmd('tasklist')
@@ -99,86 +130,76 @@ class SoftwareInfo:
         
         return processes
     
-    def get_process_info(self, pid):
-        """使用tasklist命令获取特定进程信息
+    def get_process_info(self, pid, verbose=True):
+        """获取特定进程信息
+        
+        有效期内已有进程快照时直接按PID查找，否则只用tasklist /FI "PID eq n"查询这一个进程，
+        不读取全部进程的快照。
         
         Args:
             pid: 进程ID
+            verbose: 为True时包含用户名、状态、CPU时间和窗口标题
             
         Returns:
             进程信息字典，如果进程不存在则返回None
         """
-        output = self._run_cmd(f'tasklist /FI "PID eq {pid}" /FO CSV /V')
-        lines = output.strip().split('\n')
+        tables = [self._process_tables.peek(TASKLIST_VERBOSE_CMD)]
+        if not verbose:
+            tables.append(self._process_tables.peek(TASKLIST_CMD))
+        for table in tables:
+            if table is not None:
+                process = table.get(pid)
+                return dict(process) if process else None
         
-        if len(lines) < 2:  # 标题行 + 至少一行进程信息
+        cmd = build_pid_query(pid, verbose)
+        if cmd is None:
             return None
+        for process in iter_tasklist_rows(self._run_cmd(cmd).split('\n')):
+            if process["pid"] == int(pid):
+                return process
+        return None
+    
+    def get_processes_info(self, pids, verbose=True):
+        """批量获取进程信息，所有PID共用一次tasklist快照
         
-        # 解析进程信息
-        line = lines[1]
-        match = re.match(r'"([^"]*)","([^"]*)","([^"]*)","([^"]*)","([^"]*)","([^"]*)","([^"]*)","([^"]*)","([^"]*)","([^"]*)","([^"]*)"', line)
-        if match:
-            image_name = match.group(1)
-            username = match.group(7)
-            status = match.group(6)
-            mem_usage = match.group(5)
-            cpu_time = match.group(8)
-            window_title = match.group(9)
+        Args:
+            pids: 进程ID的可迭代对象
+            verbose: 为True时使用tasklist /V快照，为False时使用快得多的普通快照，只包含映像名称、会话和内存
             
-            return {
-                "pid": pid,
-                "name": image_name,
-                "username": username,
-                "status": status,
-                "mem_usage": mem_usage,
-                "cpu_time": cpu_time,
-                "window_title": window_title
-            }
-        return None
+        Returns:
+            PID到进程信息字典的字典，进程不存在时值为None
+        """
+        pids = list(pids)
+        if len(pids) == 1:
+            return {pids[0]: self.get_process_info(pids[0], verbose)}
+        
+        table = self.get_process_table(verbose)
+        result = {}
+        for pid in pids:
+            process = table.get(pid)
+            result[pid] = dict(process) if process else None
+        return result
+    
+    def _get_system_drivers(self):
+        """获取所有驱动程序，驱动程序列表和单个驱动查询共用同一次Win32_SystemDriver查询"""
+        return query_wmi(self._executor, 'Win32_SystemDriver', [
+            'Name', 'DisplayName', 'Description', 'State', 'StartMode', 'PathName', 'ServiceType'
+        ])
     
     def get_installed_drivers(self):
         """使用wmic获取已安装驱动程序列表"""
         drivers = []
-        output = self._run_cmd('wmic sysdriver get name,displayname,description,state,startmode,pathname,servicetype /value')
-        driver_sections = output.strip().split('\n\n')
         
-        for section in driver_sections:
-            if not section:
-                continue
-            
-            driver_info = {
-                "name": "",
-                "display_name": "",
-                "description": "",
-                "state": "",
-                "start_mode": "",
-                "path_name": "",
-                "driver_type": ""
-            }
-            
-            lines = section.split('\n')
-            for line in lines:
-                if '=' in line:
-                    key, value = line.split('=', 1)
-                    key = key.strip()
-                    value = value.strip()
-                    
-                    if key == 'Name':
-                        driver_info['name'] = value
-                    elif key == 'DisplayName':
-                        driver_info['display_name'] = value
-                    elif key == 'Description':
-                        driver_info['description'] = value
-                    elif key == 'State':
-                        driver_info['state'] = value
-                    elif key == 'StartMode':
-                        driver_info['start_mode'] = value
-                    elif key == 'PathName':
-                        driver_info['path_name'] = value
-                    elif key == 'ServiceType':
-                        driver_info['driver_type'] = value
-            
-            drivers.append(driver_info)
+        for driver in self._get_system_drivers():
+            drivers.append({
+                "name": driver['Name'],
+                "display_name": driver['DisplayName'],
+                "description": driver['Description'],
+                "state": driver['State'],
+                "start_mode": driver['StartMode'],
+                "path_name": driver['PathName'],
+                "driver_type": driver['ServiceType']
+            })
         
         return drivers
     
@@ -191,74 +212,30 @@ class SoftwareInfo:
         Returns:
             驱动程序信息字典，如果驱动不存在则返回None
         """
-        output = self._run_cmd(f'wmic sysdriver where name="{driver_name}" get name,displayname,description,state,startmode /value')
-        
-        driver_info = {
-            "name": "",
-            "display_name": "",
-            "description": "",
-            "state": "",
-            "start_mode": ""
-        }
-        
-        lines = output.strip().split('\n')
-        if not lines or len(lines) < 2:  # 至少需要两行输出（标题和内容）
-            return None
-        
-        for line in lines:
-            if '=' in line:
-                key, value = line.split('=', 1)
-                key = key.strip()
-                value = value.strip()
-                
-                if key == 'Name':
-                    driver_info['name'] = value
-                elif key == 'DisplayName':
-                    driver_info['display_name'] = value
-                elif key == 'Description':
-                    driver_info['description'] = value
-                elif key == 'State':
-                    driver_info['state'] = value
-                elif key == 'StartMode':
-                    driver_info['start_mode'] = value
-        
-        return driver_info if driver_info['name'] else None
+        for driver in self._get_system_drivers():
+            if driver['Name'] and driver['Name'].lower() == driver_name.lower():
+                return {
+                    "name": driver['Name'],
+                    "display_name": driver['DisplayName'],
+                    "description": driver['Description'],
+                    "state": driver['State'],
+                    "start_mode": driver['StartMode']
+                }
+        return None
     
     def get_startup_programs(self):
         """使用wmic获取启动程序列表"""
         startup_programs = []
-        output = self._run_cmd('wmic startupcommand get caption,command,location,user /value')
-        startup_sections = output.strip().split('\n\n')
         
-        for section in startup_sections:
-            if not section:
-                continue
-            
-            startup_info = {
-                "name": "",
-                "command": "",
-                "location": "",
-                "user": ""
-            }
-            
-            lines = section.split('\n')
-            for line in lines:
-                if '=' in line:
-                    key, value = line.split('=', 1)
-                    key = key.strip()
-                    value = value.strip()
-                    
-                    if key == 'Caption':
-                        startup_info['name'] = value
-                    elif key == 'Command':
-                        startup_info['command'] = value
-                    elif key == 'Location':
-                        startup_info['location'] = value
-                    elif key == 'User':
-                        startup_info['user'] = value
-            
-            if startup_info['name']:  # 只添加有名称的启动项
-                startup_programs.append(startup_info)
+        commands = query_wmi(self._executor, 'Win32_StartupCommand', ['Caption', 'Command', 'Location', 'User'])
+        for command in commands:
+            if command['Caption']:  # 只添加有名称的启动项
+                startup_programs.append({
+                    "name": command['Caption'],
+                    "command": command['Command'],
+                    "location": command['Location'],
+                    "user": command['User']
+                })
         
         return startup_programs
     
@@ -287,12 +264,24 @@ class SoftwareInfo:
         
         return features
     
-    def get_all_software_info(self):
-        """获取所有软件信息"""
+    def get_collectors(self):
+        """获取字段名到采集方法的映射
+        
+        Returns:
+            字段名到无参采集方法的字典，与get_all_software_info()返回的字段一一对应
+        """
         return {
-            "installed_programs": self.get_installed_programs(),
-            "running_processes": self.get_running_processes(),
-            "installed_drivers": self.get_installed_drivers(),
-            "startup_programs": self.get_startup_programs(),
-            "windows_features": self.get_windows_features()
+            "installed_programs": self.get_installed_programs,
+            "running_processes": self.get_running_processes,
+            "installed_drivers": self.get_installed_drivers,
+            "startup_programs": self.get_startup_programs,
+            "windows_features": self.get_windows_features
         }
+    
+    def get_all_software_info(self, max_workers=None):
+        """获取所有软件信息
+        
+        Args:
+            max_workers: 并行采集的线程数量，默认使用执行器的并发上限，为1时按顺序采集
+        """
+        return self._executor.collect(self.get_collectors(), max_workers)
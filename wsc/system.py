@@ -1,26 +1,25 @@
 import platform
 import os
 import socket
-import subprocess
 import re
 import time
+from .executor import get_default_executor
+from .wmi import query_wmi_value
 
 class SystemInfo:
     """Windows系统基本信息获取类，减少第三方库依赖"""
     
-    def __init__(self):
-        """初始化"""
-        pass
+    def __init__(self, executor=None):
+        """初始化
+        
+        Args:
+            executor: 命令执行器，默认使用所有信息类共享的执行器
+        """
+        self._executor = executor or get_default_executor()
     
     def _run_cmd(self, cmd):
         """执行命令行命令并返回输出"""
-        try:
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True, encoding='gbk')
-            return result.stdout
-        except Exception:
-            # 尝试使用utf-8编码
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True, encoding='utf-8')
-            return result.stdout
+        return self._executor.run(cmd)
     
     def get_os_version(self):
         """获取操作系统版本"""
@@ -32,16 +31,16 @@ class SystemInfo:
     
     def get_os_build(self):
         """使用wmic获取操作系统构建号"""
-        output = self._run_cmd('wmic os get buildnumber /value')
-        match = re.search(r'BuildNumber=(\d+)', output)
+        output = query_wmi_value(self._executor, 'Win32_OperatingSystem', 'BuildNumber')
+        match = re.match(r'(\d+)', output)
         if match:
             return match.group(1)
         return ""
     
     def get_service_pack(self):
         """使用wmic获取服务包信息"""
-        output = self._run_cmd('wmic os get servicepackmajorversion /value')
-        match = re.search(r'ServicePackMajorVersion=(\d+)', output)
+        output = query_wmi_value(self._executor, 'Win32_OperatingSystem', 'ServicePackMajorVersion')
+        match = re.match(r'(\d+)', output)
         if match:
             return int(match.group(1))
         return 0
@@ -52,8 +51,8 @@ class SystemInfo:
     
     def get_boot_time(self):
         """使用wmic获取系统启动时间"""
-        output = self._run_cmd('wmic os get lastbootuptime /value')
-        match = re.search(r'LastBootUpTime=(\d{8})(\d{6})', output)
+        output = query_wmi_value(self._executor, 'Win32_OperatingSystem', 'LastBootUpTime')
+        match = re.match(r'(\d{8})(\d{6})', output)
         if match:
             date_str = match.group(1)
             time_str = match.group(2)
@@ -69,10 +68,8 @@ class SystemInfo:
     
     def get_domain_name(self):
         """获取域名"""
-        output = self._run_cmd('wmic computersystem get domain /value')
-        match = re.search(r'Domain=(.+)', output)
-        if match:
-            domain = match.group(1).strip()
+        domain = query_wmi_value(self._executor, 'Win32_ComputerSystem', 'Domain')
+        if domain:
             # 如果是工作组，返回WORKGROUP
             if domain == socket.gethostname():
                 return "WORKGROUP"
@@ -87,17 +84,29 @@ class SystemInfo:
         """获取临时目录"""
         return os.environ.get("TEMP", "C:\\Windows\\Temp")
     
-    def get_all_info(self):
-        """获取所有系统基本信息"""
+    def get_collectors(self):
+        """获取字段名到采集方法的映射
+        
+        Returns:
+            字段名到无参采集方法的字典，与get_all_info()返回的字段一一对应
+        """
         return {
-            "os_name": self.get_os_name(),
-            "os_version": self.get_os_version(),
-            "os_build": self.get_os_build(),
-            "service_pack": self.get_service_pack(),
-            "architecture": self.get_system_architecture(),
-            "boot_time": self.get_boot_time(),
-            "computer_name": self.get_computer_name(),
-            "domain_name": self.get_domain_name(),
-            "system_directory": self.get_system_directory(),
-            "temp_directory": self.get_temp_directory()
+            "os_name": self.get_os_name,
+            "os_version": self.get_os_version,
+            "os_build": self.get_os_build,
+            "service_pack": self.get_service_pack,
+            "architecture": self.get_system_architecture,
+            "boot_time": self.get_boot_time,
+            "computer_name": self.get_computer_name,
+            "domain_name": self.get_domain_name,
+            "system_directory": self.get_system_directory,
+            "temp_directory": self.get_temp_directory
         }
+    
+    def get_all_info(self, max_workers=None):
+        """获取所有系统基本信息
+        
+        Args:
+            max_workers: 并行采集的线程数量，默认使用执行器的并发上限，为1时按顺序采集
+        """
+        return self._executor.collect(self.get_collectors(), max_workers)
@@ -0,0 +1,145 @@
+"""tasklist CSV输出解析模块
+
+把tasklist /FO CSV /NH（可以带/V）的输出用csv模块逐行解析为进程字典，
+ProcessTable在一次快照上建立按PID索引的字典，按PID查询进程不需要再启动tasklist。
+快照直接从执行器的流式输出逐行建立，不需要先保存完整的命令输出。
+CSV的列按位置对应，与系统语言无关。
+"""
+
+import csv
+import threading
+import time
+
+# 进程快照命令：详细输出包含用户名、状态、CPU时间和窗口标题，普通输出只有前5列，速度快得多
+TASKLIST_CMD = 'tasklist /FO CSV /NH'
+TASKLIST_VERBOSE_CMD = 'tasklist /V /FO CSV /NH'
+
+# CSV列对应的字段，普通输出只有前5列
+TASKLIST_FIELDS = ("name", "pid", "session_name", "session_number", "mem_usage",
+                   "status", "username", "cpu_time", "window_title")
+
+
+def iter_tasklist_rows(lines):
+    """逐行解析tasklist的CSV输出
+
+    Args:
+        lines: 输出行的可迭代对象，如文件对象或执行器的stream()
+
+    Yields:
+        进程字典，pid为整数，普通输出中没有的字段为空字符串；PID无法解析的行（如提示信息）被跳过
+    """
+    for row in csv.reader(lines):
+        if len(row) < 5:
+            continue
+        pid = row[1].strip()
+        if not pid.isdigit():
+            continue
+        process = dict.fromkeys(TASKLIST_FIELDS, "")
+        process.update(zip(TASKLIST_FIELDS, row))
+        process["pid"] = int(pid)
+        yield process
+
+
+class ProcessTable:
+    """一次tasklist快照中的进程，按PID建立索引"""
+
+    def __init__(self, lines):
+        """逐行解析tasklist的CSV输出
+
+        Args:
+            lines: tasklist /FO CSV /NH或tasklist /V /FO CSV /NH的输出行，如执行器的stream()
+        """
+        self.processes = list(iter_tasklist_rows(lines))
+        self.by_pid = {process["pid"]: process for process in self.processes}
+
+    def get(self, pid):
+        """按PID查找进程
+
+        Args:
+            pid: 进程ID，整数或数字字符串
+
+        Returns:
+            进程字典，找不到时返回None
+        """
+        try:
+            return self.by_pid.get(int(pid))
+        except (TypeError, ValueError):
+            return None
+
+
+def build_pid_query(pid, verbose=False):
+    """生成只查询单个进程的tasklist命令
+
+    Args:
+        pid: 进程ID
+        verbose: 是否包含用户名、状态、CPU时间和窗口标题
+
+    Returns:
+        命令行字符串，pid不是整数时返回None
+    """
+    try:
+        pid = int(pid)
+    except (TypeError, ValueError):
+        return None
+    return f'{TASKLIST_VERBOSE_CMD if verbose else TASKLIST_CMD} /FI "PID eq {pid}"'
+
+
+class ProcessTableCache:
+    """按命令保存最近一次进程快照，在执行器缓存策略给出的有效期内复用
+
+    快照从执行器的stream()逐行建立，命令输出不经过执行器缓存；
+    执行器没有缓存或策略的有效期为0时（如create_boot_only_cache()），每次都重新读取快照。
+    """
+
+    def __init__(self, executor):
+        """初始化
+
+        Args:
+            executor: 命令执行器，提供stream()和cache
+        """
+        self._executor = executor
+        # 命令行到(读取时间, ProcessTable)
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def _ttl(self, cmd):
+        """获取命令的快照有效期，BOOT_TTL（None）表示一直有效"""
+        cache = getattr(self._executor, 'cache', None)
+        return 0 if cache is None else cache.get_ttl(cmd)
+
+    def peek(self, cmd):
+        """返回有效期内的快照，不启动tasklist
+
+        Returns:
+            ProcessTable实例，没有有效的快照时返回None
+        """
+        with self._lock:
+            return self._peek(cmd)
+
+    def _peek(self, cmd):
+        entry = self._tables.get(cmd)
+        if entry is None:
+            return None
+        ttl = self._ttl(cmd)
+        if ttl is not None and time.monotonic() - entry[0] >= ttl:
+            del self._tables[cmd]
+            return None
+        return entry[1]
+
+    def get(self, cmd):
+        """获取进程快照，没有有效的快照时从流式输出重新建立
+
+        Args:
+            cmd: TASKLIST_CMD或TASKLIST_VERBOSE_CMD
+
+        Returns:
+            ProcessTable实例
+        """
+        with self._lock:
+            table = self._peek(cmd)
+            if table is None:
+                table = ProcessTable(self._executor.stream(cmd))
+                # 正常系统中总有进程在运行，空快照（如异步重放的第一轮）不保存
+                if table.processes:
+                    self._tables[cmd] = (time.monotonic(), table)
+            return table
@@ -1,5 +1,5 @@
-import winreg
 import datetime
+from .registry import HKEY_LOCAL_MACHINE, get_default_registry_backend
 
 def format_bytes(size_bytes):
     """格式化字节大小为可读单位
@@ -30,77 +30,170 @@ def format_timestamp(timestamp):
     """
     return datetime.datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
 
-def read_registry_value(key_path, value_name, hkey=winreg.HKEY_LOCAL_MACHINE):
+def read_registry_value(key_path, value_name, hkey=HKEY_LOCAL_MACHINE, backend=None):
     """安全读取Windows注册表值
     
     Args:
         key_path: 注册表键路径
         value_name: 注册表值名称
         hkey: 根键，默认为HKEY_LOCAL_MACHINE
+        backend: 注册表后端，默认为registry.get_default_registry_backend()
         
     Returns:
         注册表值，如果读取失败则返回None
     """
+    backend = backend or get_default_registry_backend()
     try:
-        key = winreg.OpenKey(hkey, key_path, 0, winreg.KEY_READ)
-        value, _ = winreg.QueryValueEx(key, value_name)
-        winreg.CloseKey(key)
-        return value
+        key = backend.open_key(hkey, key_path)
     except OSError:
         return None
+    try:
+        return backend.query_value(key, value_name)
+    except OSError:
+        return None
+    finally:
+        backend.close_key(key)
 
-def get_registry_subkeys(key_path, hkey=winreg.HKEY_LOCAL_MACHINE):
+def get_registry_subkeys(key_path, hkey=HKEY_LOCAL_MACHINE, backend=None):
     """获取注册表子键列表
     
     Args:
         key_path: 注册表键路径
         hkey: 根键，默认为HKEY_LOCAL_MACHINE
+        backend: 注册表后端，默认为registry.get_default_registry_backend()
         
     Returns:
         子键名称列表，如果读取失败则返回空列表
     """
-    subkeys = []
+    backend = backend or get_default_registry_backend()
     try:
-        key = winreg.OpenKey(hkey, key_path, 0, winreg.KEY_READ)
-        i = 0
-        while True:
-            try:
-                subkey = winreg.EnumKey(key, i)
-                subkeys.append(subkey)
-                i += 1
-            except OSError:
-                break
-        winreg.CloseKey(key)
+        key = backend.open_key(hkey, key_path)
     except OSError:
-        pass
-    return subkeys
+        return []
+    try:
+        return _enum_subkeys(backend, key)
+    except OSError:
+        return []
+    finally:
+        backend.close_key(key)
 
-def get_registry_values(key_path, hkey=winreg.HKEY_LOCAL_MACHINE):
+def get_registry_values(key_path, hkey=HKEY_LOCAL_MACHINE, backend=None):
     """获取注册表键下所有值
     
     Args:
         key_path: 注册表键路径
         hkey: 根键，默认为HKEY_LOCAL_MACHINE
+        backend: 注册表后端，默认为registry.get_default_registry_backend()
         
     Returns:
         包含所有值名称和数据的字典，如果读取失败则返回空字典
     """
-    values = {}
+    backend = backend or get_default_registry_backend()
     try:
-        key = winreg.OpenKey(hkey, key_path, 0, winreg.KEY_READ)
-        i = 0
-        while True:
+        key = backend.open_key(hkey, key_path)
+    except OSError:
+        return {}
+    try:
+        return _read_values(backend, key)
+    except OSError:
+        return {}
+    finally:
+        backend.close_key(key)
+
+def _enum_subkeys(backend, key, count=None):
+    """按query_info返回的数量枚举已打开键的子键名称"""
+    if count is None:
+        count = backend.query_info(key)[0]
+    subkeys = []
+    for i in range(count):
+        try:
+            subkeys.append(backend.enum_key(key, i))
+        except OSError:
+            # 枚举期间子键被删除
+            break
+    return subkeys
+
+def _read_values(backend, key, value_names=None, count=None):
+    """读取已打开键中的值
+    
+    Args:
+        backend: 注册表后端
+        key: 已打开的注册表键
+        value_names: 只读取这些名称的值，为None时读取全部值
+        count: 键中值的数量，为None时通过query_info获取，枚举次数由它决定
+        
+    Returns:
+        值名称到数据的字典，不存在的值不包含在字典中
+    """
+    values = {}
+    if count is None:
+        count = backend.query_info(key)[1]
+    # 值比需要的名称还少时直接枚举，避免为不存在的值逐个查询失败
+    if value_names is not None and count > len(value_names):
+        for name in value_names:
             try:
-                value_name, value_data, _ = winreg.EnumValue(key, i)
-                values[value_name] = value_data
-                i += 1
+                values[name] = backend.query_value(key, name)
             except OSError:
-                break
-        winreg.CloseKey(key)
-    except OSError:
-        pass
+                continue
+        return values
+    for i in range(count):
+        try:
+            value_name, value_data, _ = backend.enum_value(key, i)
+        except OSError:
+            break
+        if value_names is None or value_name in value_names:
+            values[value_name] = value_data
     return values
 
+def iter_registry_subtree(key_path, value_names=None, depth=1, hkey=HKEY_LOCAL_MACHINE,
+                          want_values=None, backend=None):
+    """遍历注册表键下的子键树，读取每个子键中的值
+    
+    根键只按完整路径打开一次，每个子键都相对于已打开的父键句柄打开，
+    枚举次数由query_info返回的子键和值数量决定，不依赖枚举结束时的异常。
+    
+    Args:
+        key_path: 注册表键路径
+        value_names: 只读取这些名称的值，如('DisplayName', 'DisplayVersion')，为None时读取全部值
+        depth: 遍历的层数，1表示只遍历直接子键
+        hkey: 根键，默认为HKEY_LOCAL_MACHINE
+        want_values: 接收(子键路径, 最后写入时间)的函数，返回False时不读取该子键的值，
+            用于跳过最后写入时间没有变化的子键，为None时读取每个子键的值
+        backend: 注册表后端，默认为registry.get_default_registry_backend()
+        
+    Yields:
+        (相对于key_path的子键路径, 值字典, 最后写入时间)元组，没有读取值时值字典为None，
+        最后写入时间为FILETIME（自1601年起的100纳秒数）
+    """
+    backend = backend or get_default_registry_backend()
+    try:
+        root = backend.open_key(hkey, key_path)
+    except OSError:
+        return
+    try:
+        yield from _walk_subkeys(backend, root, '', value_names, depth, want_values)
+    finally:
+        backend.close_key(root)
+
+def _walk_subkeys(backend, parent, prefix, value_names, depth, want_values):
+    """递归遍历已打开键的子键"""
+    for name in _enum_subkeys(backend, parent):
+        try:
+            key = backend.open_key(parent, name)
+        except OSError:
+            continue
+        try:
+            subkey_count, value_count, last_write = backend.query_info(key)
+            path = prefix + name
+            if want_values is None or want_values(path, last_write):
+                yield path, _read_values(backend, key, value_names, value_count), last_write
+            else:
+                yield path, None, last_write
+            if depth > 1 and subkey_count:
+                yield from _walk_subkeys(backend, key, path + '\\', value_names, depth - 1, want_values)
+        finally:
+            backend.close_key(key)
+
 def safe_int(value, default=0):
     """安全转换为整数
     
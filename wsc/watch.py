@@ -0,0 +1,158 @@
+"""变化监视模块
+
+按固定间隔对某个字段采样，只输出相邻两次采样之间的变化：新增、移除和变化的条目。
+列表中的条目按稳定的标识（进程PID、连接五元组、网卡MAC地址、服务名称等）建立哈希索引，
+相同标识的条目直接按值比较，不会在每次采样时重新序列化全部数据，只有发生变化的条目才会被序列化输出。
+"""
+
+import json
+import sys
+import time
+from collections import Counter
+
+# 列表条目的标识字段，按顺序匹配，条目包含全部字段时使用这些字段的值作为标识
+IDENTITY_FIELDS = [
+    ("proto", "local_addr", "foreign_addr"),  # 网络连接五元组（协议、本地地址端口、远程地址端口）
+    ("pid",),
+    ("mac_address",),
+    ("guid",),
+    ("name",),
+    ("device_id",),
+]
+
+
+def _freeze(value):
+    """把字典、列表等嵌套结构转换为可哈希的值，用作条目标识"""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def get_identity(entry):
+    """获取列表条目的稳定标识
+
+    Args:
+        entry: 列表中的条目
+
+    Returns:
+        可哈希的标识，没有标识字段时使用条目本身的指纹
+    """
+    if isinstance(entry, dict):
+        for fields in IDENTITY_FIELDS:
+            if all(field in entry for field in fields):
+                if len(fields) == 1:
+                    return _freeze(entry[fields[0]])
+                return tuple(_freeze(entry[field]) for field in fields)
+    return _freeze(entry)
+
+
+class DeltaTracker:
+    """按标识索引上一次采样的各条目，计算与新采样之间的变化"""
+
+    def __init__(self, identity=get_identity):
+        """初始化
+
+        Args:
+            identity: 计算列表条目标识的函数
+        """
+        self._identity = identity
+        # 上一次采样中标识到条目的字典
+        self._entries = {}
+
+    def _index(self, value):
+        """把采样值转换为标识到条目的字典
+
+        列表按条目标识索引，标识重复的条目按出现次序区分；字典按键索引；其他值作为单个条目。
+        """
+        if isinstance(value, list):
+            entries = {}
+            seen = Counter()
+            for entry in value:
+                key = self._identity(entry)
+                seen[key] += 1
+                if seen[key] > 1:
+                    key = (key, seen[key])
+                entries[key] = entry
+            return entries
+        if isinstance(value, dict):
+            return dict(value)
+        return {None: value}
+
+    def update(self, value):
+        """比较新的采样值，返回变化事件列表并记录新的采样值
+
+        Args:
+            value: 新的采样值
+
+        Returns:
+            事件字典列表，事件类型为add、remove或change，change事件包含变化字段的新旧值
+        """
+        previous = self._entries
+        current = self._index(value)
+        events = []
+        for key, entry in current.items():
+            if key not in previous:
+                events.append({"event": "add", "key": key, "value": entry})
+                continue
+            old = previous[key]
+            # 每次采样都生成新的对象，相同标识的条目直接按值比较
+            if old == entry:
+                continue
+            event = {"event": "change", "key": key, "value": entry}
+            if isinstance(entry, dict) and isinstance(old, dict):
+                event["changes"] = {
+                    field: [old.get(field), entry.get(field)]
+                    for field in set(old) | set(entry)
+                    if old.get(field) != entry.get(field)
+                }
+            else:
+                event["old"] = old
+            events.append(event)
+        for key, entry in previous.items():
+            if key not in current:
+                events.append({"event": "remove", "key": key, "value": entry})
+        self._entries = current
+        return events
+
+
+def watch(sample, interval=1.0, emit=None, count=None, label=None):
+    """按固定间隔采样并输出变化
+
+    第一次采样的所有条目以add事件输出，之后只输出变化。采样耗时超过间隔时立即开始下一次采样。
+
+    Args:
+        sample: 无参采样函数，返回被监视的值
+        interval: 采样间隔（秒）
+        emit: 接收事件字典的函数，默认以NDJSON格式写到标准输出
+        count: 采样次数，默认一直运行直到被中断
+        label: 写入每个事件的path字段，通常为被监视的字段路径
+    """
+    if emit is None:
+        emit = _emit_ndjson
+    tracker = DeltaTracker()
+    ticks = 0
+    next_tick = time.monotonic()
+    while count is None or ticks < count:
+        timestamp = time.time()
+        for event in tracker.update(sample()):
+            event["ts"] = timestamp
+            if label is not None:
+                event["path"] = label
+            emit(event)
+        ticks += 1
+        if count is not None and ticks >= count:
+            break
+        next_tick += interval
+        delay = next_tick - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            next_tick = time.monotonic()
+
+
+def _emit_ndjson(event):
+    """把事件以一行JSON写到标准输出"""
+    sys.stdout.write(json.dumps(event, ensure_ascii=False) + '\n')
+    sys.stdout.flush()
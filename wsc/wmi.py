@@ -0,0 +1,211 @@
+"""WMI查询规划模块
+
+汇总所有信息类对每个WMI类需要的属性，按有效期分组后每组只发出一次合并后的wmic查询，
+查询结果由执行器缓存，各采集方法只取走自己需要的属性切片。
+查询计划在导入时生成，运行期间不会改变命令行，因此缓存键保持稳定。
+"""
+
+import types
+
+# 各信息类需要的WMI属性，按WMI类汇总，每个类再按缓存有效期分组
+# 易变属性单独成组，避免与开机期间不变的属性合并后整组按最短的有效期重新查询
+WMI_PROPERTY_GROUPS = {
+    # SystemInfo、HardwareInfo
+    'Win32_OperatingSystem': (('BuildNumber', 'ServicePackMajorVersion', 'LastBootUpTime'),
+                              ('FreePhysicalMemory',)),
+    'Win32_ComputerSystem': (('Domain', 'TotalPhysicalMemory'),),
+    # HardwareInfo
+    'Win32_Processor': (('Manufacturer', 'Name', 'NumberOfCores', 'NumberOfLogicalProcessors', 'MaxClockSpeed'),
+                        ('CurrentClockSpeed',)),
+    'Win32_DiskDrive': (('Caption', 'Size', 'InterfaceType', 'Name', 'MediaType'),),
+    'Win32_LogicalDisk': (('DeviceID', 'Description', 'FreeSpace', 'Size', 'VolumeName'),),
+    'Win32_VideoController': (('AdapterCompatibility', 'Name', 'AdapterRAM', 'DriverVersion'),),
+    'Win32_BaseBoard': (('Product', 'Manufacturer', 'SerialNumber'),),
+    'Win32_BIOS': (('Manufacturer', 'Version', 'ReleaseDate', 'SerialNumber'),),
+    # HardwareInfo、NetworkInfo
+    'Win32_NetworkAdapter': (('Name', 'Manufacturer', 'MACAddress', 'Speed', 'NetEnabled',
+                              'GUID', 'PhysicalAdapter', 'Index'),),
+    'Win32_NetworkAdapterConfiguration': (('IPEnabled', 'MACAddress', 'SettingID', 'IPAddress',
+                                           'IPSubnet', 'Index'),),
+    # SoftwareInfo
+    'Win32_SystemDriver': (('Name', 'DisplayName', 'Description', 'State', 'StartMode',
+                            'PathName', 'ServiceType'),),
+    'Win32_StartupCommand': (('Caption', 'Command', 'Location', 'User'),),
+    # SecurityInfo
+    'Win32_UserAccount': (('Name', 'FullName', 'Description', 'Disabled', 'Lockout',
+                           'PasswordRequired', 'SID'),),
+    'Win32_Group': (('Name', 'Description', 'SID', 'Domain'),),
+    # NetworkInfo（每个网卡的流量计数器）
+    'MSFT_NetAdapterStatisticsSettingData': (('InstanceID', 'Name', 'InterfaceDescription',
+                                              'ReceivedBytes', 'SentBytes',
+                                              'ReceivedUnicastPackets', 'SentUnicastPackets',
+                                              'ReceivedMulticastPackets', 'SentMulticastPackets',
+                                              'ReceivedBroadcastPackets', 'SentBroadcastPackets',
+                                              'ReceivedDiscardedPackets', 'OutboundDiscardedPackets',
+                                              'ReceivedPacketErrors', 'OutboundPacketErrors'),),
+}
+
+# 默认命名空间root\cimv2以外的WMI类所在的命名空间
+WMI_CLASS_NAMESPACES = {
+    'MSFT_NetAdapterStatisticsSettingData': r'root\StandardCimv2',
+}
+
+
+def build_wmi_query(wmi_class, properties):
+    """生成查询WMI类指定属性的wmic命令
+
+    Args:
+        wmi_class: WMI类名称
+        properties: 属性名称列表
+
+    Returns:
+        命令行字符串
+    """
+    properties = ','.join(properties)
+    namespace = WMI_CLASS_NAMESPACES.get(wmi_class)
+    if namespace:
+        return f'wmic /namespace:\\\\{namespace} path {wmi_class} get {properties} /value'
+    return f'wmic path {wmi_class} get {properties} /value'
+
+
+def _build_plan():
+    """根据WMI_PROPERTY_GROUPS生成只读的查询计划
+
+    Returns:
+        WMI类名称到((小写属性名集合, 属性名元组, 命令行), ...)的只读字典
+    """
+    plan = {}
+    for wmi_class, groups in WMI_PROPERTY_GROUPS.items():
+        plan[wmi_class] = tuple(
+            (frozenset(prop.lower() for prop in group), tuple(group), build_wmi_query(wmi_class, group))
+            for group in groups
+        )
+    return types.MappingProxyType(plan)
+
+
+# 导入时生成的查询计划，运行期间不再修改
+WMI_QUERY_PLAN = _build_plan()
+
+
+def parse_wmic_values(output):
+    """解析wmic /value格式的输出
+
+    wmic的输出中实例之间和属性之间都可能夹杂空行，因此按属性名重复出现来划分实例。
+
+    Args:
+        output: wmic /value格式的命令输出
+
+    Returns:
+        实例列表，每个实例是属性名到属性值的字典
+    """
+    records = []
+    current = {}
+    for line in output.split('\n'):
+        line = line.strip()
+        if '=' not in line:
+            continue
+        key, value = line.split('=', 1)
+        key = key.strip()
+        if key in current:
+            records.append(current)
+            current = {}
+        current[key] = value.strip()
+    if current:
+        records.append(current)
+    return records
+
+
+def _query_records(run_cmd, wmi_class, properties, cmd):
+    """执行wmic查询，合并查询失败时逐个属性重新查询
+
+    某些属性在较旧的Windows版本上不存在，合并查询中只要有一个无效属性整条命令都不会返回实例，
+    逐个属性查询可以保留其余属性的值。逐个查询的结果按实例顺序合并。
+    wmic的错误信息只写入标准错误，没有实例的类也会触发逐个查询，这些命令同样按缓存策略缓存。
+
+    Args:
+        run_cmd: 执行命令行命令并返回输出的函数
+        wmi_class: WMI类名称
+        properties: 命令查询的属性名称列表
+        cmd: 查询这些属性的命令行
+
+    Returns:
+        实例列表，每个实例是小写属性名到属性值的字典
+    """
+    records = parse_wmic_values(run_cmd(cmd))
+    if records or len(properties) <= 1:
+        return [{key.lower(): value for key, value in record.items()} for record in records]
+
+    merged = []
+    for prop in properties:
+        for index, record in enumerate(parse_wmic_values(run_cmd(build_wmi_query(wmi_class, [prop])))):
+            if index >= len(merged):
+                merged.append({})
+            merged[index].update((key.lower(), value) for key, value in record.items())
+    return merged
+
+
+def _plan_queries(executor, wmi_class, properties):
+    """选择查询所需属性的命令
+
+    所需属性属于查询计划中的哪些组，就执行哪些组的合并命令；计划之外的属性单独查询。
+    执行器不缓存合并命令的输出时（如create_boot_only_cache()对非开机期间不变的命令），
+    合并查询不能被其他采集方法复用，改为只查询需要的属性。
+
+    Returns:
+        (属性名称列表, 命令行)列表
+    """
+    cache = getattr(executor, 'cache', None)
+    wanted = {prop.lower() for prop in properties}
+    queries = []
+    for lowered, group, cmd in WMI_QUERY_PLAN.get(wmi_class, ()):
+        if not wanted & lowered:
+            continue
+        if cache is None or cache.get_ttl(cmd) == 0:
+            group = [prop for prop in properties if prop.lower() in lowered]
+            cmd = build_wmi_query(wmi_class, group)
+        queries.append((list(group), cmd))
+        wanted -= lowered
+    extra = [prop for prop in properties if prop.lower() in wanted]
+    if extra:
+        queries.append((extra, build_wmi_query(wmi_class, extra)))
+    return queries
+
+
+def query_wmi(executor, wmi_class, properties):
+    """查询WMI类的实例，并只返回需要的属性
+
+    同一组属性通过同一条命令查询，命令输出由执行器缓存，
+    因此不同采集方法对同一WMI类的查询只会启动一次wmic进程。
+    需要的属性分属多个组时，各组的结果按实例顺序合并。
+
+    Args:
+        executor: 命令执行器，提供run()和cache
+        wmi_class: WMI类名称
+        properties: 需要的属性名称列表
+
+    Returns:
+        实例列表，每个实例是属性名到属性值的字典，缺失的属性值为空字符串
+    """
+    values = []
+    for group, cmd in _plan_queries(executor, wmi_class, properties):
+        for index, record in enumerate(_query_records(executor.run, wmi_class, group, cmd)):
+            if index >= len(values):
+                values.append({})
+            values[index].update(record)
+
+    return [{prop: record.get(prop.lower(), '') for prop in properties} for record in values]
+
+
+def query_wmi_value(executor, wmi_class, prop):
+    """查询WMI类第一个实例的单个属性值
+
+    Args:
+        executor: 命令执行器，提供run()和cache
+        wmi_class: WMI类名称
+        prop: 属性名称
+
+    Returns:
+        属性值，查询失败时返回空字符串
+    """
+    instances = query_wmi(executor, wmi_class, [prop])
+    return instances[0][prop] if instances else ''